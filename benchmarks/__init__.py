@@ -0,0 +1 @@
+"""Benchmarks for hot paths (run as scripts, e.g. `python -m benchmarks.bench_save`)."""
@@ -0,0 +1,71 @@
+"""Memory per owned item instance: dict/list-of-floats inventory vs the compact one.
+
+Usage: python -m benchmarks.bench_inventory_memory [instances]
+"""
+from __future__ import annotations
+
+import gc
+import random
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from case_simulator.data import presets
+
+
+def make_drops(n: int, seed: int = 0) -> List[Tuple[str, float]]:
+    """`n` synthetic (item_id, quality) drops."""
+    rnd = random.Random(seed)
+    ids = [it.id for it in presets.ITEMS]
+    return [(rnd.choice(ids), round(rnd.random(), 6)) for _ in range(n)]
+
+
+def build_legacy(drops: List[Tuple[str, float]]) -> Any:
+    """The original layout: Dict[str, int] counts + Dict[str, List[float]] qualities."""
+    counts: Dict[str, int] = {}
+    qualities: Dict[str, List[float]] = {}
+    for item_id, q in drops:
+        counts[item_id] = counts.get(item_id, 0) + 1
+        # float(str) gives a fresh float object, like values parsed from a save
+        qualities.setdefault(item_id, []).append(float(repr(q)))
+    return counts, qualities
+
+
+def build_compact(drops: List[Tuple[str, float]]) -> Any:
+    inv = presets.create_sample_inventory()
+    by_item: Dict[str, List[float]] = {}
+    for item_id, q in drops:
+        by_item.setdefault(item_id, []).append(q)
+    inv.item_counts = {k: len(v) for k, v in by_item.items()}
+    inv.item_qualities = by_item
+    del by_item
+    return inv
+
+
+def measure(build: Callable[[List[Tuple[str, float]]], Any], drops: List[Tuple[str, float]]) -> int:
+    """Bytes still allocated by the structure `build` returns."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build(drops)
+    gc.collect()
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def main(argv: list[str]) -> None:
+    n = int(argv[0]) if argv else 1_000_000
+    drops = make_drops(n)
+    # warm up catalog/registries so they are not attributed to the first run
+    build_compact(drops[:10])
+
+    print(f"instances: {n}")
+    print(f"{'layout':<8} {'bytes':>12} {'bytes/instance':>15}")
+    for name, build in (("legacy", build_legacy), ("compact", build_compact)):
+        size = measure(build, drops)
+        print(f"{name:<8} {size:>12} {size / max(1, n):>15.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,69 @@
+"""In-memory inventory (`savegame.dat`) vs the SQLite store (`savegame.sqlite`).
+
+Builds a synthetic inventory of `qualities` copies over `items` items, saves
+it with both save managers and times opening the game (load), a filtered
+bulk-sell plan, 1000 closest-quality removals followed by a save, and the
+instance table of the inventory screen.
+
+Usage: python -m benchmarks.bench_inventory_store [qualities] [items]
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+from benchmarks.synthetic import install_catalog, synthetic_cases, synthetic_items, synthetic_state
+from case_simulator.save_manager import SaveManager
+from case_simulator.sqlite_save_manager import SqliteSaveManager
+from case_simulator.utils.inventory_view import InventoryView
+from case_simulator.utils.selling import SellRule, plan_sale
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[float, Any]:
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def run(manager_cls: Callable[..., SaveManager], directory: Path, state: Any, item_ids: List[str]) -> List[float]:
+    """[snapshot, load, plan, removals+save, view] seconds for one backend."""
+    manager = manager_cls(save_dir=directory)
+    snapshot, _ = _timed(lambda: manager.save_snapshot(state))
+    manager.close()
+
+    manager = manager_cls(save_dir=directory)
+    load, loaded = _timed(manager.load)
+    inv = loaded.inventory
+    plan, _ = _timed(lambda: plan_sale(inv, SellRule(category="knife", max_quality=0.1)))
+
+    def remove() -> None:
+        for iid in item_ids[:1000]:
+            inv.remove_item_by_quality(iid, 0.5)
+        manager.save(loaded)
+
+    removals, _ = _timed(remove)
+    view, _ = _timed(lambda: InventoryView(inv).rows(500, 520))
+    manager.close()
+    return [snapshot, load, plan, removals, view]
+
+
+def main(argv: List[str]) -> None:
+    n_qualities = int(argv[0]) if len(argv) > 0 else 1_000_000
+    n_items = int(argv[1]) if len(argv) > 1 else 10_000
+    items = synthetic_items(n_items)
+    with install_catalog(items, synthetic_cases(items, 100)):
+        state = synthetic_state(n_qualities, items)
+        item_ids = [it.id for it in items]
+        print(f"qualities: {n_qualities}, items: {n_items}")
+        print(f"{'backend':<8} {'snapshot':>10} {'load':>10} {'plan':>10} {'remove+save':>12} {'view':>10}  (ms)")
+        for name, cls in (("dat", SaveManager), ("sqlite", SqliteSaveManager)):
+            with tempfile.TemporaryDirectory() as tmp:
+                times = run(cls, Path(tmp), state, item_ids)
+            print(f"{name:<8} " + " ".join(f"{t * 1e3:>{w}.1f}" for t, w in zip(times, (10, 10, 10, 12, 10))))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
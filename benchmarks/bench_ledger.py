@@ -0,0 +1,89 @@
+"""Write and query throughput of the drop/craft/sale ledger (`ledger.py`).
+
+Appends `events` synthetic OPEN/SALE/CRAFT records spread over `days` days
+into a temporary ledger (rotating and sealing segments as the game would),
+then times typical queries: observed EV of one case this month (cold and
+with cached indexes), a quality band count, and a per-item filter that has
+to scan raw records.
+
+Usage: python -m benchmarks.bench_ledger [events] [days] [cases]
+"""
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from case_simulator.ledger import CRAFT_IN, CRAFT_OUT, OPEN, SALE, Ledger, LedgerStats
+
+DAY = 86_400
+
+
+def fill(ledger: Ledger, events: int, days: int, cases: int, now: float, seed: int = 0) -> None:
+    """`events` records with timestamps spread evenly over the last `days` days."""
+    rnd = random.Random(seed)
+    case_ids = [f"syn_case_{j}" for j in range(cases)]
+    item_ids = [f"syn_item_{i}" for i in range(cases * 12)]
+    start_ms = int((now - days * DAY) * 1000)
+    step = days * DAY * 1000 / max(1, events)
+    append = ledger.append
+    for n in range(events):
+        ts = start_ms + int(n * step)
+        r = rnd.random()
+        item = rnd.choice(item_ids)
+        price = int(10 * 5000 ** rnd.random())
+        if r < 0.8:
+            append(OPEN, rnd.choice(case_ids), item, rnd.random(), price, ts=ts)
+        elif r < 0.95:
+            append(SALE, None, item, rnd.random(), price, price, ts=ts)
+        elif r < 0.99:
+            append(CRAFT_IN, None, item, rnd.random(), price, ts=ts)
+        else:
+            append(CRAFT_OUT, None, item, rnd.random(), price, -price // 500, ts=ts)
+    ledger.flush()
+
+
+def timed(label: str, fn: Callable[[], LedgerStats], repeat: int = 5) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        st = fn()
+        best = min(best, time.perf_counter() - t0)
+    print(f"  {label:<40} {best * 1e3:9.2f} ms   n={st.count} ev={st.mean_value:.1f}")
+
+
+def main(argv: List[str]) -> None:
+    events = int(argv[0]) if len(argv) > 0 else 2_000_000
+    days = int(argv[1]) if len(argv) > 1 else 90
+    cases = int(argv[2]) if len(argv) > 2 else 100
+    now = time.time()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp) / "ledger"
+        ledger = Ledger(directory)
+        t0 = time.perf_counter()
+        fill(ledger, events, days, cases, now)
+        elapsed = time.perf_counter() - t0
+        size = sum(p.stat().st_size for p in directory.iterdir())
+        print(f"write: {events} events in {elapsed:.2f}s ({events / elapsed:,.0f}/s), "
+              f"{len(ledger.segments())} segments, {size / 1e6:.1f} MB")
+
+        month = now - 30 * DAY
+        fresh = Ledger(directory, readonly=True)
+        t0 = time.perf_counter()
+        st = fresh.observed_ev("syn_case_0", start=month)
+        print("queries (best of 5):")
+        print(f"  {'observed EV, month (cold indexes)':<40} {(time.perf_counter() - t0) * 1e3:9.2f} ms   n={st.count}")
+        timed("observed EV, month", lambda: fresh.observed_ev("syn_case_0", start=month))
+        timed("observed EV, all time", lambda: fresh.observed_ev("syn_case_0"))
+        timed("opens in band 3, all cases, month", lambda: fresh.stats(OPEN, band=3, start=month))
+        timed("sales of one item, month (scan)", lambda: fresh.stats(SALE, item_id="syn_item_0", start=month), repeat=1)
+        fresh.close()
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
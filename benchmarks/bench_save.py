@@ -0,0 +1,73 @@
+"""Compare the legacy base64(XOR(json)) save format with the binary format.
+
+Usage: python -m benchmarks.bench_save [qualities]
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from typing import Any, Callable, Dict
+
+from case_simulator.data import presets
+from case_simulator.save_codec import decode_legacy, decode_save, encode_legacy, encode_save
+from case_simulator.save_manager import SaveManager
+
+
+def make_save_data(n_qualities: int, seed: int = 0) -> Dict[str, Any]:
+    """Synthetic save dict with `n_qualities` per-instance qualities."""
+    rnd = random.Random(seed)
+    ids = [it.id for it in presets.ITEMS]
+    qualities: Dict[str, list] = {}
+    for _ in range(n_qualities):
+        qualities.setdefault(rnd.choice(ids), []).append(round(rnd.random(), 6))
+    return {
+        "balance": 123456,
+        "item_counts": {k: len(v) for k, v in qualities.items()},
+        "case_counts": {c.id: rnd.randint(0, 50) for c in presets.CASES},
+        "granted_presets": list(presets.FREE_PRESET_CASES),
+        "item_qualities": qualities,
+    }
+
+
+def encode_legacy_bytewise(data: Dict[str, Any], key: bytes) -> bytes:
+    """The original implementation: json(indent=2) + per-byte XOR generator + base64."""
+    import base64
+    import json
+
+    raw = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    return base64.b64encode(bytes(b ^ key[i % len(key)] for i, b in enumerate(raw)))
+
+
+def _best_of(fn: Callable[[], Any], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv: list[str]) -> None:
+    n = int(argv[0]) if argv else 300_000
+    key = SaveManager._XOR_KEY
+    data = make_save_data(n)
+
+    legacy = encode_legacy(data, key)
+    binary = encode_save(data, key)
+    assert decode_save(binary, key) == decode_legacy(legacy, key)
+
+    rows = [
+        ("original", len(legacy), _best_of(lambda: encode_legacy_bytewise(data, key), 1), float("nan")),
+        ("legacy", len(legacy), _best_of(lambda: encode_legacy(data, key)), _best_of(lambda: decode_legacy(legacy, key))),
+        ("binary", len(binary), _best_of(lambda: encode_save(data, key)), _best_of(lambda: decode_save(binary, key))),
+    ]
+    print(f"qualities: {n}")
+    print(f"{'format':<8} {'bytes':>12} {'encode ms':>10} {'decode ms':>10}")
+    # original = legacy format with the old per-byte XOR loop (encode only)
+    for name, size, enc, dec in rows:
+        print(f"{name:<8} {size:>12} {enc * 1000:>10.1f} {dec * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,85 @@
+"""Cold-start cost of the app, measured with `python -X importtime`.
+
+Runs a fresh interpreter that imports `case_simulator.app` and builds a
+`CaseSimulatorApp` against a temporary save directory, then reports the
+slowest imports and the total. Exits with status 1 if the median total is
+over the budget, so it can guard startup time as content grows.
+
+Usage: python -m benchmarks.bench_startup [runs] [budget_ms]
+"""
+from __future__ import annotations
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Import + construction of the app (no scenes are created until navigation)
+DEFAULT_BUDGET_MS = 150.0
+
+_CHILD = """
+import time
+t0 = time.perf_counter()
+import case_simulator.app as app_module
+t1 = time.perf_counter()
+app = app_module.CaseSimulatorApp()
+t2 = time.perf_counter()
+app.save_manager.close()
+print(f"{(t1 - t0) * 1e3:.3f} {(t2 - t1) * 1e3:.3f}")
+"""
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _run_once(save_dir: str) -> Tuple[float, float, Dict[str, int]]:
+    """(import ms, construction ms, module -> cumulative import µs) of one cold start."""
+    # the save manager writes into the working directory
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD],
+        cwd=save_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if cumulative.isdigit():
+            imports[name] = int(cumulative)
+    import_ms, build_ms = (float(x) for x in proc.stdout.split()[-2:])
+    return import_ms, build_ms, imports
+
+
+def main(argv: List[str]) -> int:
+    runs = int(argv[0]) if argv else 5
+    budget = float(argv[1]) if len(argv) > 1 else DEFAULT_BUDGET_MS
+
+    totals: List[float] = []
+    last: Dict[str, int] = {}
+    for _ in range(max(1, runs)):
+        with tempfile.TemporaryDirectory() as tmp:
+            import_ms, build_ms, last = _run_once(tmp)
+        totals.append(import_ms + build_ms)
+        print(f"import {import_ms:8.2f} ms   app {build_ms:8.2f} ms   total {import_ms + build_ms:8.2f} ms")
+
+    print()
+    print("slowest case_simulator imports (cumulative, last run):")
+    ours = sorted(((us, name) for name, us in last.items() if name.startswith("case_simulator")), reverse=True)
+    for us, name in ours[:10]:
+        print(f"  {us / 1e3:8.2f} ms  {name}")
+
+    median = statistics.median(totals)
+    verdict = "OK" if median <= budget else "OVER BUDGET"
+    print(f"\nmedian cold start: {median:.2f} ms (budget {budget:.0f} ms) — {verdict}")
+    return 0 if median <= budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
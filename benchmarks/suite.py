@@ -0,0 +1,420 @@
+"""Hot-path benchmark suite with JSON baselines.
+
+Runs every registered benchmark against a synthetic catalog/save of the
+chosen scale (see `benchmarks/synthetic.py`) and records ops/sec (best of
+`--repeat` runs) and the tracemalloc peak of one run. Results are written
+as JSON (`benchmarks/baselines/<scale>-<commit>.json` by default), and
+`--compare` reports the benchmarks that got slower or hungrier than a
+previous file by more than `--tolerance`, exiting with status 1.
+
+Usage: python -m benchmarks.suite [--scale small|medium|large] [--only SUBSTR]
+                                  [--repeat N] [--save PATH] [--compare PATH] [--tolerance 0.15]
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+from case_simulator.data import presets
+from case_simulator.models.case import Case
+from case_simulator.models.item import Item
+from case_simulator.save_manager import SaveManager
+from case_simulator.scenes.inventory import InventoryScene
+from case_simulator.state import GameState
+from case_simulator.utils.batch import draw_cases
+from case_simulator.utils.console import Console
+from case_simulator.utils.crafting import craft_items, select_output_template
+from case_simulator.utils.drops import DropTable, get_drop_table
+from case_simulator.utils.inventory_view import InventoryView
+from case_simulator.utils.pricing import price_multiplier, price_multipliers
+from case_simulator.utils.quality import gen_quality
+from case_simulator.utils.rng import Rng
+
+from benchmarks.synthetic import install_catalog, synthetic_cases, synthetic_items, synthetic_qualities, synthetic_state
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+SEED = 1234
+
+
+@dataclass(frozen=True)
+class Scale:
+    items: int
+    cases: int
+    qualities: int
+    # operations per timed run of the per-call benchmarks
+    calls: int
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(items=10_000, cases=1_000, qualities=100_000, calls=20_000),
+    "medium": Scale(items=100_000, cases=10_000, qualities=1_000_000, calls=100_000),
+    "large": Scale(items=1_000_000, cases=10_000, qualities=2_000_000, calls=100_000),
+}
+
+
+@dataclass
+class Workload:
+    """Synthetic data shared by all benchmarks of a run (built once, not timed)."""
+
+    scale: Scale
+    items: Sequence[Item]
+    cases: Sequence[Case]
+    state: GameState
+    save_dir: Path
+
+
+# A benchmark is a factory: called before every timed run (untimed), it
+# returns the callable to time, which returns the number of operations done.
+Factory = Callable[[Workload], Callable[[], int]]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    unit: str
+    factory: Factory
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, unit: str = "calls") -> Callable[[Factory], Factory]:
+    def register(factory: Factory) -> Factory:
+        BENCHMARKS.append(Benchmark(name, unit, factory))
+        return factory
+
+    return register
+
+
+# --- качество и цены ---
+@benchmark("quality.gen_quality")
+def _bench_gen_quality(w: Workload) -> Callable[[], int]:
+    rng = Rng(SEED)
+    n = w.scale.calls
+
+    def run() -> int:
+        for _ in range(n):
+            gen_quality(rng)
+        return n
+
+    return run
+
+
+@benchmark("pricing.price_multiplier")
+def _bench_price_multiplier(w: Workload) -> Callable[[], int]:
+    rng = Rng(SEED)
+    qualities = [rng.random() for _ in range(w.scale.calls)]
+
+    def run() -> int:
+        for q in qualities:
+            price_multiplier(q)
+        return len(qualities)
+
+    return run
+
+
+@benchmark("pricing.price_multipliers", unit="qualities")
+def _bench_price_multipliers(w: Workload) -> Callable[[], int]:
+    rng = Rng(SEED)
+    qualities = [rng.random() for _ in range(w.scale.calls * 10)]
+
+    def run() -> int:
+        price_multipliers(qualities)
+        return len(qualities)
+
+    return run
+
+
+# --- выпадения ---
+@benchmark("drops.build_tables", unit="cases")
+def _bench_build_tables(w: Workload) -> Callable[[], int]:
+    def run() -> int:
+        for case in w.cases:
+            DropTable.for_case(case)
+        return len(w.cases)
+
+    return run
+
+
+@benchmark("drops.draw_single", unit="draws")
+def _bench_draw_single(w: Workload) -> Callable[[], int]:
+    # one draw from a random case each time, like individual openings
+    rng = Rng(SEED)
+    picks = [w.cases[rng.randrange(len(w.cases))] for _ in range(w.scale.calls)]
+    for case in set(picks):
+        get_drop_table(case)
+
+    def run() -> int:
+        for case in picks:
+            get_drop_table(case).sample(rng.random)
+        return len(picks)
+
+    return run
+
+
+@benchmark("drops.draw_cases", unit="draws")
+def _bench_draw_cases(w: Workload) -> Callable[[], int]:
+    rng = Rng(SEED)
+    case = w.cases[0]
+
+    def run() -> int:
+        return len(draw_cases(case, w.scale.calls, rng))
+
+    return run
+
+
+# --- крафт ---
+@benchmark("crafting.select_output_template")
+def _bench_select_output_template(w: Workload) -> Callable[[], int]:
+    rng = Rng(SEED)
+    targets = [(rng.uniform(10, 500_000), rng.random(), rng.choice((None, "rifle", "knife"))) for _ in range(w.scale.calls)]
+    select_output_template(1.0, 0.5)  # build the template index outside the timed run
+
+    def run() -> int:
+        for target, q, category in targets:
+            select_output_template(target, q, category)
+        return len(targets)
+
+    return run
+
+
+@benchmark("crafting.craft_items", unit="crafts")
+def _bench_craft_items(w: Workload) -> Callable[[], int]:
+    rng = Rng(SEED)
+    modes = ("probabilistic", "deterministic", "fusion", "upgrade")
+    n = max(1, w.scale.calls // 10)
+    plans = []
+    for _ in range(n):
+        picks = [w.items[rng.randrange(len(w.items))] for _ in range(rng.randint(3, 10))]
+        plans.append(([(it.id, rng.random()) for it in picks], rng.choice(modes)))
+    select_output_template(1.0, 0.5)
+
+    def run() -> int:
+        for selections, mode in plans:
+            craft_items(w.state, selections, mode, rng=rng)
+        return len(plans)
+
+    return run
+
+
+# --- инвентарь ---
+@benchmark("inventory.add_item")
+def _bench_add_item(w: Workload) -> Callable[[], int]:
+    rng = Rng(SEED)
+    adds = [(w.items[rng.randrange(len(w.items))], round(rng.random(), 6)) for _ in range(w.scale.calls)]
+    inv = presets.create_sample_inventory()
+
+    def run() -> int:
+        for item, q in adds:
+            inv.add_item(item, quality=q)
+        return len(adds)
+
+    return run
+
+
+@benchmark("inventory.remove_item_by_quality")
+def _bench_remove_by_quality(w: Workload) -> Callable[[], int]:
+    rng = Rng(SEED)
+    qualities = synthetic_qualities(w.scale.qualities, [it.id for it in w.items], SEED)
+    inv = presets.create_sample_inventory()
+    inv.item_counts = {k: len(v) for k, v in qualities.items()}
+    inv.item_qualities = qualities
+    owned = list(qualities)
+    removals = [(iid, rng.random()) for iid in (owned[rng.randrange(len(owned))] for _ in range(w.scale.calls))]
+    del qualities
+
+    def run() -> int:
+        for iid, q in removals:
+            inv.remove_item_by_quality(iid, q)
+        return len(removals)
+
+    return run
+
+
+# --- сохранение ---
+@benchmark("save.snapshot", unit="instances")
+def _bench_save(w: Workload) -> Callable[[], int]:
+    manager = SaveManager(save_dir=w.save_dir, backups=0)
+
+    def run() -> int:
+        manager.save_snapshot(w.state)
+        return w.scale.qualities
+
+    return run
+
+
+@benchmark("save.load", unit="instances")
+def _bench_load(w: Workload) -> Callable[[], int]:
+    writer = SaveManager(save_dir=w.save_dir, backups=0)
+    writer.save_snapshot(w.state)
+    writer.close()
+
+    def run() -> int:
+        manager = SaveManager(save_dir=w.save_dir, backups=0)
+        manager.load()
+        manager.close()
+        return w.scale.qualities
+
+    return run
+
+
+# --- отрисовка сцен ---
+@benchmark("scene.inventory_page", unit="pages")
+def _bench_inventory_page(w: Workload) -> Callable[[], int]:
+    console = Console(stream=io.StringIO())
+    scene = InventoryScene(console, w.state, Rng(SEED))
+    view = InventoryView(w.state.inventory, "all", "price", True, InventoryScene.PAGE_SIZE)
+    pages = view.pager.pages(view.item_count())
+    n = min(pages, max(1, w.scale.calls // 100))
+
+    def run() -> int:
+        for page in range(1, n + 1):
+            view.pager.goto(page, view.item_count())
+            console.clear()
+            scene._print_owned_page(view, simple=False)
+            console.flush()
+        console.stream.seek(0)
+        console.stream.truncate()
+        return n
+
+    return run
+
+
+@benchmark("scene.catalog_table", unit="rows")
+def _bench_catalog_table(w: Workload) -> Callable[[], int]:
+    console = Console(stream=io.StringIO())
+    scene = InventoryScene(console, w.state, Rng(SEED))
+    rows = list(w.items[:1000])
+
+    def run() -> int:
+        console.clear()
+        scene._display_items_table(rows)
+        console.flush()
+        console.stream.seek(0)
+        console.stream.truncate()
+        return len(rows)
+
+    return run
+
+
+# --- запуск ---
+def measure(bench: Benchmark, workload: Workload, repeat: int) -> Dict[str, Any]:
+    """Best-of-`repeat` ops/sec plus the tracemalloc peak of one extra run."""
+    best = 0.0
+    ops = 0
+    for _ in range(max(1, repeat)):
+        run = bench.factory(workload)
+        gc.collect()
+        started = time.perf_counter()
+        ops = run()
+        elapsed = time.perf_counter() - started
+        best = max(best, ops / elapsed if elapsed > 0 else float("inf"))
+        del run
+
+    run = bench.factory(workload)
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"unit": bench.unit, "ops": ops, "ops_per_sec": round(best, 3), "peak_kib": round(peak / 1024, 1)}
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Human-readable regressions of `current` against `baseline`."""
+    regressions: List[str] = []
+    for name, res in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        if res["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {res['ops_per_sec']:,.0f} {res['unit']}/s vs {base['ops_per_sec']:,.0f} "
+                f"({res['ops_per_sec'] / base['ops_per_sec'] - 1:+.1%})"
+            )
+        if base["peak_kib"] > 0 and res["peak_kib"] > base["peak_kib"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: peak {res['peak_kib']:,.0f} KiB vs {base['peak_kib']:,.0f} "
+                f"({res['peak_kib'] / base['peak_kib'] - 1:+.1%})"
+            )
+    return regressions
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="Hot-path benchmarks with JSON baselines.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--only", default="", help="run only benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", type=Path, default=None, help="result file (default: benchmarks/baselines/<scale>-<commit>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="baseline file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    scale = SCALES[args.scale]
+    selected = [b for b in BENCHMARKS if args.only in b.name]
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        items = synthetic_items(scale.items, SEED)
+        cases = synthetic_cases(items, scale.cases, seed=SEED)
+        with install_catalog(items, cases):
+            workload = Workload(scale, items, cases, synthetic_state(scale.qualities, items, SEED), Path(tmp))
+            print(f"workload ({args.scale}): {time.perf_counter() - started:.1f}s")
+            for bench in selected:
+                res = results[bench.name] = measure(bench, workload, args.repeat)
+                print(f"{bench.name:36} {res['ops_per_sec']:>14,.0f} {res['unit']}/s   peak {res['peak_kib']:>10,.0f} KiB")
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            **asdict(scale),
+        },
+        "results": results,
+    }
+    out = args.save or BASELINE_DIR / f"{args.scale}-{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"results: {out}")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if baseline.get("meta", {}).get("scale") != args.scale:
+            print(f"\n{args.compare} was recorded at scale {baseline.get('meta', {}).get('scale')!r}, not {args.scale!r}")
+            return 2
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\nregressions vs {args.compare} (tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nno regressions vs {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,163 @@
+"""Synthetic large-scale content and saves for benchmarks.
+
+Catalogs: `synthetic_items`/`synthetic_cases` build 10k–1M items and up to
+10k cases with a realistic spread of prices and rarities; `install_catalog`
+temporarily swaps them into `presets` (ITEMS, CASES, ITEMS_BY_ID,
+CASES_BY_ID) so the game code runs against them unchanged.
+`write_content` stores them as data files for `data/catalog.py`.
+
+Saves: `synthetic_state` fills an inventory with 1M+ quality instances;
+`write_save` stores it as a regular save via `SaveManager`.
+
+Usage: python -m benchmarks.synthetic content <dir> [items] [cases]
+       python -m benchmarks.synthetic save <dir> [qualities] [items]
+"""
+from __future__ import annotations
+
+import csv
+import json
+import math
+import random
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from case_simulator.data import presets
+from case_simulator.models.case import Case
+from case_simulator.models.inventory import Inventory
+from case_simulator.models.item import Item
+from case_simulator.save_manager import SaveManager
+from case_simulator.state import GameState
+from case_simulator.utils import drops, templates, valuation
+
+CATEGORIES = ("pistol", "rifle", "sniper", "knife", "shotgun", "boots", "pants", "shirt")
+
+
+def synthetic_items(n: int, seed: int = 0) -> Tuple[Item, ...]:
+    """`n` items with log-uniform prices (10..500k) and rarity growing with price."""
+    rnd = random.Random(seed)
+    items: List[Item] = []
+    for i in range(n):
+        price = int(10 * math.exp(rnd.random() * math.log(50_000)))
+        rare = max(1, min(100, int(math.log10(price) * 15 + rnd.gauss(0, 5))))
+        items.append(Item(id=f"syn_item_{i}", name=f"Synthetic {i}", price=price, category=rnd.choice(CATEGORIES), rare=rare))
+    return tuple(items)
+
+
+def synthetic_cases(items: Sequence[Item], n: int, per_case: int = 12, seed: int = 0) -> Tuple[Case, ...]:
+    """`n` cases of `per_case` random items, priced at half their mean item price."""
+    rnd = random.Random(seed)
+    cases: List[Case] = []
+    for j in range(n):
+        members = tuple(rnd.sample(items, min(per_case, len(items))))
+        price = max(1, sum(it.price for it in members) // (2 * len(members)))
+        cases.append(Case(id=f"syn_case_{j}", name=f"Synthetic Case {j}", price=price, items=members))
+    return tuple(cases)
+
+
+@contextmanager
+def install_catalog(items: Sequence[Item], cases: Sequence[Case]) -> Iterator[None]:
+    """Replace the preset catalog with `items`/`cases` for the duration of the block.
+
+    The drop-table, template-index and valuation caches are cleared on
+    entry and exit, so nothing built for one catalog leaks into the other.
+    """
+    names = ("ITEMS", "CASES", "ITEMS_BY_ID", "CASES_BY_ID", "CONTENT", "_CATALOGS")
+    saved = {name: getattr(presets, name) for name in names}
+
+    def reset_caches() -> None:
+        drops.clear_drop_tables()
+        templates.clear_template_index()
+        valuation.invalidate_valuations()
+
+    presets.ITEMS = tuple(items)
+    presets.CASES = tuple(cases)
+    presets.ITEMS_BY_ID = {it.id: it for it in presets.ITEMS}
+    presets.CASES_BY_ID = {c.id: c for c in presets.CASES}
+    presets.CONTENT = None
+    presets._CATALOGS = ()
+    reset_caches()
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(presets, name, value)
+        reset_caches()
+
+
+def synthetic_qualities(n: int, item_ids: Sequence[str], seed: int = 0) -> Dict[str, List[float]]:
+    """`n` quality instances spread over `item_ids` (6-decimal grid, like saves)."""
+    rnd = random.Random(seed)
+    qualities: Dict[str, List[float]] = {}
+    for _ in range(n):
+        qualities.setdefault(rnd.choice(item_ids), []).append(round(rnd.random(), 6))
+    return qualities
+
+
+def synthetic_state(n_qualities: int, items: Sequence[Item], seed: int = 0) -> GameState:
+    """A state owning `n_qualities` copies of `items` (the catalog must be installed)."""
+    qualities = synthetic_qualities(n_qualities, [it.id for it in items], seed)
+    inv: Inventory = presets.create_sample_inventory()
+    inv.item_counts = {k: len(v) for k, v in qualities.items()}
+    inv.item_qualities = qualities
+    del qualities
+    rnd = random.Random(seed)
+    inv.case_counts = {c.id: rnd.randint(0, 50) for c in presets.CASES[:1000]}
+    return GameState(inventory=inv, balance=1_000_000, granted_presets=list(presets.FREE_PRESET_CASES))
+
+
+def write_content(directory: Path, items: Sequence[Item], cases: Sequence[Case]) -> List[Path]:
+    """Store the catalog as content files (`items.csv`, `cases.json`) for `data/catalog.py`."""
+    directory.mkdir(parents=True, exist_ok=True)
+    items_path = directory / "items.csv"
+    with open(items_path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(("id", "name", "price", "category", "rare"))
+        writer.writerows((it.id, it.name, it.price, it.category, it.rare) for it in items)
+    cases_path = directory / "cases.json"
+    with open(cases_path, "w", encoding="utf-8") as fh:
+        json.dump(
+            {"cases": [{"id": c.id, "name": c.name, "price": c.price, "items": [it.id for it in c.items]} for c in cases]},
+            fh,
+            ensure_ascii=False,
+        )
+    return [items_path, cases_path]
+
+
+def write_save(directory: Path, n_qualities: int, n_items: int = 10_000, seed: int = 0) -> Path:
+    """Write a synthetic save (snapshot + empty journal) into `directory`.
+
+    The item ids are the synthetic ones (`synthetic_items(n_items, seed)`):
+    install the same catalog before loading it to get item templates.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    items = synthetic_items(n_items, seed)
+    with install_catalog(items, synthetic_cases(items, 100, seed=seed)):
+        state = synthetic_state(n_qualities, items, seed)
+        manager = SaveManager(save_dir=directory)
+        manager.save_snapshot(state)
+        manager.close()
+    return manager.save_path
+
+
+def main(argv: List[str]) -> None:
+    if len(argv) < 2 or argv[0] not in ("content", "save"):
+        print(__doc__)
+        sys.exit(2)
+    kind, directory = argv[0], Path(argv[1])
+    if kind == "content":
+        n_items = int(argv[2]) if len(argv) > 2 else 100_000
+        n_cases = int(argv[3]) if len(argv) > 3 else 10_000
+        items = synthetic_items(n_items)
+        paths = write_content(directory, items, synthetic_cases(items, n_cases))
+        print(f"{n_items} items, {n_cases} cases -> {', '.join(str(p) for p in paths)}")
+    else:
+        n_qualities = int(argv[2]) if len(argv) > 2 else 1_000_000
+        n_items = int(argv[3]) if len(argv) > 3 else 10_000
+        path = write_save(directory, n_qualities, n_items)
+        print(f"{n_qualities} quality instances -> {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
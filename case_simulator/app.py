@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-from typing import Dict, Optional
+import importlib
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
 
+from case_simulator.ledger import Ledger, set_ledger
 from case_simulator.scenes.base import Scene
-from case_simulator.scenes.case_opening import CaseOpeningScene
-from case_simulator.scenes.crafting import CraftingScene
-from case_simulator.scenes.main_menu import MainMenuScene
-from case_simulator.scenes.shop import ShopScene
-from case_simulator.scenes.inventory import InventoryScene
 from case_simulator.utils.console import Console
+from case_simulator.utils.metrics import METRICS
+from case_simulator.utils.rng import Rng, get_rng
 from case_simulator.state import GameState
 from case_simulator.save_manager import SaveManager
 
@@ -16,34 +18,119 @@ from case_simulator.save_manager import SaveManager
 class CaseSimulatorApp:
     """Класс основного приложения симулятора кейсов."""
 
-    def __init__(self) -> None:
+    # Имя сцены -> (модуль, класс). Модуль импортируется, а сцена создаётся
+    # при первом переходе на неё, чтобы не платить за все сцены при старте.
+    SCENES: Dict[str, Tuple[str, str]] = {
+        "menu": ("case_simulator.scenes.main_menu", "MainMenuScene"),
+        "case_opening": ("case_simulator.scenes.case_opening", "CaseOpeningScene"),
+        "crafting": ("case_simulator.scenes.crafting", "CraftingScene"),
+        "shop": ("case_simulator.scenes.shop", "ShopScene"),
+        "inventory": ("case_simulator.scenes.inventory", "InventoryScene"),
+        # скрытый экран метрик (клавиша `d` в главном меню)
+        "debug": ("case_simulator.scenes.debug", "DebugScene"),
+    }
+
+    # Включает метрики с самого старта: "1" — только сбор, иначе путь к
+    # файлу, в который при выходе дописываются метрики в формате JSON lines
+    METRICS_ENV = "CASE_SIM_METRICS"
+    # "sqlite" — хранить инвентарь в `savegame.sqlite` (`SqliteSaveManager`)
+    STORE_ENV = "CASE_SIM_STORE"
+    # Каталог журнала открытий/крафтов/продаж (`ledger.py`) рядом с сохранением
+    LEDGER_DIR = "ledger"
+
+    def __init__(self, seed: Optional[int] = None) -> None:
+        metrics_env = os.environ.get(self.METRICS_ENV, "")
+        self.metrics_path: Optional[Path] = Path(metrics_env) if metrics_env not in ("", "0", "1") else None
+        if metrics_env not in ("", "0"):
+            METRICS.enabled = True
         self.console = Console()
-        self.save_manager = SaveManager()
+        # С `seed` игра воспроизводима: каждая сцена получает свой дочерний поток
+        self.rng = Rng(seed) if seed is not None else get_rng()
+        # Запись сохранений идёт в фоновом потоке, чтобы не тормозить интерфейс
+        self.save_manager: SaveManager
+        if os.environ.get(self.STORE_ENV, "").lower() == "sqlite":
+            # импорт только по запросу: sqlite3 не нужен для обычного старта
+            from case_simulator.sqlite_save_manager import SqliteSaveManager
+
+            self.save_manager = SqliteSaveManager()
+        else:
+            self.save_manager = SaveManager(background=True)
         
         # Загружаем состояние из сохранения или создаем новое
         self.state = self.save_manager.load()
+        self.ledger = Ledger(self.save_manager.save_dir / self.LEDGER_DIR)
+        set_ledger(self.ledger)
         
-        self.scenes: Dict[str, Scene] = {
-            "menu": MainMenuScene(self.console, self.state),
-            "case_opening": CaseOpeningScene(self.console, self.state),
-            "crafting": CraftingScene(self.console, self.state),
-            "shop": ShopScene(self.console, self.state),
-            "inventory": InventoryScene(self.console, self.state),
-        }
+        # Уже созданные сцены (см. `get_scene`)
+        self.scenes: Dict[str, Scene] = {}
+
+    def get_scene(self, name: str) -> Scene:
+        """Сцена `name`; при первом обращении импортирует модуль и создаёт её.
+
+        Поток случайных чисел сцены выводится из её имени, поэтому порядок
+        создания сцен не влияет на воспроизводимость.
+        """
+        scene = self.scenes.get(name)
+        if scene is None:
+            with METRICS.timer("scene_init_seconds", scene=name):
+                module_name, class_name = self.SCENES[name]
+                scene_cls = getattr(importlib.import_module(module_name), class_name)
+                scene = self.scenes[name] = scene_cls(self.console, self.state, self.rng.spawn(name))
+        return scene
 
     def run(self) -> None:
         """Запустить основной цикл до тех пор, пока сцена не попросит выйти."""
         next_scene_name: Optional[str] = "menu"
 
-        while next_scene_name:
-            scene = self.scenes[next_scene_name]
-            next_scene_name = scene.run()
-            
-            # Сохраняем состояние после каждой сцены
-            self.save_manager.save(self.state)
+        try:
+            while next_scene_name:
+                scene = self.get_scene(next_scene_name)
+                started = time.perf_counter()
+                current, next_scene_name = next_scene_name, scene.run()
+                if METRICS.enabled:
+                    # время в сцене (вместе с ожиданием ввода) и переходы
+                    METRICS.observe("scene_seconds", time.perf_counter() - started, scene=current)
+                    METRICS.inc("scene_transitions_total", src=current, dst=next_scene_name or "exit")
+                    METRICS.set("balance", self.state.balance)
+                    METRICS.set("owned_items", sum(self.state.inventory.item_counts.values()))
 
-        self.console.clear()
-        self.console.write_line("Спасибо за игру! До встречи.")
-        
-        # Финальное сохранение перед выходом
-        self.save_manager.save(self.state)
+                # Сохраняем состояние после каждой сцены
+                self.save_manager.save(self.state)
+                self.ledger.flush()
+
+            self.console.clear()
+            self.console.write_line("Спасибо за игру! До встречи.")
+        finally:
+            try:
+                # вывести последний кадр (консоль буферизует вывод до ввода/flush)
+                self.console.flush()
+            finally:
+                self._shutdown()
+
+    def _shutdown(self) -> None:
+        """Финальное сохранение, закрытие журнала событий и выгрузка метрик.
+
+        Журнал и метрики сбрасываются при любом исходе сохранения — именно
+        на аварийных путях они нужнее всего.
+        """
+        try:
+            # Финальное сохранение перед выходом (в том числе по Ctrl+C или
+            # при ошибке) и ожидание, пока фоновая запись дойдёт до диска
+            try:
+                self.save_manager.save(self.state)
+            finally:
+                self.save_manager.close()
+        except OSError as e:
+            # запись не удалась: последняя попытка — синхронный полный снимок
+            print(f"Ошибка записи сохранения: {e}. Повторяем.")
+            try:
+                self.save_manager.save(self.state)
+                self.save_manager.close()
+            except OSError as e2:
+                print(f"Не удалось сохранить прогресс: {e2}")
+        finally:
+            try:
+                self.ledger.close()
+            finally:
+                if self.metrics_path is not None:
+                    METRICS.export_jsonl(self.metrics_path)
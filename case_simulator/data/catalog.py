@@ -0,0 +1,478 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from case_simulator.models.case import Case
+from case_simulator.models.item import Item
+from case_simulator.save_writer import atomic_write
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: TOML content files are not supported
+    tomllib = None
+
+
+# Content files: {"items": [{id, name, price, category, rare}, ...],
+#                 "cases": [{id, name, price, items: [item ids]}, ...]}
+# in JSON or TOML ([[items]] / [[cases]] tables), or CSV files named
+# items*.csv (id,name,price,category,rare) and cases*.csv (id,name,price,items
+# with item ids separated by ";").
+CONTENT_SUFFIXES = (".json", ".toml", ".csv")
+
+_MAGIC = b"CSCATLG\0"
+_VERSION = 1
+# magic, version, n_items, n_cases, offsets of: item table, case table,
+# item order, case order, case item refs, string blob
+_HEADER = struct.Struct("<8s9I")
+# id, name, category as (offset, length) into the blob; price; rare; position in file order
+_ITEM = struct.Struct("<IHIHIHqiI")
+# id, name as (offset, length); price; first ref; number of refs
+_CASE = struct.Struct("<IHIHqII")
+# item id of a case entry as (offset, length)
+_REF = struct.Struct("<IH")
+_U32 = struct.Struct("<I")
+
+
+class CatalogError(ValueError):
+    """Invalid content file or compiled catalog."""
+
+
+# --- чтение файлов контента ---
+def _read_csv(path: Path) -> Tuple[List[dict], List[dict]]:
+    with open(path, newline="", encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    if path.stem.startswith("items"):
+        return rows, []
+    if path.stem.startswith("cases"):
+        for row in rows:
+            row["items"] = [i.strip() for i in (row.get("items") or "").split(";") if i.strip()]
+        return [], rows
+    raise CatalogError(f"{path.name}: CSV content files must be named items*.csv or cases*.csv")
+
+
+def read_content_file(path: Path) -> Tuple[List[dict], List[dict]]:
+    """(item records, case records) of one content file."""
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return _read_csv(path)
+    if suffix == ".json":
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    elif suffix == ".toml":
+        if tomllib is None:
+            raise CatalogError(f"{path.name}: TOML content needs Python 3.11+ (tomllib)")
+        with open(path, "rb") as fh:
+            data = tomllib.load(fh)
+    else:
+        raise CatalogError(f"{path.name}: unsupported content file type")
+    if not isinstance(data, dict):
+        raise CatalogError(f"{path.name}: expected an object with 'items' and/or 'cases'")
+    return list(data.get("items", ())), list(data.get("cases", ()))
+
+
+def content_files(directory: Path) -> List[Path]:
+    """Content files of `directory` in name order (empty if it does not exist)."""
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.iterdir() if p.is_file() and p.suffix.lower() in CONTENT_SUFFIXES)
+
+
+# --- компиляция ---
+def _validate(
+    items: List[dict],
+    cases: List[dict],
+    known_item_ids: Iterable[str],
+    known_case_ids: Iterable[str],
+) -> Tuple[list, list]:
+    """Normalized (id, name, price, category, rare) / (id, name, price, item ids) rows.
+
+    Items go through `Item(...)` once here, so loading the compiled index
+    can skip the per-entry validation.
+    """
+    out_items: List[Tuple[str, str, int, str, int]] = []
+    known_items = set(known_item_ids)
+    seen: set = set()
+    for rec in items:
+        try:
+            item = Item(
+                id=str(rec["id"]),
+                name=str(rec["name"]),
+                price=int(rec["price"]),
+                category=str(rec.get("category") or "misc"),
+                rare=int(rec.get("rare") or 0),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise CatalogError(f"invalid item {rec!r}: {e}") from e
+        if item.id in seen or item.id in known_items:
+            raise CatalogError(f"duplicate item id {item.id!r}")
+        seen.add(item.id)
+        out_items.append((item.id, item.name, item.price, item.category, item.rare))
+
+    known = seen | known_items
+    out_cases: List[Tuple[str, str, int, List[str]]] = []
+    known_cases = set(known_case_ids)
+    seen_cases: set = set()
+    for rec in cases:
+        try:
+            cid, name, price = str(rec["id"]), str(rec["name"]), int(rec["price"])
+            refs = [str(i) for i in rec.get("items", ())]
+        except (KeyError, TypeError, ValueError) as e:
+            raise CatalogError(f"invalid case {rec!r}: {e}") from e
+        if cid in seen_cases or cid in known_cases:
+            raise CatalogError(f"duplicate case id {cid!r}")
+        missing = [i for i in refs if i not in known]
+        if missing:
+            raise CatalogError(f"case {cid!r} references unknown items {missing}")
+        seen_cases.add(cid)
+        out_cases.append((cid, name, price, refs))
+    return out_items, out_cases
+
+
+def compile_catalog(
+    items: List[dict],
+    cases: List[dict],
+    known_item_ids: Iterable[str] = (),
+    known_case_ids: Iterable[str] = (),
+) -> bytes:
+    """Validate content records and build the binary index (see `MappedCatalog`).
+
+    `known_item_ids`/`known_case_ids` are the ids already defined elsewhere
+    (in `presets.py`): cases may reference those items, and the file may not
+    redefine any of them.
+    """
+    item_rows, case_rows = _validate(items, cases, known_item_ids, known_case_ids)
+
+    blob = bytearray()
+    strings: Dict[str, Tuple[int, int]] = {}
+
+    def ref(text: str) -> Tuple[int, int]:
+        loc = strings.get(text)
+        if loc is None:
+            raw = text.encode("utf-8")
+            if len(raw) > 0xFFFF:
+                raise CatalogError(f"string too long: {text[:40]!r}...")
+            loc = strings[text] = (len(blob), len(raw))
+            blob.extend(raw)
+        return loc
+
+    # tables are sorted by id (bisect lookup); the order arrays keep file order
+    item_sorted = sorted(range(len(item_rows)), key=lambda i: item_rows[i][0].encode("utf-8"))
+    case_sorted = sorted(range(len(case_rows)), key=lambda i: case_rows[i][0].encode("utf-8"))
+
+    item_table = bytearray()
+    for i in item_sorted:
+        iid, name, price, category, rare = item_rows[i]
+        item_table += _ITEM.pack(*ref(iid), *ref(name), *ref(category), price, rare, i)
+
+    case_table = bytearray()
+    refs = bytearray()
+    n_refs = 0
+    for i in case_sorted:
+        cid, name, price, members = case_rows[i]
+        case_table += _CASE.pack(*ref(cid), *ref(name), price, n_refs, len(members))
+        for member in members:
+            refs += _REF.pack(*ref(member))
+        n_refs += len(members)
+
+    item_pos = {orig: pos for pos, orig in enumerate(item_sorted)}
+    case_pos = {orig: pos for pos, orig in enumerate(case_sorted)}
+    item_order = b"".join(_U32.pack(item_pos[i]) for i in range(len(item_rows)))
+    case_order = b"".join(_U32.pack(case_pos[i]) for i in range(len(case_rows)))
+
+    offset = _HEADER.size
+    sections = [item_table, case_table, item_order, case_order, refs, blob]
+    offsets = []
+    for section in sections:
+        offsets.append(offset)
+        offset += len(section)
+    header = _HEADER.pack(_MAGIC, _VERSION, len(item_rows), len(case_rows), *offsets)
+    return header + b"".join(bytes(s) for s in sections)
+
+
+# --- чтение индекса ---
+def _trusted_item(iid: str, name: str, price: int, category: str, rare: int) -> Item:
+    """`Item` without `__post_init__` (the record was validated when compiled)."""
+    item = object.__new__(Item)
+    for field_name, value in (("id", iid), ("name", name), ("price", price), ("category", category), ("rare", rare), ("quality", 0.0)):
+        object.__setattr__(item, field_name, value)
+    return item
+
+
+class MappedCatalog:
+    """Read-only view of a compiled catalog file, memory-mapped.
+
+    Nothing is decoded up front: an id lookup bisects the id-sorted tables
+    directly in the mapping, and `Item`/`Case` objects are created on first
+    access and cached. Case entries may reference items outside the file;
+    those are resolved through `fallback_items`.
+    """
+
+    def __init__(self, path: Path, fallback_items: Optional[Mapping[str, Item]] = None) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self._n_items, self._n_cases, self._items_off, self._cases_off,
+             self._item_order_off, self._case_order_off, self._refs_off, self._blob_off) = _HEADER.unpack_from(self._mm, 0)
+        except struct.error as e:
+            raise CatalogError(f"{self.path.name}: truncated catalog") from e
+        if magic != _MAGIC or version != _VERSION:
+            raise CatalogError(f"{self.path.name}: not a catalog file of version {_VERSION}")
+        self.fallback_items: Mapping[str, Item] = fallback_items if fallback_items is not None else {}
+        self._items: Dict[str, Item] = {}
+        self._cases: Dict[str, Case] = {}
+
+    def close(self) -> None:
+        self._mm.close()
+
+    # --- низкоуровневый доступ ---
+    def _str(self, off: int, length: int) -> str:
+        start = self._blob_off + off
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _raw_id(self, table_off: int, record: struct.Struct, index: int) -> bytes:
+        off, length = struct.unpack_from("<IH", self._mm, table_off + index * record.size)
+        start = self._blob_off + off
+        return self._mm[start:start + length]
+
+    def _find(self, key: str, table_off: int, record: struct.Struct, n: int) -> int:
+        """Index of `key` in an id-sorted table, or -1 (binary search in the mapping)."""
+        target = key.encode("utf-8")
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._raw_id(table_off, record, mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < n and self._raw_id(table_off, record, lo) == target else -1
+
+    def _order(self, order_off: int, position: int) -> int:
+        return _U32.unpack_from(self._mm, order_off + position * 4)[0]
+
+    def _item_at(self, index: int) -> Item:
+        iid_off, iid_len, name_off, name_len, cat_off, cat_len, price, rare, _pos = _ITEM.unpack_from(
+            self._mm, self._items_off + index * _ITEM.size
+        )
+        iid = self._str(iid_off, iid_len)
+        item = self._items.get(iid)
+        if item is None:
+            item = self._items[iid] = _trusted_item(
+                iid, self._str(name_off, name_len), price, self._str(cat_off, cat_len), rare
+            )
+        return item
+
+    def _case_at(self, index: int) -> Case:
+        cid_off, cid_len, name_off, name_len, price, first, count = _CASE.unpack_from(
+            self._mm, self._cases_off + index * _CASE.size
+        )
+        cid = self._str(cid_off, cid_len)
+        case = self._cases.get(cid)
+        if case is None:
+            members = []
+            for k in range(first, first + count):
+                member = self._str(*_REF.unpack_from(self._mm, self._refs_off + k * _REF.size))
+                members.append(self.item(member))
+            case = self._cases[cid] = Case(id=cid, name=self._str(name_off, name_len), price=price, items=tuple(members))
+        return case
+
+    # --- предметы ---
+    @property
+    def item_count(self) -> int:
+        return self._n_items
+
+    def has_item(self, iid: str) -> bool:
+        return iid in self._items or self._find(iid, self._items_off, _ITEM, self._n_items) >= 0
+
+    def item(self, iid: str) -> Item:
+        """Item `iid` (KeyError if it is neither in the file nor in `fallback_items`)."""
+        item = self._items.get(iid)
+        if item is not None:
+            return item
+        index = self._find(iid, self._items_off, _ITEM, self._n_items)
+        if index < 0:
+            return self.fallback_items[iid]
+        return self._item_at(index)
+
+    def item_at(self, position: int) -> Item:
+        """Item number `position` in file order."""
+        return self._item_at(self._order(self._item_order_off, position))
+
+    def item_position(self, iid: str) -> int:
+        """Position of item `iid` in file order, or -1."""
+        index = self._find(iid, self._items_off, _ITEM, self._n_items)
+        if index < 0:
+            return -1
+        return _ITEM.unpack_from(self._mm, self._items_off + index * _ITEM.size)[-1]
+
+    def item_ids(self) -> Iterator[str]:
+        """Item ids in file order (decodes only the ids)."""
+        for pos in range(self._n_items):
+            yield self._raw_id(self._items_off, _ITEM, self._order(self._item_order_off, pos)).decode("utf-8")
+
+    # --- кейсы ---
+    @property
+    def case_count(self) -> int:
+        return self._n_cases
+
+    def has_case(self, cid: str) -> bool:
+        return cid in self._cases or self._find(cid, self._cases_off, _CASE, self._n_cases) >= 0
+
+    def case(self, cid: str) -> Case:
+        case = self._cases.get(cid)
+        if case is not None:
+            return case
+        index = self._find(cid, self._cases_off, _CASE, self._n_cases)
+        if index < 0:
+            raise KeyError(cid)
+        return self._case_at(index)
+
+    def case_at(self, position: int) -> Case:
+        return self._case_at(self._order(self._case_order_off, position))
+
+    def case_prices(self) -> Iterator[Tuple[str, int]]:
+        """(case id, price) in file order without building the cases."""
+        for pos in range(self._n_cases):
+            index = self._order(self._case_order_off, pos)
+            cid_off, cid_len, _n_off, _n_len, price, _first, _count = _CASE.unpack_from(
+                self._mm, self._cases_off + index * _CASE.size
+            )
+            yield self._str(cid_off, cid_len), price
+
+
+class LazyCatalogMapping(Mapping):
+    """`{id: Item|Case}` over the objects defined in code (`base`) followed
+    by a `MappedCatalog`; catalog entries are materialized on access."""
+
+    def __init__(self, base: Mapping[str, Any], catalog: MappedCatalog, kind: str) -> None:
+        self._base = base
+        self._catalog = catalog
+        self._cases = kind == "case"
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._base.get(key)
+        if value is not None:
+            return value
+        if self._cases:
+            return self._catalog.case(key)
+        if not self._catalog.has_item(key):
+            raise KeyError(key)
+        return self._catalog.item(key)
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        if key in self._base:
+            return True
+        return self._catalog.has_case(key) if self._cases else self._catalog.has_item(key)
+
+    def __iter__(self) -> Iterator[str]:
+        # `compile_catalog` rejects ids that are already in `base`
+        yield from self._base
+        if self._cases:
+            yield from (cid for cid, _ in self._catalog.case_prices())
+        else:
+            yield from self._catalog.item_ids()
+
+    def __len__(self) -> int:
+        return len(self._base) + (self._catalog.case_count if self._cases else self._catalog.item_count)
+
+
+class LazyCatalogSequence(Sequence):
+    """`ITEMS`/`CASES`: the tuple defined in code followed by the catalog
+    entries in file order, materialized on access."""
+
+    def __init__(self, base: Sequence[Any], catalog: MappedCatalog, kind: str) -> None:
+        # entries defined in code (`presets.py`), before the catalog ones
+        self.base = tuple(base)
+        self._catalog = catalog
+        self._cases = kind == "case"
+        self._n = len(self.base) + (catalog.case_count if self._cases else catalog.item_count)
+        self._base_positions = {entry.id: n for n, entry in enumerate(self.base)}
+        # case records carry no file position: decoded once on first `position()`
+        self._case_positions: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return self._n
+
+    def position(self, key: str) -> int:
+        """Index of the entry with id `key` (ValueError if there is none);
+        catalog items are found by a bisect of the index, not a scan."""
+        pos = self._base_positions.get(key)
+        if pos is not None:
+            return pos
+        if self._cases:
+            if self._case_positions is None:
+                self._case_positions = {cid: n for n, (cid, _price) in enumerate(self._catalog.case_prices())}
+            pos = self._case_positions.get(key, -1)
+        else:
+            pos = self._catalog.item_position(key)
+        if pos < 0:
+            raise ValueError(key)
+        return len(self.base) + pos
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(self._n)))
+        if index < 0:
+            index += self._n
+        if not 0 <= index < self._n:
+            raise IndexError(index)
+        if index < len(self.base):
+            return self.base[index]
+        pos = index - len(self.base)
+        return self._catalog.case_at(pos) if self._cases else self._catalog.item_at(pos)
+
+
+def _cache_key(files: List[Path], known_ids: Iterable[str]) -> str:
+    """Like `.pyc` invalidation: file names, sizes and mtimes (plus the ids
+    defined in code) — no need to read the content to detect changes."""
+    h = hashlib.sha256(f"v{_VERSION}".encode())
+    for path in files:
+        st = path.stat()
+        h.update(f"{path.name}\0{st.st_size}\0{st.st_mtime_ns}\0".encode())
+    h.update("\0".join(sorted(known_ids)).encode())
+    return h.hexdigest()[:16]
+
+
+def load_content(
+    directory: Path,
+    fallback_items: Optional[Mapping[str, Item]] = None,
+    known_case_ids: Iterable[str] = (),
+) -> Optional[MappedCatalog]:
+    """Compiled, memory-mapped catalog of the content files in `directory`.
+
+    The index is compiled on first use (or after a content file changes) to
+    `<directory>/__pycache__/catalog-<key>.bin`; later starts only map it.
+    Returns None when the directory has no content files.
+    """
+    directory = Path(directory)
+    files = content_files(directory)
+    if not files:
+        return None
+    known = list(fallback_items or ())
+    known_cases = list(known_case_ids)
+    cache = directory / "__pycache__" / f"catalog-{_cache_key(files, known + known_cases)}.bin"
+    if not cache.exists():
+        items: List[dict] = []
+        cases: List[dict] = []
+        for path in files:
+            file_items, file_cases = read_content_file(path)
+            items.extend(file_items)
+            cases.extend(file_cases)
+        data = compile_catalog(items, cases, known, known_cases)
+        cache.parent.mkdir(exist_ok=True)
+        for stale in cache.parent.glob("catalog-*.bin"):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+        atomic_write(cache, data)
+    return MappedCatalog(cache, fallback_items)
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from collections import ChainMap
+from pathlib import Path
+
 from case_simulator.models.item import Item
 from case_simulator.models.case import Case
 from case_simulator.models.inventory import Inventory
@@ -313,16 +316,60 @@ ITEMS_BY_ID = {it.id: it for it in ITEMS}
 CASES_BY_ID = {c.id: c for c in CASES}
 
 
+# Дополнительный контент из файлов данных (JSON/TOML/CSV в `data/content/`,
+# формат — см. `data/catalog.py`). Файлы компилируются в бинарный индекс,
+# который при старте только отображается в память (mmap); Item/Case создаются
+# лениво при первом обращении по id. ITEMS/CASES/ITEMS_BY_ID/CASES_BY_ID
+# заменяются ленивыми обёртками: сначала то, что определено выше, затем
+# записи из файлов. Без каталога `content/` ничего не меняется.
+CONTENT_DIR = Path(__file__).resolve().parent / "content"
+CONTENT = None
+if CONTENT_DIR.is_dir():
+    from case_simulator.data import catalog as _catalog
+
+    CONTENT = _catalog.load_content(CONTENT_DIR, ITEMS_BY_ID, CASES_BY_ID)
+    if CONTENT is not None:
+        ITEMS = _catalog.LazyCatalogSequence(ITEMS, CONTENT, "item")
+        CASES = _catalog.LazyCatalogSequence(CASES, CONTENT, "case")
+        ITEMS_BY_ID = _catalog.LazyCatalogMapping(ITEMS_BY_ID, CONTENT, "item")
+        CASES_BY_ID = _catalog.LazyCatalogMapping(CASES_BY_ID, CONTENT, "case")
+
+
+# (ITEMS, CASES, каталог предметов, каталог кейсов) — см. `_catalogs`
+_CATALOGS: tuple = ()
+
+
+def _catalogs() -> tuple:
+    """Каталоги для `create_sample_inventory`, собранные один раз (и заново,
+    если ITEMS/CASES заменили). Как при регистрации по одному: первый предмет
+    с данным id побеждает, id интернируются по порядку."""
+    global _CATALOGS
+    if not _CATALOGS or _CATALOGS[0] is not ITEMS or _CATALOGS[1] is not CASES:
+        inv = Inventory()
+        # с файловым контентом регистрируются только предметы из кода, записи
+        # каталога подставляет ChainMap (см. `create_sample_inventory`)
+        for item in ITEMS if CONTENT is None else ITEMS.base:
+            inv.register_item(item)
+        for case in CASES if CONTENT is None else CASES.base:
+            inv.register_case(case)
+        _CATALOGS = (ITEMS, CASES, inv.item_catalog, inv.case_catalog)
+    return _CATALOGS[2], _CATALOGS[3]
+
+
 def create_sample_inventory() -> Inventory:
-    inv = Inventory()
-
-    # Зарегистрируем шаблоны (на будущее, если добавятся новые дропы)
-    # используем коллекции выше, чтобы не перечислять вручную
-    for item in ITEMS:
-        inv.register_item(item)
-    for case in CASES:
-        inv.register_case(case)
-    
+    item_catalog, case_catalog = _catalogs()
+    if CONTENT is not None:
+        # записи из файлов данных читаются лениво через ITEMS_BY_ID/CASES_BY_ID
+        return Inventory(
+            item_catalog=ChainMap(dict(item_catalog), ITEMS_BY_ID),
+            case_catalog=ChainMap(dict(case_catalog), CASES_BY_ID),
+        )
+    inv = Inventory(item_catalog=dict(item_catalog), case_catalog=dict(case_catalog))
+
+    # Шаблоны уже зарегистрированы: каталоги собираются один раз (`_catalogs`,
+    # id интернированы в порядке ITEMS/CASES), здесь только копируются —
+    # без повторной регистрации каждого предмета.
+
     # NOTE: Не добавляем стартовые количества кейсов здесь. Стартовые/подарочные
     # контролируются FREE_PRESET_CASES (ниже) и предоставляются
     # SaveManager при создании нового сохранения или при появлении новых пресетов.
@@ -368,11 +415,16 @@ SHOP_STOCK: dict[str, dict] = {}
 # Если множество пустое, поведение по умолчанию — добавить все кейсы.
 SELLABLE_CASE_IDS: set[str] = set()
 
-for c in CASES:
-    if SELLABLE_CASE_IDS and c.id not in SELLABLE_CASE_IDS:
+# (id, цена) кейсов; для файлового контента — прямо из индекса, без создания Case
+_case_prices = [(c.id, c.price) for c in (CASES if CONTENT is None else CASES.base)]
+if CONTENT is not None:
+    _case_prices.extend(CONTENT.case_prices())
+for _cid, _price in _case_prices:
+    if SELLABLE_CASE_IDS and _cid not in SELLABLE_CASE_IDS:
         # пропускаем кейсы, которые не в белом списке
         continue
-    SHOP_STOCK[c.id] = {"type": "case", "price": c.price, "stock": None}
+    SHOP_STOCK[_cid] = {"type": "case", "price": _price, "stock": None}
+del _case_prices
 
 # Контроль: какие отдельные предметы можно продавать в магазине.
 # По умолчанию разрешаем только VIPERR Tour shirts — перечислите здесь id,
@@ -384,9 +436,17 @@ SELLABLE_ITEM_IDS: set[str] = {
 }
 
 # Добавляем в магазин только те предметы из ITEMS, которые попали в whitelist.
-for it in ITEMS:
-    if it.id in SELLABLE_ITEM_IDS and it.id not in SHOP_STOCK:
+if CONTENT is None:
+    _sellable_items = [it for it in ITEMS if it.id in SELLABLE_ITEM_IDS]
+else:
+    # в порядке ITEMS, но без перебора всего каталога
+    _sellable_items = [
+        ITEMS_BY_ID[iid] for iid in sorted((i for i in SELLABLE_ITEM_IDS if i in ITEMS_BY_ID), key=ITEMS.position)
+    ]
+for it in _sellable_items:
+    if it.id not in SHOP_STOCK:
         SHOP_STOCK[it.id] = {"type": "item", "price": it.price, "stock": None}
+del _sellable_items
 
 
 # Параметры кривой выпадения (используются при выборе предмета из кейса)
@@ -394,7 +454,7 @@ for it in ITEMS:
 # common и rare — редкие предметы становятся ещё реже.
 # DROP_MIN_WEIGHT: нижняя граница веса предмета (чтобы шанс никогда не был нулевым).
 # DROP_WEIGHT_MULTIPLIER: глобальный множитель весов (удобно для быстрого масштабирования).
-# Формула используемая в сцене открытия: weight = max(DROP_MIN_WEIGHT, (1.0 if rare<=0 else 1.0 / (rare ** DROP_RARE_POWER)) * DROP_WEIGHT_MULTIPLIER)
+# Формула (см. `utils/drops.drop_weight`): weight = max(DROP_MIN_WEIGHT, (1.0 if rare<=0 else 1.0 / (rare ** DROP_RARE_POWER)) * DROP_WEIGHT_MULTIPLIER)
 DROP_RARE_POWER: float = 1.5
 DROP_MIN_WEIGHT: float = 0.0005
 DROP_WEIGHT_MULTIPLIER: float = 1.0
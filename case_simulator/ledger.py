@@ -0,0 +1,557 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import struct
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: segments are scanned with struct.iter_unpack
+    np = None
+
+from case_simulator.save_writer import atomic_write
+from case_simulator.utils.stats import BAND_THRESHOLDS
+
+# Типы событий
+OPEN = 1        # выпадение из кейса: case, item, quality, price = скорр. цена
+SALE = 2        # продажа: item, quality (NaN для сводной записи), qty, price = delta = выручка
+CRAFT_IN = 3    # сожжённый при крафте предмет: item, quality, price = скорр. цена
+CRAFT_OUT = 4   # результат крафта: item, quality, price = скорр. цена (0 при неудаче), delta = -стоимость
+EVENT_NAMES = {OPEN: "open", SALE: "sale", CRAFT_IN: "craft_in", CRAFT_OUT: "craft_out"}
+
+# flags
+FLAG_SUCCESS = 1
+
+# ts (unix ms), event, flags, reserved, case ref, item ref, qty, quality, price, balance delta
+RECORD = struct.Struct("<qBBHIIIdqq")
+NO_REF = 0xFFFFFFFF
+DAY_MS = 86_400_000
+SEGMENT_RECORDS = 1 << 16
+BUFFER_RECORDS = 512
+_INDEX_VERSION = 1
+
+if np is not None:
+    _DTYPE = np.dtype([
+        ("ts", "<i8"), ("event", "u1"), ("flags", "u1"), ("reserved", "<u2"),
+        ("case", "<u4"), ("item", "<u4"), ("qty", "<u4"),
+        ("quality", "<f8"), ("price", "<i8"), ("delta", "<i8"),
+    ])
+    assert _DTYPE.itemsize == RECORD.size
+
+
+def quality_band(quality: float) -> int:
+    """Band of `quality`: 0 below 0.99, 1..3 = `utils.stats.BAND_NAMES`; -1 without quality."""
+    if math.isnan(quality):
+        return -1
+    return bisect_right(BAND_THRESHOLDS, quality)
+
+
+@dataclass
+class LedgerStats:
+    """Sum over matching ledger records."""
+
+    count: int = 0            # sum of qty
+    value: int = 0            # sum of price
+    balance_delta: int = 0
+    quality_sum: float = 0.0
+    quality_count: int = 0
+
+    @property
+    def mean_value(self) -> float:
+        """Observed EV per event (e.g. per opened case for OPEN records)."""
+        return self.value / self.count if self.count else 0.0
+
+    @property
+    def mean_quality(self) -> float:
+        return self.quality_sum / self.quality_count if self.quality_count else 0.0
+
+    def add(self, count: int, value: int, delta: int, q_sum: float, q_count: int) -> None:
+        self.count += int(count)
+        self.value += int(value)
+        self.balance_delta += int(delta)
+        self.quality_sum += float(q_sum)
+        self.quality_count += int(q_count)
+
+
+@dataclass(frozen=True)
+class LedgerQuery:
+    """Record filter; None matches anything. Times are unix ms, [start, end)."""
+
+    event: Optional[int] = None
+    case: Optional[int] = None
+    item: Optional[int] = None
+    band: Optional[int] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
+
+    def full_days(self) -> Tuple[float, float]:
+        """[first, last) day numbers lying entirely inside the time range."""
+        lo = -math.inf if self.start is None else -(-self.start // DAY_MS)
+        hi = math.inf if self.end is None else self.end // DAY_MS
+        return lo, hi
+
+    def matches_key(self, event: int, case: int, band: int) -> bool:
+        return (
+            (self.event is None or event == self.event)
+            and (self.case is None or case == self.case)
+            and (self.band is None or band == self.band)
+        )
+
+
+class Ledger:
+    """Append-only binary log of drops, crafts and sales.
+
+    Records are fixed-width (`RECORD`, 48 bytes) and go to numbered segment
+    files `seg-000001.bin`, ... through an in-memory buffer (written on
+    `flush()`, when the buffer fills up, and on `close()`). A segment that
+    reaches `segment_records` is sealed: its index `seg-000001.idx` (JSON)
+    gets the time range and rollups per (day, event, case, quality band) —
+    count, value, balance delta, quality sum. Queries sum the rollups of
+    sealed segments and only scan records on partially covered days, in
+    the open segment and for per-item filters (vectorized with numpy when
+    available).
+
+    Case/item ids are stored as refs into `ids.txt` (one id per line, never
+    rewritten), so the log stays readable when the presets change.
+    `Ledger(None)` is a disabled ledger: recording does nothing.
+    `Ledger(directory, readonly=True)` only queries: it never truncates,
+    seals or opens a segment for writing, so reports can run next to the
+    game (records the game hasn't flushed yet are not visible).
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path],
+        segment_records: int = SEGMENT_RECORDS,
+        buffer_records: int = BUFFER_RECORDS,
+        readonly: bool = False,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self.readonly = readonly
+        self.segment_records = max(1, int(segment_records))
+        self.buffer_records = max(1, int(buffer_records))
+        self._buffer = bytearray()
+        self._buffered = 0
+        self._ids: List[str] = []
+        self._refs: Dict[str, int] = {}
+        self._new_ids: List[str] = []
+        self._fh: Any = None
+        self._segment = 0
+        self._segment_count = 0
+        # path -> (mtime_ns, index)
+        self._index_cache: Dict[Path, Tuple[int, Dict[str, Any]]] = {}
+        if self.directory is not None:
+            if readonly:
+                self._load_ids()
+            else:
+                self._open()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    # --- файлы ---
+    @property
+    def _ids_path(self) -> Path:
+        assert self.directory is not None
+        return self.directory / "ids.txt"
+
+    def _segment_path(self, n: int) -> Path:
+        assert self.directory is not None
+        return self.directory / f"seg-{n:06d}.bin"
+
+    @staticmethod
+    def _index_path(segment: Path) -> Path:
+        return segment.with_suffix(".idx")
+
+    def segments(self) -> List[Path]:
+        if self.directory is None or not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob("seg-*.bin"))
+
+    def _load_ids(self) -> None:
+        if self._ids_path.exists():
+            self._ids = self._ids_path.read_text(encoding="utf-8").splitlines()
+            self._refs = {key: n for n, key in enumerate(self._ids)}
+
+    def _open(self) -> None:
+        assert self.directory is not None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_ids()
+        segments = self.segments()
+        for seg in segments[:-1]:
+            # sealed segments without an index (crash during rotation)
+            if not self._index_path(seg).exists():
+                self._seal(seg)
+        if segments and not self._index_path(segments[-1]).exists():
+            last = segments[-1]
+            size = last.stat().st_size
+            if size % RECORD.size:
+                # torn write at the end: drop the partial record
+                with open(last, "r+b") as fh:
+                    fh.truncate(size - size % RECORD.size)
+            self._segment = int(last.stem.split("-")[1])
+            self._segment_count = size // RECORD.size
+        else:
+            self._segment = int(segments[-1].stem.split("-")[1]) + 1 if segments else 1
+            self._segment_count = 0
+        self._fh = open(self._segment_path(self._segment), "ab")
+
+    # --- запись ---
+    def ref(self, key: Optional[str]) -> int:
+        """Ledger ref of a case/item id (new ids are appended to `ids.txt` on flush)."""
+        if key is None:
+            return NO_REF
+        n = self._refs.get(key)
+        if n is None:
+            n = self._refs[key] = len(self._ids)
+            self._ids.append(key)
+            self._new_ids.append(key)
+        return n
+
+    def lookup(self, key: str) -> int:
+        """Ref of `key`, or -1 if the ledger never saw it."""
+        return self._refs.get(key, -1)
+
+    def append(
+        self,
+        event: int,
+        case_id: Optional[str] = None,
+        item_id: Optional[str] = None,
+        quality: Optional[float] = None,
+        price: int = 0,
+        delta: int = 0,
+        qty: int = 1,
+        flags: int = 0,
+        ts: Optional[int] = None,
+    ) -> None:
+        if self.directory is None:
+            return
+        if self.readonly:
+            raise ValueError("ledger is opened read-only")
+        self._buffer += RECORD.pack(
+            int(time.time() * 1000) if ts is None else int(ts),
+            event,
+            flags,
+            0,
+            self.ref(case_id),
+            self.ref(item_id),
+            int(qty),
+            math.nan if quality is None else float(quality),
+            int(price),
+            int(delta),
+        )
+        self._buffered += 1
+        if self._buffered >= self.buffer_records or self._segment_count + self._buffered >= self.segment_records:
+            self.flush()
+
+    def record_open(self, case_id: str, item_id: str, quality: float, price: int) -> None:
+        self.append(OPEN, case_id, item_id, quality, price)
+
+    def record_open_batch(self, batch: Any) -> None:
+        """One OPEN record per drop of a bulk open (`utils.batch.OpenBatch`)."""
+        if self.directory is None:
+            return
+        ts = int(time.time() * 1000)
+        items = batch.items
+        for i, q, adj in zip(batch.item_index, batch.quality, batch.adjusted_price):
+            self.append(OPEN, batch.case_id, items[int(i)].id, float(q), int(adj), ts=ts)
+
+    def record_sale(self, item_id: str, quality: Optional[float], amount: int, qty: int = 1) -> None:
+        """`qty` copies sold for `amount` in total (quality None for a summary record)."""
+        self.append(SALE, None, item_id, quality, amount, amount, qty)
+
+    def record_sales(self, sales: Iterable[Tuple[str, int, int]]) -> None:
+        """Summary SALE records for (item id, copies, amount) of a bulk sale."""
+        if self.directory is None:
+            return
+        ts = int(time.time() * 1000)
+        for item_id, qty, amount in sales:
+            if qty:
+                self.append(SALE, None, item_id, None, amount, amount, qty, ts=ts)
+
+    def record_craft(
+        self,
+        inputs: Iterable[Tuple[str, float, int]],
+        output_id: Optional[str],
+        output_quality: Optional[float],
+        output_value: int,
+        success: bool,
+        cost: int,
+    ) -> None:
+        """Burned inputs (id, quality, adjusted price) and the result of one craft."""
+        ts = int(time.time() * 1000)
+        for iid, q, value in inputs:
+            self.append(CRAFT_IN, None, iid, q, value, ts=ts)
+        self.append(
+            CRAFT_OUT, None, output_id, output_quality, output_value if success else 0, -int(cost),
+            flags=FLAG_SUCCESS if success else 0, ts=ts,
+        )
+
+    def flush(self) -> None:
+        """Write buffered records (and new ids before them); rotate a full segment."""
+        if self.directory is None or self.readonly:
+            return
+        if self._new_ids:
+            with open(self._ids_path, "a", encoding="utf-8") as fh:
+                fh.writelines(f"{key}\n" for key in self._new_ids)
+            self._new_ids.clear()
+        if self._buffered:
+            self._fh.write(self._buffer)
+            self._fh.flush()
+            self._segment_count += self._buffered
+            self._buffer.clear()
+            self._buffered = 0
+        if self._segment_count >= self.segment_records:
+            self._fh.close()
+            self._seal(self._segment_path(self._segment))
+            self._segment += 1
+            self._segment_count = 0
+            self._fh = open(self._segment_path(self._segment), "ab")
+
+    def close(self) -> None:
+        if self.directory is None or self._fh is None:
+            return
+        self.flush()
+        os.fsync(self._fh.fileno())
+        self._fh.close()
+        self._fh = None
+
+    # --- индекс и свёртки ---
+    def _seal(self, segment: Path) -> None:
+        data = segment.read_bytes()
+        data = data[: len(data) - len(data) % RECORD.size]
+        index = {"version": _INDEX_VERSION, "records": len(data) // RECORD.size, "ts_min": None, "ts_max": None, "rollups": [], "days": None}
+        if data:
+            index.update(_build_rollups(data))
+        atomic_write(self._index_path(segment), json.dumps(index, separators=(",", ":")).encode("utf-8"))
+
+    def _index(self, segment: Path) -> Optional[Dict[str, Any]]:
+        """Parsed index of a sealed segment (None while it is open), with its
+        rollup rows grouped by (event, case) under "by_key"."""
+        path = self._index_path(segment)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return None
+        cached = self._index_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            index = json.loads(path.read_text(encoding="utf-8"))
+            by_key: Dict[Tuple[int, int], List[List[Any]]] = {}
+            for row in index["rollups"]:
+                by_key.setdefault((row[1], row[2]), []).append(row)
+            index["by_key"] = by_key
+            cached = self._index_cache[path] = (mtime, index)
+        return cached[1]
+
+    # --- запросы ---
+    def stats(
+        self,
+        event: Optional[int] = None,
+        case_id: Optional[str] = None,
+        item_id: Optional[str] = None,
+        band: Optional[int] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> LedgerStats:
+        """Totals of the records matching the filter; `start`/`end` are unix
+        seconds ([start, end)), None means unbounded."""
+        out = LedgerStats()
+        if self.directory is None:
+            return out
+        self.flush()
+        refs = []
+        for key in (case_id, item_id):
+            ref = None if key is None else self.lookup(key)
+            if ref == -1:
+                return out  # never recorded
+            refs.append(ref)
+        query = LedgerQuery(
+            event, refs[0], refs[1], band,
+            None if start is None else int(start * 1000),
+            None if end is None else int(end * 1000),
+        )
+        first_day, last_day = query.full_days()
+        for segment in self.segments():
+            index = self._index(segment)
+            if index is None or query.item is not None:
+                # open segment, or a per-item filter the rollups can't answer
+                if index is None or (index["records"] and not _outside(index, query)):
+                    _scan(segment.read_bytes(), query, out)
+                continue
+            if not index["records"] or _outside(index, query):
+                continue
+            if query.event is not None and query.case is not None:
+                rows: Iterable[List[Any]] = index["by_key"].get((query.event, query.case), ())
+            else:
+                rows = index["rollups"]
+            partial = set()
+            for day, ev, case, qband, count, value, delta, q_sum, q_count in rows:
+                if not query.matches_key(ev, case, qband):
+                    continue
+                if first_day <= day < last_day:
+                    out.add(count, value, delta, q_sum, q_count)
+                elif (query.start is None or (day + 1) * DAY_MS > query.start) and (query.end is None or day * DAY_MS < query.end):
+                    partial.add(day)
+            if not partial:
+                continue
+            # boundary days: only their records, the full days came from the rollups
+            if index.get("days") is None:
+                _scan(segment.read_bytes(), query, out, skip_days=(first_day, last_day))
+                continue
+            with open(segment, "rb") as fh:
+                for day, lo, hi in index["days"]:
+                    if day in partial:
+                        fh.seek(lo * RECORD.size)
+                        _scan(fh.read((hi - lo) * RECORD.size), query, out)
+        return out
+
+    def observed_ev(self, case_id: str, start: Optional[float] = None, end: Optional[float] = None) -> LedgerStats:
+        """Drops of `case_id` in the time range: `mean_value` is the observed EV per open."""
+        return self.stats(OPEN, case_id=case_id, start=start, end=end)
+
+    def ids(self) -> Sequence[str]:
+        return tuple(self._ids)
+
+
+def _outside(index: Dict[str, Any], query: LedgerQuery) -> bool:
+    return (query.end is not None and index["ts_min"] >= query.end) or (query.start is not None and index["ts_max"] < query.start)
+
+
+def _bands(quality: Any) -> Any:
+    """numpy version of `quality_band`."""
+    return np.where(np.isnan(quality), -1, np.searchsorted(np.asarray(BAND_THRESHOLDS), np.nan_to_num(quality), side="right"))
+
+
+def _build_rollups(data: bytes) -> Dict[str, Any]:
+    """Time range, rollup rows [day, event, case, band, count, value, delta,
+    q_sum, q_count] and, if the timestamps never go backwards, the record
+    range [day, first, end) of every day ("days", else None)."""
+    if np is not None:
+        rec = np.frombuffer(data, dtype=_DTYPE)
+        q = rec["quality"]
+        has_q = ~np.isnan(q)
+        keys = np.stack([rec["ts"] // DAY_MS, rec["event"].astype(np.int64), rec["case"].astype(np.int64), _bands(q)], axis=1)
+        uniq, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        size = len(uniq)
+        qty = rec["qty"].astype(np.int64)
+        count = np.bincount(inverse, weights=qty, minlength=size)
+        value = np.bincount(inverse, weights=rec["price"], minlength=size)
+        delta = np.bincount(inverse, weights=rec["delta"], minlength=size)
+        q_sum = np.bincount(inverse, weights=np.where(has_q, q, 0.0) * qty, minlength=size)
+        q_count = np.bincount(inverse, weights=np.where(has_q, qty, 0), minlength=size)
+        rows = [
+            key + [int(round(float(count[i]))), int(round(float(value[i]))), int(round(float(delta[i]))), float(q_sum[i]), int(round(float(q_count[i])))]
+            for i, key in enumerate(uniq.tolist())
+        ]
+        days = None
+        ts = rec["ts"]
+        if bool(np.all(ts[1:] >= ts[:-1])):
+            day_col = ts // DAY_MS
+            values, firsts = np.unique(day_col, return_index=True)
+            ends = np.append(firsts[1:], len(rec))
+            days = [[int(d), int(lo), int(hi)] for d, lo, hi in zip(values, firsts, ends)]
+        return {"ts_min": int(ts.min()), "ts_max": int(ts.max()), "rollups": rows, "days": days}
+    groups: Dict[Tuple[int, int, int, int], List[Any]] = {}
+    days: Optional[List[List[int]]] = []
+    ts_min = ts_max = None
+    for n, (ts, event, _flags, _res, case, _item, qty, quality, price, delta) in enumerate(RECORD.iter_unpack(data)):
+        day = ts // DAY_MS
+        if days is not None:
+            if ts_max is not None and ts < ts_max:
+                days = None  # clock went back: no per-day ranges
+            elif not days or days[-1][0] != day:
+                if days:
+                    days[-1][2] = n
+                days.append([day, n, n + 1])
+        if ts_min is None or ts < ts_min:
+            ts_min = ts
+        if ts_max is None or ts > ts_max:
+            ts_max = ts
+        key = (day, event, case, quality_band(quality))
+        row = groups.get(key)
+        if row is None:
+            row = groups[key] = [0, 0, 0, 0.0, 0]
+        row[0] += qty
+        row[1] += price
+        row[2] += delta
+        if quality == quality:  # not NaN
+            row[3] += quality * qty
+            row[4] += qty
+    if days:
+        days[-1][2] = len(data) // RECORD.size
+    return {"ts_min": ts_min, "ts_max": ts_max, "rollups": [list(key) + row for key, row in groups.items()], "days": days}
+
+
+def _scan(data: bytes, query: LedgerQuery, out: LedgerStats, skip_days: Optional[Tuple[float, float]] = None) -> None:
+    """Add the matching records of a raw segment to `out` (records on days
+    in `skip_days` = [first, last) are left out)."""
+    data = data[: len(data) - len(data) % RECORD.size]
+    if not data:
+        return
+    if np is not None:
+        rec = np.frombuffer(data, dtype=_DTYPE)
+        mask = np.ones(len(rec), dtype=bool)
+        if query.event is not None:
+            mask &= rec["event"] == query.event
+        if query.case is not None:
+            mask &= rec["case"] == query.case
+        if query.item is not None:
+            mask &= rec["item"] == query.item
+        if query.start is not None:
+            mask &= rec["ts"] >= query.start
+        if query.end is not None:
+            mask &= rec["ts"] < query.end
+        if skip_days is not None:
+            day = rec["ts"] // DAY_MS
+            mask &= ~((day >= skip_days[0]) & (day < skip_days[1]))
+        if query.band is not None:
+            mask &= _bands(rec["quality"]) == query.band
+        sel = rec[mask]
+        if not len(sel):
+            return
+        qty = sel["qty"].astype(np.int64)
+        has_q = ~np.isnan(sel["quality"])
+        out.add(
+            int(qty.sum()),
+            int(sel["price"].sum()),
+            int(sel["delta"].sum()),
+            float((np.where(has_q, sel["quality"], 0.0) * qty).sum()),
+            int(qty[has_q].sum()),
+        )
+        return
+    event_f, case_f, item_f, band_f = query.event, query.case, query.item, query.band
+    start = -math.inf if query.start is None else query.start
+    end = math.inf if query.end is None else query.end
+    for ts, event, _flags, _res, case, item, qty, quality, price, delta in RECORD.iter_unpack(data):
+        if not start <= ts < end:
+            continue
+        if (event_f is not None and event != event_f) or (case_f is not None and case != case_f) or (item_f is not None and item != item_f):
+            continue
+        if skip_days is not None and skip_days[0] <= ts // DAY_MS < skip_days[1]:
+            continue
+        has_q = quality == quality  # not NaN
+        if band_f is not None and band_f != (bisect_right(BAND_THRESHOLDS, quality) if has_q else -1):
+            continue
+        out.add(qty, price, delta, quality * qty if has_q else 0.0, qty if has_q else 0)
+
+
+# Журнал, в который пишут сцены; по умолчанию выключен, приложение
+# подставляет свой (`set_ledger`) в каталоге сохранения.
+_LEDGER = Ledger(None)
+
+
+def get_ledger() -> Ledger:
+    return _LEDGER
+
+
+def set_ledger(ledger: Ledger) -> None:
+    global _LEDGER
+    _LEDGER = ledger
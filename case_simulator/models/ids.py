@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterator, List, Mapping, MutableMapping, Optional
+
+
+class IdRegistry:
+    """Interns string ids into dense integers 0..n-1.
+
+    Ids are assigned in registration order; `presets.create_sample_inventory`
+    registers `presets.ITEMS`/`presets.CASES` first, so catalog ids get the
+    lowest numbers. Unknown ids (e.g. from an old save) are appended.
+    """
+
+    __slots__ = ("_index", "_keys")
+
+    def __init__(self) -> None:
+        self._index: Dict[str, int] = {}
+        self._keys: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def intern(self, key: str) -> int:
+        idx = self._index.get(key)
+        if idx is None:
+            idx = self._index[key] = len(self._keys)
+            self._keys.append(key)
+        return idx
+
+    def lookup(self, key: str) -> int:
+        """Dense id of `key`, or -1 if it was never interned."""
+        return self._index.get(key, -1)
+
+    def key(self, idx: int) -> str:
+        return self._keys[idx]
+
+
+# Shared registries: every inventory uses the same numbering
+ITEM_IDS = IdRegistry()
+CASE_IDS = IdRegistry()
+
+
+class CountTable(MutableMapping[str, int]):
+    """`Dict[str, int]` replacement backed by a flat `array('q')`.
+
+    Slot i holds the count of the id interned as i in `registry`, or -1 if
+    the key is absent (a stored 0 is kept, like in a dict, so "owned once"
+    and "never seen" stay distinguishable in saves). Iteration follows the
+    dense id order.
+    """
+
+    __slots__ = ("_ids", "_counts", "_size")
+
+    _ABSENT = -1
+
+    def __init__(self, registry: IdRegistry, values: Optional[Mapping[str, int]] = None) -> None:
+        self._ids = registry
+        self._counts = array("q")
+        self._size = 0
+        if values:
+            for key, value in values.items():
+                self[key] = value
+
+    def __getitem__(self, key: str) -> int:
+        idx = self._ids.lookup(key)
+        if 0 <= idx < len(self._counts):
+            value = self._counts[idx]
+            if value >= 0:
+                return value
+        raise KeyError(key)
+
+    def get(self, key: str, default: Optional[int] = None) -> Optional[int]:  # type: ignore[override]
+        idx = self._ids.lookup(key)
+        if 0 <= idx < len(self._counts):
+            value = self._counts[idx]
+            if value >= 0:
+                return value
+        return default
+
+    def __setitem__(self, key: str, value: int) -> None:
+        value = int(value)
+        if value < 0:
+            raise ValueError(f"count must be >= 0, got {value} for {key!r}")
+        idx = self._ids.intern(key)
+        counts = self._counts
+        if idx >= len(counts):
+            counts.extend([self._ABSENT] * (idx + 1 - len(counts)))
+        if counts[idx] < 0:
+            self._size += 1
+        counts[idx] = value
+
+    def __delitem__(self, key: str) -> None:
+        idx = self._ids.lookup(key)
+        if not (0 <= idx < len(self._counts)) or self._counts[idx] < 0:
+            raise KeyError(key)
+        self._counts[idx] = self._ABSENT
+        self._size -= 1
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.get(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        key = self._ids.key
+        for idx, value in enumerate(self._counts):
+            if value >= 0:
+                yield key(idx)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return f"CountTable({dict(self.items())!r})"
@@ -1,24 +1,164 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 
 from case_simulator.models.item import Item
 from case_simulator.models.case import Case
+from case_simulator.models.ids import CASE_IDS, ITEM_IDS, CountTable
+from case_simulator.models.qualities import SortedQualities
 
 
-@dataclass
 class Inventory:
-    """Инвентарь игрока: хранит количество кейсов и предметов + каталоги."""
+    """Инвентарь игрока: хранит количество кейсов и предметов + каталоги.
 
-    item_counts: Dict[str, int] = field(default_factory=dict)
-    case_counts: Dict[str, int] = field(default_factory=dict)
-    item_catalog: Dict[str, Item] = field(default_factory=dict)
-    case_catalog: Dict[str, Case] = field(default_factory=dict)
-    # Per-instance qualities for items owned by the player. Keys are item ids
-    # and values are lists of float qualities (0.0..1.0, 1.0 excluded). This
-    # allows storing different qualities for multiple copies of the same item.
-    item_qualities: Dict[str, List[float]] = field(default_factory=dict)
+    Compact storage: counts live in `CountTable`s (flat `array('q')` indexed
+    by dense ids interned from the catalog), qualities in `SortedQualities`
+    (uint32 codes on the 6-decimal grid). Assigning a plain dict to
+    `item_counts`/`case_counts`/`item_qualities` converts it.
+    """
+
+    __slots__ = (
+        "_item_counts",
+        "_case_counts",
+        "item_catalog",
+        "case_catalog",
+        "_item_qualities",
+        "dirty",
+        "journal",
+        "version",
+    )
+
+    def __init__(
+        self,
+        item_counts: Optional[Mapping[str, int]] = None,
+        case_counts: Optional[Mapping[str, int]] = None,
+        item_catalog: Optional[Dict[str, Item]] = None,
+        case_catalog: Optional[Dict[str, Case]] = None,
+        item_qualities: Optional[Mapping[str, Iterable[float]]] = None,
+    ) -> None:
+        # Bumped on every mutation; views cache their rows per version
+        # (see `utils/inventory_view.py`).
+        self.version = 0
+        self.item_counts = item_counts or {}
+        self.case_counts = case_counts or {}
+        self.item_catalog: Dict[str, Item] = item_catalog if item_catalog is not None else {}
+        self.case_catalog: Dict[str, Case] = case_catalog if case_catalog is not None else {}
+        # Per-instance qualities for items owned by the player. Keys are item ids
+        # and values are sorted quality arrays (0.0..1.0, 1.0 excluded). This
+        # allows storing different qualities for multiple copies of the same item.
+        self.item_qualities = item_qualities or {}
+        # Dirty tracking for incremental saves: names of changed sections
+        # ("items", "cases") and, when enabled by the SaveManager, a journal of
+        # mutations since the last save (see `start_journal`/`drain_journal`).
+        self.dirty: Set[str] = set()
+        self.journal: Optional[List[Tuple[Any, ...]]] = None
+
+    @property
+    def item_counts(self) -> CountTable:
+        return self._item_counts
+
+    @item_counts.setter
+    def item_counts(self, counts: Mapping[str, int]) -> None:
+        self._item_counts = CountTable(ITEM_IDS, counts)
+        self.version += 1
+
+    @property
+    def case_counts(self) -> CountTable:
+        return self._case_counts
+
+    @case_counts.setter
+    def case_counts(self, counts: Mapping[str, int]) -> None:
+        self._case_counts = CountTable(CASE_IDS, counts)
+        self.version += 1
+
+    @property
+    def item_qualities(self) -> Dict[str, SortedQualities]:
+        return self._item_qualities
+
+    @item_qualities.setter
+    def item_qualities(self, qualities: Mapping[str, Iterable[float]]) -> None:
+        self.set_item_qualities(qualities)
+
+    def set_item_qualities(self, qualities: Mapping[str, Iterable[float]]) -> None:
+        """Replace all per-instance qualities (e.g. from a save's plain lists)."""
+        self._item_qualities = {
+            item_id: q if isinstance(q, SortedQualities) else SortedQualities(q)
+            for item_id, q in qualities.items()
+            if len(q) > 0  # type: ignore[arg-type]
+        }
+        self.version += 1
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Inventory):
+            return NotImplemented
+        return (
+            self.item_counts == other.item_counts
+            and self.case_counts == other.case_counts
+            and self.item_catalog == other.item_catalog
+            and self.case_catalog == other.case_catalog
+            and self.item_qualities == other.item_qualities
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"Inventory(item_counts={dict(self.item_counts)!r}, case_counts={dict(self.case_counts)!r}, "
+            f"items_in_catalog={len(self.item_catalog)}, cases_in_catalog={len(self.case_catalog)})"
+        )
+
+    # --- Журнал изменений ---
+    def start_journal(self) -> None:
+        """Start (or restart) recording mutations and clear dirty flags."""
+        self.journal = []
+        self.dirty.clear()
+
+    def drain_journal(self) -> List[Tuple[Any, ...]]:
+        """Return recorded mutations since the last drain and reset them."""
+        records = self.journal or []
+        if self.journal is not None:
+            self.journal = []
+        self.dirty.clear()
+        return records
+
+    def _record(self, section: str, record: Tuple[Any, ...]) -> None:
+        self.version += 1
+        self.dirty.add(section)
+        if self.journal is not None:
+            self.journal.append(record)
+
+    def apply_journal(self, records: Iterable[Tuple[Any, ...]]) -> None:
+        """Replay journal records (produced by this class) without re-recording them.
+
+        Records: ("add", item_id, qty, quality|None), ("add", item_id, qty,
+        [qualities]) for a batch insert, ("remove", item_id, qty,
+        removed_qualities), ("case", case_id, delta).
+        """
+        journal, self.journal = self.journal, None
+        try:
+            for rec in records:
+                op = rec[0]
+                if op == "add":
+                    _, item_id, qty, quality = rec
+                    if isinstance(quality, list):
+                        self._add_qualities_id(item_id, quality)
+                    else:
+                        self._add_item_id(item_id, qty, quality)
+                elif op == "remove":
+                    _, item_id, qty, removed = rec
+                    self.item_counts[item_id] = max(0, self.item_counts.get(item_id, 0) - qty)
+                    qlist = self.item_qualities.get(item_id)
+                    for q in removed:
+                        if qlist and q in qlist:
+                            qlist.remove(q)
+                    if qlist is not None and len(qlist) == 0:
+                        self.item_qualities.pop(item_id, None)
+                elif op == "case":
+                    _, case_id, delta = rec
+                    self.case_counts[case_id] = max(0, self.case_counts.get(case_id, 0) + delta)
+        finally:
+            self.journal = journal
+            self.version += 1
 
     # --- Мутации каталога/количеств ---
     def register_item(self, item: Item) -> None:
@@ -28,9 +168,12 @@ class Inventory:
         # canonical template stored in the catalog.
         if item.id not in self.item_catalog:
             self.item_catalog[item.id] = item
+            # dense id in catalog order (see `models/ids.py`)
+            ITEM_IDS.intern(item.id)
 
     def register_case(self, case: Case) -> None:
         self.case_catalog[case.id] = case
+        CASE_IDS.intern(case.id)
 
     def add_item(self, item: Item, qty: int = 1, quality: float | None = None) -> None:
         """Add `qty` copies of `item` to the inventory.
@@ -40,16 +183,23 @@ class Inventory:
         item is treated as a generic/template copy.
         """
         self.register_item(item)
-        self.item_counts[item.id] = self.item_counts.get(item.id, 0) + max(0, qty)
+        self._add_item_id(item.id, qty, quality)
 
-        if quality is not None:
-            lst = self.item_qualities.setdefault(item.id, [])
-            for _ in range(max(0, qty)):
-                lst.append(float(quality))
+    def _add_item_id(self, item_id: str, qty: int, quality: float | None) -> None:
+        qty = max(0, qty)
+        self.item_counts[item_id] = self.item_counts.get(item_id, 0) + qty
+
+        if quality is not None and qty > 0:
+            qlist = self.item_qualities.get(item_id)
+            if qlist is None:
+                qlist = self.item_qualities[item_id] = SortedQualities()
+            qlist.add(quality, qty)
+        self._record("items", ("add", item_id, qty, None if quality is None else float(quality)))
 
     def add_case(self, case: Case, qty: int = 1) -> None:
         self.register_case(case)
         self.case_counts[case.id] = self.case_counts.get(case.id, 0) + max(0, qty)
+        self._record("cases", ("case", case.id, max(0, qty)))
 
     def remove_case(self, case: Case, qty: int = 1) -> bool:
         """Потратить/удалить кейсы из инвентаря. Возвращает успех операции."""
@@ -58,6 +208,7 @@ class Inventory:
         current = self.case_counts.get(case.id, 0)
         if current >= qty:
             self.case_counts[case.id] = current - qty
+            self._record("cases", ("case", case.id, -qty))
             return True
         return False
 
@@ -69,16 +220,16 @@ class Inventory:
         if current >= qty:
             self.item_counts[item.id] = current - qty
             # Also remove per-instance qualities for the removed copies if we
-            # have stored qualities. We pop from the end (LIFO) which matches
-            # last-added semantics used when items are added with quality.
+            # have stored qualities. Qualities are kept sorted, so the
+            # lowest-quality copies go first and the best ones are kept.
+            removed: List[float] = []
             qlist = self.item_qualities.get(item.id)
-            if qlist and len(qlist) > 0:
-                remove_n = min(qty, len(qlist))
-                for _ in range(remove_n):
-                    qlist.pop()
+            if qlist:
+                removed = qlist.pop_lowest(qty)
                 if len(qlist) == 0:
                     # remove empty list to keep serialization compact
                     self.item_qualities.pop(item.id, None)
+            self._record("items", ("remove", item.id, qty, removed))
             return True
         return False
 
@@ -98,32 +249,73 @@ class Inventory:
             # No per-instance qualities — fall back to removing generic copy
             # by reducing item_counts.
             self.item_counts[item_id] = current - 1
+            self._record("items", ("remove", item_id, 1, []))
             return True
 
-        # find index of closest quality
-        closest_idx = 0
-        closest_diff = abs(qlist[0] - quality)
-        for i, q in enumerate(qlist):
-            d = abs(q - quality)
-            if d < closest_diff:
-                closest_diff = d
-                closest_idx = i
-
-        # remove that quality entry
-        qlist.pop(closest_idx)
+        # closest quality by binary search (qualities are sorted)
+        removed = qlist.pop_closest(quality)
         if len(qlist) == 0:
             self.item_qualities.pop(item_id, None)
 
         # decrement item count
         self.item_counts[item_id] = current - 1
+        self._record("items", ("remove", item_id, 1, [removed]))
         return True
 
+    # --- Пакетные операции ---
+    def remove_items_bulk(self, removals: Mapping[str, Sequence[Optional[float]]]) -> bool:
+        """Remove many copies at once: `removals` maps item id -> qualities of
+        the copies to burn (None = a copy without quality).
+
+        All-or-nothing: if any id has fewer copies than requested nothing is
+        removed and False is returned. Each quality removes the closest stored
+        one (like `remove_item_by_quality`); one journal record per item id.
+        """
+        for item_id, wanted in removals.items():
+            if len(wanted) > self.item_counts.get(item_id, 0):
+                return False
+
+        for item_id, wanted in removals.items():
+            if not wanted:
+                continue
+            self.item_counts[item_id] = self.item_counts.get(item_id, 0) - len(wanted)
+            removed: List[float] = []
+            qlist = self.item_qualities.get(item_id)
+            if qlist:
+                with_q = [q for q in wanted if q is not None]
+                removed = qlist.remove_many(with_q)
+                # copies requested without quality take the lowest ones
+                extra = min(len(wanted) - len(with_q), len(qlist))
+                removed.extend(qlist.pop_lowest(extra))
+                if len(qlist) == 0:
+                    self.item_qualities.pop(item_id, None)
+            self._record("items", ("remove", item_id, len(wanted), removed))
+        return True
+
+    def add_item_qualities(self, item: Item, qualities: Iterable[float]) -> None:
+        """Add one copy of `item` per quality in `qualities` (single sort/merge)."""
+        self.register_item(item)
+        values = [float(q) for q in qualities]
+        if values:
+            self._add_qualities_id(item.id, values)
+
+    def _add_qualities_id(self, item_id: str, values: List[float]) -> None:
+        self.item_counts[item_id] = self.item_counts.get(item_id, 0) + len(values)
+        qlist = self.item_qualities.get(item_id)
+        if qlist is None:
+            self.item_qualities[item_id] = SortedQualities(values)
+        else:
+            qlist.update(values)
+        # one journal record for the whole batch
+        self._record("items", ("add", item_id, len(values), values))
+
     # --- Чтение ---
-    def get_items(self) -> List[Tuple[Item, int]]:
+    def get_items(self, category: Optional[str] = None) -> List[Tuple[Item, int]]:
+        """Owned (item, count) pairs, optionally only of one `category`."""
         result: List[Tuple[Item, int]] = []
         for item_id, count in self.item_counts.items():
             item = self.item_catalog.get(item_id)
-            if item and count > 0:
+            if item and count > 0 and (category is None or item.category == category):
                 result.append((item, count))
         return result
 
@@ -136,10 +328,29 @@ class Inventory:
         return result
 
     # --- Helpers for qualities ---
+    def quality_counts(self) -> Dict[str, int]:
+        """item id -> number of owned copies with a stored quality."""
+        return {item_id: len(qlist) for item_id, qlist in self.item_qualities.items()}
+
     def get_item_qualities(self, item_id: str) -> List[float]:
         """Return the list of qualities for owned instances of `item_id`.
 
         The returned list may be empty even if `item_counts[item_id]` > 0 if
         some copies were added without quality metadata.
         """
-        return list(self.item_qualities.get(item_id, []))
+        return list(self.item_qualities.get(item_id, ()))
+
+    def best_quality(self, item_id: str) -> Optional[float]:
+        """Highest stored quality of `item_id` (None if there are none)."""
+        qlist = self.item_qualities.get(item_id)
+        return qlist.best() if qlist else None
+
+    def count_in_quality_range(self, item_id: str, lo: float, hi: float) -> int:
+        """Number of owned copies of `item_id` with lo <= quality < hi."""
+        qlist = self.item_qualities.get(item_id)
+        return qlist.count_range(lo, hi) if qlist else 0
+
+    def qualities_in_range(self, item_id: str, lo: float, hi: float) -> List[float]:
+        """Qualities of owned copies of `item_id` with lo <= quality < hi (ascending)."""
+        qlist = self.item_qualities.get(item_id)
+        return qlist.range(lo, hi) if qlist else []
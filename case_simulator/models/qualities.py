@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, Iterator, List, Optional
+
+
+# Qualities are generated rounded to 6 decimals, so they are normally stored
+# as uint32 `round(q * 1e6)` (4 bytes per copy). A value that does not
+# round-trip exactly switches the whole item to float64 storage.
+_QUANT = 1_000_000
+_U32_MAX = 0xFFFFFFFF
+_HAS_U32 = array("I").itemsize == 4
+
+
+def _quantize(q: float) -> Optional[int]:
+    """uint32 code of `q`, or None if `q` is not exactly representable."""
+    try:
+        k = int(round(q * _QUANT))
+    except (OverflowError, ValueError):
+        return None
+    if 0 <= k <= _U32_MAX and k / _QUANT == q:
+        return k
+    return None
+
+
+def _lower_code(q: float) -> int:
+    """Smallest code k with k / 1e6 >= q (bisect key for float bounds)."""
+    if q != q or q <= 0.0:
+        return 0
+    if q > _U32_MAX / _QUANT:
+        return _U32_MAX + 1
+    k = math.ceil(q * _QUANT)
+    while k / _QUANT < q:
+        k += 1
+    while (k - 1) / _QUANT >= q:
+        k -= 1
+    return k
+
+
+class SortedQualities:
+    """Качества всех копий одного предмета, отсортированные по возрастанию.
+
+    Backed by a flat ascending array: uint32 codes `round(q * 1e6)` while all
+    qualities are on the 6-decimal grid, float64 otherwise. Lookups are binary
+    searches:
+
+    - `best()` / `worst()` — O(1);
+    - `pop_closest(q)` — O(log n) search + one `memmove` for the deletion;
+    - `count_range()` / `range()` — O(log n) (+ size of the slice).
+
+    Iterates over floats like the old `List[float]`, so serialization and code
+    that only reads the values keep working.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, values: Iterable[float] = ()) -> None:
+        floats = sorted(float(q) for q in values)
+        codes = [_quantize(q) for q in floats] if _HAS_U32 else [None]
+        if None in codes:
+            self._data = array("d", floats)
+        else:
+            self._data = array("I", codes)  # type: ignore[arg-type]
+
+    @property
+    def quantized(self) -> bool:
+        return self._data.typecode == "I"
+
+    def _promote(self) -> None:
+        if self.quantized:
+            self._data = array("d", [k / _QUANT for k in self._data])
+
+    def _value(self, raw: float) -> float:
+        return raw / _QUANT if self.quantized else raw
+
+    def _left(self, q: float) -> int:
+        """Number of stored qualities < q."""
+        if self.quantized:
+            return bisect_left(self._data, _lower_code(q))
+        return bisect_left(self._data, q)
+
+    def _find(self, q: float) -> int:
+        """Index of a copy equal to `q`, or -1."""
+        if self.quantized:
+            code = _quantize(q)
+            if code is None:
+                return -1
+            i = bisect_left(self._data, code)
+            return i if i < len(self._data) and self._data[i] == code else -1
+        i = bisect_left(self._data, q)
+        return i if i < len(self._data) and self._data[i] == q else -1
+
+    # --- list-like read access ---
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __bool__(self) -> bool:
+        return len(self._data) > 0
+
+    def __iter__(self) -> Iterator[float]:
+        if self.quantized:
+            return (k / _QUANT for k in self._data)
+        return iter(self._data)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self._value(v) for v in self._data[index]]
+        return self._value(self._data[index])
+
+    def __contains__(self, quality: object) -> bool:
+        try:
+            q = float(quality)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            return False
+        return self._find(q) >= 0
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SortedQualities):
+            return self.tolist() == other.tolist()
+        if isinstance(other, (list, tuple, array)):
+            return self.tolist() == sorted(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SortedQualities({self.tolist()!r})"
+
+    def tolist(self) -> List[float]:
+        if self.quantized:
+            return [k / _QUANT for k in self._data]
+        return self._data.tolist()
+
+    def as_u32(self) -> Optional[array]:
+        """The uint32 codes (read-only use), or None if stored as float64."""
+        return self._data if self.quantized else None
+
+    # --- mutation ---
+    def add(self, quality: float, n: int = 1) -> None:
+        """Insert `n` copies of `quality` keeping the order."""
+        if n <= 0:
+            return
+        q = float(quality)
+        raw: float = q
+        if self.quantized:
+            code = _quantize(q)
+            if code is None:
+                self._promote()
+            else:
+                raw = code
+        if self.quantized:
+            i = bisect_right(self._data, raw)
+        else:
+            i = bisect_right(self._data, q)
+        if n == 1:
+            self._data.insert(i, raw)  # type: ignore[arg-type]
+        else:
+            self._data[i:i] = array(self._data.typecode, [raw]) * n  # type: ignore[list-item]
+
+    def update(self, qualities: Iterable[float]) -> None:
+        """Insert many qualities at once (one sort instead of n inserts)."""
+        extra = sorted(float(q) for q in qualities)
+        if not extra:
+            return
+        if self.quantized:
+            codes = [_quantize(q) for q in extra]
+            if None in codes:
+                self._promote()
+            else:
+                extra = codes  # type: ignore[assignment]
+        data = self._data
+        if not data or extra[0] >= data[-1]:
+            data.extend(extra)  # type: ignore[arg-type]
+        else:
+            merged = data.tolist() + extra
+            merged.sort()
+            self._data = array(data.typecode, merged)
+
+    def remove(self, quality: float) -> None:
+        """Remove one copy with exactly `quality` (ValueError if absent)."""
+        i = self._find(float(quality))
+        if i < 0:
+            raise ValueError(f"quality {quality!r} not in SortedQualities")
+        del self._data[i]
+
+    def pop(self, index: int = -1) -> float:
+        return self._value(self._data.pop(index))
+
+    def closest_index(self, quality: float) -> int:
+        """Index of the copy closest to `quality` (the lower one on a tie)."""
+        n = len(self._data)
+        if n == 0:
+            raise IndexError("closest_index() on empty SortedQualities")
+        q = float(quality)
+        i = self._left(q)
+        if i == 0:
+            return 0
+        if i == n:
+            return i - 1
+        lower = self._value(self._data[i - 1])
+        upper = self._value(self._data[i])
+        return i - 1 if q - lower <= upper - q else i
+
+    def pop_closest(self, quality: float) -> float:
+        """Remove and return the copy closest to `quality`."""
+        return self.pop(self.closest_index(quality))
+
+    def remove_many(self, qualities: Iterable[float]) -> List[float]:
+        """Remove one copy per requested quality (closest match) and return
+        the removed values (ascending).
+
+        Exact matches are dropped in a single merge pass over the array
+        (O(n + m log m)) instead of m separate deletions; the rest fall back
+        to `pop_closest`.
+        """
+        targets = sorted(float(q) for q in qualities)
+        targets = targets[: len(self._data)]
+        if len(targets) <= 16:
+            return [self.pop_closest(q) for q in targets]
+
+        quantized = self.quantized
+        keys: List[Any] = []
+        missing: List[float] = []
+        for q in targets:
+            key = _quantize(q) if quantized else q
+            if key is None:
+                missing.append(q)
+            else:
+                keys.append(key)
+
+        data = self._data
+        keep = array(data.typecode)
+        removed: List[float] = []
+        j = 0
+        m = len(keys)
+        for raw in data:
+            while j < m and keys[j] < raw:
+                missing.append(self._value(keys[j]))
+                j += 1
+            if j < m and keys[j] == raw:
+                removed.append(self._value(raw))
+                j += 1
+            else:
+                keep.append(raw)
+        missing.extend(self._value(k) for k in keys[j:])
+        self._data = keep
+
+        removed.extend(self.pop_closest(q) for q in missing if self._data)
+        removed.sort()
+        return removed
+
+    def pop_lowest(self, n: int = 1) -> List[float]:
+        """Remove and return the `n` lowest qualities."""
+        n = max(0, min(n, len(self._data)))
+        removed = [self._value(v) for v in self._data[:n]]
+        del self._data[:n]
+        return removed
+
+    # --- queries ---
+    def best(self) -> Optional[float]:
+        return self._value(self._data[-1]) if self._data else None
+
+    def worst(self) -> Optional[float]:
+        return self._value(self._data[0]) if self._data else None
+
+    def count_range(self, lo: float, hi: float) -> int:
+        """Number of copies with lo <= quality < hi."""
+        return max(0, self._left(hi) - self._left(lo))
+
+    def range(self, lo: float, hi: float) -> List[float]:
+        """Copies with lo <= quality < hi (ascending)."""
+        return [self._value(v) for v in self._data[self._left(lo):self._left(hi)]]
@@ -0,0 +1,470 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Set, Tuple
+
+from case_simulator.models.case import Case
+from case_simulator.models.inventory import Inventory
+from case_simulator.models.item import Item
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    item_id  TEXT PRIMARY KEY,
+    category TEXT,
+    count    INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS items_category ON items (category, item_id);
+CREATE TABLE IF NOT EXISTS cases (
+    case_id TEXT PRIMARY KEY,
+    count   INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS qualities (
+    item_id TEXT NOT NULL,
+    quality REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS qualities_item_quality ON qualities (item_id, quality);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Запросы — константы: sqlite3 кэширует подготовленные выражения по тексту SQL
+_ITEM_GET = "SELECT count FROM items WHERE item_id = ?"
+_ITEM_SET = (
+    "INSERT INTO items (item_id, category, count) VALUES (?, ?, ?) "
+    "ON CONFLICT (item_id) DO UPDATE SET count = excluded.count"
+)
+_ITEM_DEL = "DELETE FROM items WHERE item_id = ?"
+_ITEM_ALL = "SELECT item_id, count FROM items ORDER BY item_id"
+_ITEM_OWNED = "SELECT item_id, count FROM items WHERE count > 0 ORDER BY item_id"
+_ITEM_OWNED_IN = "SELECT item_id, count FROM items WHERE category = ? AND count > 0 ORDER BY item_id"
+_CASE_GET = "SELECT count FROM cases WHERE case_id = ?"
+_CASE_SET = "INSERT INTO cases (case_id, count) VALUES (?, ?) ON CONFLICT (case_id) DO UPDATE SET count = excluded.count"
+_CASE_DEL = "DELETE FROM cases WHERE case_id = ?"
+_CASE_ALL = "SELECT case_id, count FROM cases ORDER BY case_id"
+
+_Q_ANY = "SELECT 1 FROM qualities WHERE item_id = ? LIMIT 1"
+_Q_LEN = "SELECT COUNT(*) FROM qualities WHERE item_id = ?"
+_Q_ALL = "SELECT quality FROM qualities WHERE item_id = ? ORDER BY quality"
+_Q_SLICE = "SELECT quality FROM qualities WHERE item_id = ? ORDER BY quality LIMIT ? OFFSET ?"
+_Q_HAS = "SELECT 1 FROM qualities WHERE item_id = ? AND quality = ? LIMIT 1"
+_Q_ADD = "INSERT INTO qualities (item_id, quality) VALUES (?, ?)"
+_Q_DEL_ONE = "DELETE FROM qualities WHERE rowid = (SELECT rowid FROM qualities WHERE item_id = ? AND quality = ? LIMIT 1)"
+_Q_DEL_ROW = "DELETE FROM qualities WHERE rowid = ?"
+_Q_DEL_ITEM = "DELETE FROM qualities WHERE item_id = ?"
+_Q_BELOW = "SELECT rowid, quality FROM qualities WHERE item_id = ? AND quality < ? ORDER BY quality DESC LIMIT 1"
+_Q_ABOVE = "SELECT rowid, quality FROM qualities WHERE item_id = ? AND quality >= ? ORDER BY quality LIMIT 1"
+_Q_LOWEST = "SELECT rowid, quality FROM qualities WHERE item_id = ? ORDER BY quality LIMIT ?"
+_Q_BEST = "SELECT MAX(quality) FROM qualities WHERE item_id = ?"
+_Q_WORST = "SELECT MIN(quality) FROM qualities WHERE item_id = ?"
+_Q_COUNT_RANGE = "SELECT COUNT(*) FROM qualities WHERE item_id = ? AND quality >= ? AND quality < ?"
+_Q_RANGE = "SELECT quality FROM qualities WHERE item_id = ? AND quality >= ? AND quality < ? ORDER BY quality"
+_Q_IDS = "SELECT DISTINCT item_id FROM qualities ORDER BY item_id"
+_Q_NIDS = "SELECT COUNT(DISTINCT item_id) FROM qualities"
+_Q_COUNTS = "SELECT item_id, COUNT(*) FROM qualities GROUP BY item_id"
+
+
+class InventoryStore:
+    """SQLite-файл с инвентарём (`savegame.sqlite`).
+
+    WAL mode with `synchronous=NORMAL`: a commit is an append to the WAL, not
+    a rewrite of the database. Writes open a transaction lazily (`write()`)
+    and stay in it until `commit()`, so everything between two saves is one
+    batched transaction. Besides the inventory tables, `meta` keeps small
+    JSON values (balance, granted presets).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # autocommit mode: transactions are managed by `write`/`commit`
+        self.conn = sqlite3.connect(str(self.path), isolation_level=None, cached_statements=256)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            self.conn.close()
+            raise ValueError(f"{self.path.name}: schema version {version} is newer than supported {SCHEMA_VERSION}")
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def write(self) -> sqlite3.Connection:
+        """Connection inside a (lazily opened) write transaction."""
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+        return self.conn
+
+    def commit(self) -> None:
+        if self.conn.in_transaction:
+            self.conn.execute("COMMIT")
+
+    def checkpoint(self) -> None:
+        """Commit and move the WAL into the main database file."""
+        self.commit()
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        self.commit()
+        self.conn.close()
+
+    # --- meta ---
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key: str, value: Any) -> None:
+        self.write().execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, ensure_ascii=False)),
+        )
+
+
+class SqliteCounts(MutableMapping[str, int]):
+    """`CountTable` replacement backed by the `items` or `cases` table.
+
+    A stored 0 is kept, like in `CountTable`. `items()`/`values()` are one
+    query each instead of a lookup per key.
+    """
+
+    __slots__ = ("_store", "_get", "_set", "_del", "_all", "_clear", "_category")
+
+    def __init__(self, store: InventoryStore, kind: str, category: Optional[Callable[[str], Optional[str]]] = None) -> None:
+        self._store = store
+        if kind == "items":
+            self._get, self._set, self._del, self._all = _ITEM_GET, _ITEM_SET, _ITEM_DEL, _ITEM_ALL
+            self._clear = "DELETE FROM items"
+        else:
+            self._get, self._set, self._del, self._all = _CASE_GET, _CASE_SET, _CASE_DEL, _CASE_ALL
+            self._clear = "DELETE FROM cases"
+        # items only: item id -> category (indexed column)
+        self._category = category
+
+    def _params(self, key: str, value: int) -> Tuple[Any, ...]:
+        if self._category is not None:
+            return (key, self._category(key), int(value))
+        return (key, int(value))
+
+    def __getitem__(self, key: str) -> int:
+        row = self._store.conn.execute(self._get, (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0]
+
+    def get(self, key: str, default: Optional[int] = None) -> Optional[int]:  # type: ignore[override]
+        row = self._store.conn.execute(self._get, (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def __setitem__(self, key: str, value: int) -> None:
+        self._store.write().execute(self._set, self._params(key, value))
+
+    def __delitem__(self, key: str) -> None:
+        if self._store.write().execute(self._del, (key,)).rowcount == 0:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return self._store.conn.execute(self._get, (key,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([key for key, _ in self.items()])
+
+    def __len__(self) -> int:
+        return len(self.items())
+
+    def items(self) -> List[Tuple[str, int]]:  # type: ignore[override]
+        return self._store.conn.execute(self._all).fetchall()
+
+    def values(self) -> List[int]:  # type: ignore[override]
+        return [count for _, count in self.items()]
+
+    def replace(self, counts: Mapping[str, int]) -> None:
+        """Replace the whole table with `counts` (one `executemany`)."""
+        conn = self._store.write()
+        conn.execute(self._clear)
+        conn.executemany(self._set, (self._params(key, value) for key, value in counts.items()))
+
+    def __repr__(self) -> str:
+        return f"SqliteCounts({dict(self.items())!r})"
+
+
+class SqliteQualities:
+    """Qualities of one item in the `qualities` table (the `SortedQualities` API).
+
+    Every lookup is a query on the (item_id, quality) index: the closest
+    copy is the neighbour below plus the one above, ranges are index range
+    scans, and nothing is cached in Python.
+    """
+
+    __slots__ = ("_store", "item_id")
+
+    def __init__(self, store: InventoryStore, item_id: str) -> None:
+        self._store = store
+        self.item_id = item_id
+
+    def _one(self, sql: str, *params: Any) -> Any:
+        return self._store.conn.execute(sql, (self.item_id, *params)).fetchone()
+
+    def _column(self, sql: str, *params: Any) -> List[float]:
+        return [row[0] for row in self._store.conn.execute(sql, (self.item_id, *params))]
+
+    # --- list-like read access ---
+    def __len__(self) -> int:
+        return self._one(_Q_LEN)[0]
+
+    def __bool__(self) -> bool:
+        return self._one(_Q_ANY) is not None
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.tolist())
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self.tolist()[index]
+            return self._column(_Q_SLICE, max(0, stop - start), start)
+        n = len(self)
+        i = index + n if index < 0 else index
+        if not 0 <= i < n:
+            raise IndexError("SqliteQualities index out of range")
+        return self._one(_Q_SLICE, 1, i)[0]
+
+    def __contains__(self, quality: object) -> bool:
+        try:
+            q = float(quality)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            return False
+        return self._one(_Q_HAS, q) is not None
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SqliteQualities) or hasattr(other, "tolist"):
+            return self.tolist() == other.tolist()  # type: ignore[union-attr]
+        if isinstance(other, (list, tuple)):
+            return self.tolist() == sorted(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"SqliteQualities({self.item_id!r}, n={len(self)})"
+
+    def tolist(self) -> List[float]:
+        return self._column(_Q_ALL)
+
+    # --- mutation ---
+    def add(self, quality: float, n: int = 1) -> None:
+        if n > 0:
+            q = float(quality)
+            self._store.write().executemany(_Q_ADD, [(self.item_id, q)] * n)
+
+    def update(self, qualities: Iterable[float]) -> None:
+        self._store.write().executemany(_Q_ADD, ((self.item_id, float(q)) for q in qualities))
+
+    def remove(self, quality: float) -> None:
+        """Remove one copy with exactly `quality` (ValueError if absent)."""
+        if self._store.write().execute(_Q_DEL_ONE, (self.item_id, float(quality))).rowcount == 0:
+            raise ValueError(f"quality {quality!r} not in SqliteQualities")
+
+    def pop_closest(self, quality: float) -> float:
+        """Remove and return the copy closest to `quality` (the lower one on a tie)."""
+        q = float(quality)
+        below = self._one(_Q_BELOW, q)
+        above = self._one(_Q_ABOVE, q)
+        if below is None and above is None:
+            raise IndexError("pop_closest() on empty SqliteQualities")
+        if above is None or (below is not None and q - below[1] <= above[1] - q):
+            rowid, value = below
+        else:
+            rowid, value = above
+        self._store.write().execute(_Q_DEL_ROW, (rowid,))
+        return value
+
+    def remove_many(self, qualities: Iterable[float]) -> List[float]:
+        """Remove one copy per requested quality (closest match) and return
+        the removed values (ascending). Exact matches are single indexed
+        deletes; the rest fall back to `pop_closest`."""
+        conn = self._store.write()
+        removed: List[float] = []
+        missing: List[float] = []
+        for q in sorted(float(q) for q in qualities):
+            if conn.execute(_Q_DEL_ONE, (self.item_id, q)).rowcount:
+                removed.append(q)
+            else:
+                missing.append(q)
+        for q in missing:
+            if not self:
+                break
+            removed.append(self.pop_closest(q))
+        removed.sort()
+        return removed
+
+    def pop_lowest(self, n: int = 1) -> List[float]:
+        """Remove and return the `n` lowest qualities."""
+        if n <= 0:
+            return []
+        rows = self._store.conn.execute(_Q_LOWEST, (self.item_id, n)).fetchall()
+        self._store.write().executemany(_Q_DEL_ROW, ((rowid,) for rowid, _ in rows))
+        return [q for _, q in rows]
+
+    # --- queries ---
+    def best(self) -> Optional[float]:
+        return self._one(_Q_BEST)[0]
+
+    def worst(self) -> Optional[float]:
+        return self._one(_Q_WORST)[0]
+
+    def count_range(self, lo: float, hi: float) -> int:
+        """Number of copies with lo <= quality < hi."""
+        return self._one(_Q_COUNT_RANGE, float(lo), float(hi))[0]
+
+    def range(self, lo: float, hi: float) -> List[float]:
+        """Copies with lo <= quality < hi (ascending)."""
+        return self._column(_Q_RANGE, float(lo), float(hi))
+
+
+class SqliteQualityMap(MutableMapping[str, SqliteQualities]):
+    """item id -> `SqliteQualities`; only items with at least one stored quality are keys."""
+
+    __slots__ = ("_store",)
+
+    def __init__(self, store: InventoryStore) -> None:
+        self._store = store
+
+    def __getitem__(self, item_id: str) -> SqliteQualities:
+        qlist = SqliteQualities(self._store, item_id)
+        if not qlist:
+            raise KeyError(item_id)
+        return qlist
+
+    def get(self, item_id: str, default: Any = None) -> Any:  # type: ignore[override]
+        qlist = SqliteQualities(self._store, item_id)
+        return qlist if qlist else default
+
+    def __contains__(self, item_id: object) -> bool:
+        return self._store.conn.execute(_Q_ANY, (item_id,)).fetchone() is not None
+
+    def __setitem__(self, item_id: str, qualities: Iterable[float]) -> None:
+        conn = self._store.write()
+        conn.execute(_Q_DEL_ITEM, (item_id,))
+        conn.executemany(_Q_ADD, ((item_id, float(q)) for q in qualities))
+
+    def __delitem__(self, item_id: str) -> None:
+        if self._store.write().execute(_Q_DEL_ITEM, (item_id,)).rowcount == 0:
+            raise KeyError(item_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([row[0] for row in self._store.conn.execute(_Q_IDS)])
+
+    def __len__(self) -> int:
+        return self._store.conn.execute(_Q_NIDS).fetchone()[0]
+
+    def counts(self) -> Dict[str, int]:
+        """item id -> number of stored qualities (one GROUP BY over the index)."""
+        return dict(self._store.conn.execute(_Q_COUNTS).fetchall())
+
+    def replace(self, qualities: Mapping[str, Iterable[float]]) -> None:
+        conn = self._store.write()
+        conn.execute("DELETE FROM qualities")
+        # в порядке индекса: вставки идут в конец B-дерева
+        conn.executemany(_Q_ADD, ((item_id, float(q)) for item_id in sorted(qualities) for q in sorted(qualities[item_id])))
+
+
+class SqliteInventory(Inventory):
+    """`Inventory` whose counts and qualities live in an `InventoryStore`.
+
+    Same API as `Inventory`: `item_counts`/`case_counts` are `SqliteCounts`,
+    `item_qualities` a `SqliteQualityMap`, so the base class mutations run
+    unchanged as indexed statements. Nothing is loaded at construction —
+    only the catalogs are in memory. Changes become durable on
+    `store.commit()` (see `SqliteSaveManager`), so no mutation journal is
+    kept.
+    """
+
+    __slots__ = ("store",)
+
+    def __init__(
+        self,
+        store: InventoryStore,
+        item_catalog: Optional[Dict[str, Item]] = None,
+        case_catalog: Optional[Dict[str, Case]] = None,
+    ) -> None:
+        self.store = store
+        self.version = 0
+        self.item_catalog: Dict[str, Item] = item_catalog if item_catalog is not None else {}
+        self.case_catalog: Dict[str, Case] = case_catalog if case_catalog is not None else {}
+        self._item_counts = SqliteCounts(store, "items", category=self._category)
+        self._case_counts = SqliteCounts(store, "cases")
+        self._item_qualities = SqliteQualityMap(store)
+        self.dirty: Set[str] = set()
+        self.journal: Optional[List[Tuple[Any, ...]]] = None
+
+    def _category(self, item_id: str) -> Optional[str]:
+        item = self.item_catalog.get(item_id)
+        return item.category if item is not None else None
+
+    @property
+    def item_counts(self) -> SqliteCounts:  # type: ignore[override]
+        return self._item_counts
+
+    @item_counts.setter
+    def item_counts(self, counts: Mapping[str, int]) -> None:
+        self._item_counts.replace(counts)
+        self.version += 1
+
+    @property
+    def case_counts(self) -> SqliteCounts:  # type: ignore[override]
+        return self._case_counts
+
+    @case_counts.setter
+    def case_counts(self, counts: Mapping[str, int]) -> None:
+        self._case_counts.replace(counts)
+        self.version += 1
+
+    @property
+    def item_qualities(self) -> SqliteQualityMap:  # type: ignore[override]
+        return self._item_qualities
+
+    @item_qualities.setter
+    def item_qualities(self, qualities: Mapping[str, Iterable[float]]) -> None:
+        self.set_item_qualities(qualities)
+
+    def set_item_qualities(self, qualities: Mapping[str, Iterable[float]]) -> None:
+        self._item_qualities.replace(qualities)
+        self.version += 1
+
+    def start_journal(self) -> None:
+        # изменения уже в базе: журнал не нужен
+        self.dirty.clear()
+
+    def _add_item_id(self, item_id: str, qty: int, quality: float | None) -> None:
+        # как в Inventory, но качества дописываются прямо в таблицу
+        qty = max(0, qty)
+        self.item_counts[item_id] = self.item_counts.get(item_id, 0) + qty
+        if quality is not None and qty > 0:
+            SqliteQualities(self.store, item_id).add(quality, qty)
+        self._record("items", ("add", item_id, qty, None if quality is None else float(quality)))
+
+    def import_from(self, inventory: Inventory) -> None:
+        """Replace the stored contents with those of another inventory."""
+        self.item_counts = inventory.item_counts
+        self.case_counts = inventory.case_counts
+        self.set_item_qualities(inventory.item_qualities)
+
+    def get_items(self, category: Optional[str] = None) -> List[Tuple[Item, int]]:
+        if category is None:
+            rows = self.store.conn.execute(_ITEM_OWNED)
+        else:
+            rows = self.store.conn.execute(_ITEM_OWNED_IN, (category,))
+        result: List[Tuple[Item, int]] = []
+        for item_id, count in rows:
+            item = self.item_catalog.get(item_id)
+            if item:
+                result.append((item, count))
+        return result
+
+    def quality_counts(self) -> Dict[str, int]:
+        return self._item_qualities.counts()
@@ -0,0 +1,441 @@
+from __future__ import annotations
+
+import base64
+import io
+import json
+import struct
+import sys
+from array import array
+from typing import Any, BinaryIO, Dict, List, Tuple
+
+
+# Binary save format (version 2)
+#
+#   header  : MAGIC (4 bytes) | version u8 | flags u8 | generation varint (v2+)
+#   body    : XOR-obfuscated with the save key (if FLAG_XOR), then:
+#     balance                      zigzag varint
+#     granted_presets              varint count, count * str
+#     case_counts                  varint count, count * (str, zigzag varint)
+#     item_counts                  varint count, count * (str, zigzag varint)
+#     item_qualities               varint count, count * (str, u8 encoding, varint n, packed array)
+#
+#   str = varint byte length + UTF-8 bytes. Packed arrays are little-endian:
+#   QUALITY_F64 stores float64 as is; QUALITY_U32 stores round(q * 1e6) as
+#   uint32, used when every quality of the item has at most 6 decimals (the
+#   normal case), which halves the size without losing precision.
+#
+# The legacy format is base64(XOR(json)) and is still readable.
+#
+# Journal file (incremental saves, appended after a snapshot):
+#
+#   header  : JOURNAL_MAGIC (4 bytes) | version u8 | generation varint
+#   frames  : varint length | payload (XOR-obfuscated), payload = records
+#   record  : op u8 + fields, see JOURNAL_OPS
+#
+# A journal only applies to the snapshot with the same generation. A frame
+# cut short by a crash is ignored together with everything after it.
+
+MAGIC = b"\x89CSS"
+VERSION = 2
+FLAG_XOR = 0x01
+
+JOURNAL_MAGIC = b"\x89CSJ"
+JOURNAL_VERSION = 1
+
+OP_ADD = 1        # str item_id, varint qty, u8 has_quality, f64 quality (has_quality 2: qty f64 qualities)
+OP_REMOVE = 2     # str item_id, varint qty, varint n, n * f64 removed qualities
+OP_CASE = 3       # str case_id, zigzag delta
+OP_BALANCE = 4    # zigzag balance
+OP_GRANTED = 5    # varint n, n * str
+JOURNAL_OPS = {"add": OP_ADD, "remove": OP_REMOVE, "case": OP_CASE, "balance": OP_BALANCE, "granted": OP_GRANTED}
+
+_F64 = struct.Struct("<d")
+
+QUALITY_F64 = 0
+QUALITY_U32 = 1
+_QUANT = 1_000_000
+
+_LITTLE = sys.byteorder == "little"
+
+
+class SaveFormatError(ValueError):
+    """Raised when a save file cannot be decoded."""
+
+
+# --- XOR obfuscation ---
+def xor_bytes(data: bytes, key: bytes, offset: int = 0) -> bytes:
+    """XOR `data` with the cyclic `key`, starting at key position `offset`.
+
+    Works on the whole buffer at once through big integers instead of a
+    per-byte Python loop.
+    """
+    n = len(data)
+    if n == 0 or not key:
+        return bytes(data)
+    start = offset % len(key)
+    reps = (start + n) // len(key) + 1
+    stream = (key * reps)[start:start + n]
+    x = int.from_bytes(data, "little") ^ int.from_bytes(stream, "little")
+    return x.to_bytes(n, "little")
+
+
+# --- primitive encoders ---
+def _write_varint(out: bytearray, value: int) -> None:
+    if value < 0:
+        raise ValueError("varint must be non-negative")
+    while True:
+        b = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _write_str(out: bytearray, s: str) -> None:
+    raw = s.encode("utf-8")
+    _write_varint(out, len(raw))
+    out += raw
+
+
+def _pack_qualities(out: bytearray, qualities: Any) -> None:
+    # Already quantized storage (`SortedQualities`) is written as is
+    codes = getattr(qualities, "as_u32", None)
+    codes = codes() if codes is not None else None
+    if codes is not None:
+        out.append(QUALITY_U32)
+        _write_varint(out, len(codes))
+        out += codes.tobytes() if _LITTLE else _byteswapped(codes)
+        return
+
+    qualities = list(qualities)
+    quantized = array("I")
+    if quantized.itemsize == 4:
+        try:
+            quantized.extend(int(round(q * _QUANT)) for q in qualities)
+            exact = all(k / _QUANT == q for k, q in zip(quantized, qualities))
+        except (OverflowError, ValueError):
+            exact = False
+    else:
+        exact = False
+
+    if exact:
+        packed = quantized
+        out.append(QUALITY_U32)
+    else:
+        packed = array("d", qualities)
+        out.append(QUALITY_F64)
+    _write_varint(out, len(packed))
+    if not _LITTLE:
+        packed.byteswap()
+    out += packed.tobytes()
+
+
+def _byteswapped(values: array) -> bytes:
+    swapped = array(values.typecode, values)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+def _write_counts(out: bytearray, counts: Dict[str, int]) -> None:
+    _write_varint(out, len(counts))
+    for key, value in counts.items():
+        _write_str(out, key)
+        _write_varint(out, _zigzag(int(value)))
+
+
+def encode_save(data: Dict[str, Any], key: bytes | None = None, generation: int = 0) -> bytes:
+    """Encode a save dict (same keys as the legacy JSON) into the binary format."""
+    body = bytearray()
+    _write_varint(body, _zigzag(int(data.get("balance", 0))))
+
+    granted = list(data.get("granted_presets", []))
+    _write_varint(body, len(granted))
+    for pid in granted:
+        _write_str(body, pid)
+
+    _write_counts(body, data.get("case_counts", {}))
+    _write_counts(body, data.get("item_counts", {}))
+
+    qualities = data.get("item_qualities", {})
+    _write_varint(body, len(qualities))
+    for item_id, qlist in qualities.items():
+        _write_str(body, item_id)
+        _pack_qualities(body, qlist)
+
+    flags = FLAG_XOR if key else 0
+    header = bytearray(MAGIC + bytes((VERSION, flags)))
+    _write_varint(header, generation)
+    payload = xor_bytes(bytes(body), key) if key else bytes(body)
+    return bytes(header) + payload
+
+
+# --- streaming reader ---
+class _StreamReader:
+    """Primitive decoder over a binary stream, de-obfuscating block by block."""
+
+    BLOCK = 1 << 16
+
+    def __init__(self, stream: BinaryIO, key: bytes | None = None) -> None:
+        self._stream = stream
+        self._key = key
+        self._buf = b""
+        self._pos = 0
+        self._consumed = 0  # obfuscated bytes pulled from the stream so far
+
+    def _fill(self, need: int) -> None:
+        while len(self._buf) - self._pos < need:
+            chunk = self._stream.read(max(self.BLOCK, need))
+            if not chunk:
+                raise SaveFormatError("unexpected end of save file")
+            if self._key:
+                chunk = xor_bytes(chunk, self._key, self._consumed)
+            self._consumed += len(chunk)
+            self._buf = self._buf[self._pos:] + chunk
+            self._pos = 0
+
+    def read(self, n: int) -> bytes:
+        self._fill(n)
+        out = self._buf[self._pos:self._pos + n]
+        self._pos += n
+        return out
+
+    def read_varint(self) -> int:
+        shift = 0
+        result = 0
+        while True:
+            self._fill(1)
+            b = self._buf[self._pos]
+            self._pos += 1
+            result |= (b & 0x7F) << shift
+            if not b & 0x80:
+                return result
+            shift += 7
+
+    def read_str(self) -> str:
+        return self.read(self.read_varint()).decode("utf-8")
+
+    def read_f64(self) -> float:
+        return _F64.unpack(self.read(8))[0]
+
+    def tell(self) -> int:
+        """Offset in the stream of the next unread byte."""
+        return self._consumed - (len(self._buf) - self._pos)
+
+    def at_end(self) -> bool:
+        if len(self._buf) - self._pos > 0:
+            return False
+        try:
+            self._fill(1)
+        except SaveFormatError:
+            return True
+        return False
+
+
+def _read_raw_varint(stream: BinaryIO) -> int:
+    shift = 0
+    result = 0
+    while True:
+        b = stream.read(1)
+        if not b:
+            raise SaveFormatError("unexpected end of save header")
+        result |= (b[0] & 0x7F) << shift
+        if not b[0] & 0x80:
+            return result
+        shift += 7
+
+
+class SaveReader(_StreamReader):
+    """Incremental reader of the binary format over any binary stream.
+
+    Data is pulled from the stream in blocks and de-obfuscated block by
+    block, so a save never has to be held twice in memory.
+    """
+
+    def __init__(self, stream: BinaryIO, key: bytes | None = None) -> None:
+        super().__init__(stream)
+        header = stream.read(len(MAGIC) + 2)
+        if len(header) < len(MAGIC) + 2 or header[: len(MAGIC)] != MAGIC:
+            raise SaveFormatError("not a binary save file")
+        self.version = header[len(MAGIC)]
+        if self.version not in (1, VERSION):
+            raise SaveFormatError(f"unsupported save version {self.version}")
+        flags = header[len(MAGIC) + 1]
+        if flags & FLAG_XOR and not key:
+            raise SaveFormatError("save is obfuscated but no key was given")
+        # the generation is part of the plain header: read it byte by byte so
+        # that no body bytes are buffered before the key is set
+        self.generation = _read_raw_varint(stream) if self.version >= 2 else 0
+        self._key = key if flags & FLAG_XOR else None
+
+    def read_counts(self) -> Dict[str, int]:
+        result: Dict[str, int] = {}
+        for _ in range(self.read_varint()):
+            k = self.read_str()
+            result[k] = _unzigzag(self.read_varint())
+        return result
+
+    def read_qualities(self) -> List[float]:
+        encoding = self.read(1)[0]
+        n = self.read_varint()
+        if encoding == QUALITY_U32:
+            packed = array("I")
+        elif encoding == QUALITY_F64:
+            packed = array("d")
+        else:
+            raise SaveFormatError(f"unknown quality encoding {encoding}")
+        packed.frombytes(self.read(n * packed.itemsize))
+        if not _LITTLE:
+            packed.byteswap()
+        if encoding == QUALITY_U32:
+            return [k / _QUANT for k in packed]
+        return packed.tolist()
+
+    def read_all(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"balance": _unzigzag(self.read_varint())}
+        data["granted_presets"] = [self.read_str() for _ in range(self.read_varint())]
+        data["case_counts"] = self.read_counts()
+        data["item_counts"] = self.read_counts()
+        qualities: Dict[str, List[float]] = {}
+        for _ in range(self.read_varint()):
+            item_id = self.read_str()
+            qualities[item_id] = self.read_qualities()
+        data["item_qualities"] = qualities
+        return data
+
+
+def encode_journal_header(generation: int) -> bytes:
+    out = bytearray(JOURNAL_MAGIC + bytes((JOURNAL_VERSION,)))
+    _write_varint(out, generation)
+    return bytes(out)
+
+
+def encode_journal_frame(records: List[Tuple[Any, ...]], key: bytes | None = None) -> bytes:
+    """Encode one batch of journal records as an appendable frame."""
+    body = bytearray()
+    for rec in records:
+        op = JOURNAL_OPS[rec[0]]
+        body.append(op)
+        if op == OP_ADD:
+            _, item_id, qty, quality = rec
+            _write_str(body, item_id)
+            _write_varint(body, qty)
+            if isinstance(quality, list):
+                # batch insert: one quality per copy
+                body.append(2)
+                for q in quality:
+                    body += _F64.pack(q)
+            else:
+                body.append(0 if quality is None else 1)
+                body += _F64.pack(0.0 if quality is None else quality)
+        elif op == OP_REMOVE:
+            _, item_id, qty, removed = rec
+            _write_str(body, item_id)
+            _write_varint(body, qty)
+            _write_varint(body, len(removed))
+            for q in removed:
+                body += _F64.pack(q)
+        elif op == OP_CASE:
+            _, case_id, delta = rec
+            _write_str(body, case_id)
+            _write_varint(body, _zigzag(delta))
+        elif op == OP_BALANCE:
+            _write_varint(body, _zigzag(rec[1]))
+        elif op == OP_GRANTED:
+            _write_varint(body, len(rec[1]))
+            for pid in rec[1]:
+                _write_str(body, pid)
+    frame = bytearray()
+    _write_varint(frame, len(body))
+    frame += xor_bytes(bytes(body), key) if key else bytes(body)
+    return bytes(frame)
+
+
+def _read_record(r: _StreamReader) -> Tuple[Any, ...]:
+    op = r.read(1)[0]
+    if op == OP_ADD:
+        item_id = r.read_str()
+        qty = r.read_varint()
+        has_q = r.read(1)[0]
+        if has_q == 2:
+            return ("add", item_id, qty, [r.read_f64() for _ in range(qty)])
+        q = r.read_f64()
+        return ("add", item_id, qty, q if has_q else None)
+    if op == OP_REMOVE:
+        item_id = r.read_str()
+        qty = r.read_varint()
+        removed = [r.read_f64() for _ in range(r.read_varint())]
+        return ("remove", item_id, qty, removed)
+    if op == OP_CASE:
+        case_id = r.read_str()
+        return ("case", case_id, _unzigzag(r.read_varint()))
+    if op == OP_BALANCE:
+        return ("balance", _unzigzag(r.read_varint()))
+    if op == OP_GRANTED:
+        return ("granted", [r.read_str() for _ in range(r.read_varint())])
+    raise SaveFormatError(f"unknown journal op {op}")
+
+
+def read_journal(raw: bytes, key: bytes | None = None) -> Tuple[int, List[Tuple[Any, ...]], int]:
+    """Decode a journal file. Returns (generation, records, end).
+
+    Complete frames are returned; a truncated or corrupt tail frame (e.g. a
+    crash mid-append) and anything after it is dropped. `end` is the offset
+    just past the last complete frame: if it is less than `len(raw)`, the
+    tail must be cut off before appending more frames.
+    """
+    head = _StreamReader(io.BytesIO(raw))
+    if head.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+        raise SaveFormatError("not a journal file")
+    if head.read(1)[0] != JOURNAL_VERSION:
+        raise SaveFormatError("unsupported journal version")
+    generation = head.read_varint()
+    end = head.tell()
+
+    records: List[Tuple[Any, ...]] = []
+    while not head.at_end():
+        try:
+            size = head.read_varint()
+            payload = head.read(size)
+        except SaveFormatError:
+            break
+        body = xor_bytes(payload, key) if key else payload
+        frame = _StreamReader(io.BytesIO(body))
+        batch: List[Tuple[Any, ...]] = []
+        try:
+            while not frame.at_end():
+                batch.append(_read_record(frame))
+        except (SaveFormatError, IndexError, UnicodeDecodeError):
+            break
+        records.extend(batch)
+        end = head.tell()
+    return generation, records, end
+
+
+def decode_save(raw: bytes, key: bytes | None = None) -> Dict[str, Any]:
+    """Decode a binary save held in memory."""
+    return SaveReader(io.BytesIO(raw), key).read_all()
+
+
+def is_binary_save(prefix: bytes) -> bool:
+    return prefix[: len(MAGIC)] == MAGIC
+
+
+# --- legacy format: base64(XOR(json)) ---
+def encode_legacy(data: Dict[str, Any], key: bytes) -> bytes:
+    json_str = json.dumps(data, ensure_ascii=False, indent=2)
+    return base64.b64encode(xor_bytes(json_str.encode("utf-8"), key))
+
+
+def decode_legacy(raw: bytes, key: bytes) -> Dict[str, Any]:
+    decoded = base64.b64decode(raw)
+    return json.loads(xor_bytes(decoded, key).decode("utf-8"))
@@ -1,27 +1,157 @@
 from __future__ import annotations
 
-import base64
-import json
 from pathlib import Path
 from typing import Any, Dict
 
 from case_simulator.state import GameState
 from case_simulator.models.inventory import Inventory
 from case_simulator.data import presets
+from case_simulator.save_codec import (
+    MAGIC,
+    SaveReader,
+    decode_legacy,
+    encode_journal_frame,
+    encode_journal_header,
+    encode_save,
+    is_binary_save,
+    read_journal,
+)
+from case_simulator.save_writer import SaveWriter, append_durable, atomic_write, backup_path
+from case_simulator.utils.metrics import METRICS
 
 
 class SaveManager:
-    """Управление сохранением/загрузкой состояния игры с базовым шифрованием."""
+    """Управление сохранением/загрузкой состояния игры с базовым шифрованием.
+
+    Формат файла — бинарный (см. `save_codec.py`). Старые сохранения
+    base64(XOR(json)) читаются и автоматически пересохраняются в новом формате.
+
+    Сохранение инкрементальное: после полного снимка (`savegame.dat`)
+    изменения дописываются в журнал (`savegame.journal`), а раз в
+    `COMPACT_EVERY` записей журнал сворачивается в новый снимок.
+
+    Запись атомарная (временный файл + fsync + `os.replace`), предыдущие
+    снимки хранятся как `savegame.dat.bak1..N`, и `load()` пробует их,
+    прежде чем сбросить прогресс. С `background=True` запись идёт в
+    отдельном потоке (`SaveWriter`); `close()` дожидается её завершения.
+
+    Если запись не удалась, следующий `save()` делает полный снимок (журнал
+    на диске мог отстать от памяти). Ошибка фоновой записи сообщается в
+    основном потоке: `save()` печатает её, `flush()`/`close()` её поднимают;
+    последняя хранится в `last_error`.
+    """
 
     _SAVE_FILE = "savegame.dat"
+    _JOURNAL_FILE = "savegame.journal"
     _XOR_KEY = b"case_simulator_secret_key_2025"
+    # После стольких записей журнала делаем новый полный снимок
+    COMPACT_EVERY = 5000
+    # Сколько предыдущих снимков хранить (savegame.dat.bak1 — самый свежий)
+    BACKUPS = 3
 
-    def __init__(self, save_dir: Path | None = None) -> None:
+    def __init__(self, save_dir: Path | None = None, background: bool = False, backups: int | None = None) -> None:
         self.save_dir = save_dir or Path.cwd()
         self.save_path = self.save_dir / self._SAVE_FILE
+        self.journal_path = self.save_dir / self._JOURNAL_FILE
+        self.backups = self.BACKUPS if backups is None else backups
+        # Фоновый поток записи (None — пишем синхронно)
+        self._writer: SaveWriter | None = None
+        if background:
+            self._writer = SaveWriter(self.save_path, self.journal_path, backups=self.backups)
+        # Состояние, для которого журнал согласован со снимком на диске
+        self._tracked: GameState | None = None
+        self._generation = 0
+        self._journal_records = 0
+        self._saved_balance = 0
+        self._saved_granted: list[str] = []
+        # Последняя ошибка записи (фоновой или синхронной)
+        self.last_error: BaseException | None = None
 
+    @METRICS.timed("save_seconds")
     def save(self, state: GameState) -> None:
-        """Сохранить состояние игры в зашифрованный файл."""
+        """Сохранить состояние: дописать изменения в журнал или сделать снимок."""
+        error = self._check_writer()
+        if error is not None:
+            print(f"Ошибка записи сохранения: {error}. Сохраняем заново.")
+        if self._needs_snapshot(state):
+            self.save_snapshot(state)
+            return
+
+        records = self._collect_changes(state)
+        if not records:
+            # Ничего не поменялось — не трогаем диск
+            return
+        frame = encode_journal_frame(records, self._XOR_KEY)
+        METRICS.inc("save_bytes_total", len(frame), kind="journal")
+        if self._writer is not None:
+            self._writer.submit_append(frame)
+        else:
+            try:
+                append_durable(self.journal_path, frame)
+            except Exception as e:
+                self._write_failed(e)
+                raise
+        self._journal_records += len(records)
+
+    def flush(self) -> None:
+        """Дождаться, пока все запрошенные сохранения окажутся на диске
+        (ошибку фоновой записи поднимает здесь же)."""
+        if self._writer is not None:
+            self._writer.flush()
+            error = self._check_writer()
+            if error is not None:
+                raise error
+
+    def close(self) -> None:
+        """Дописать очередь и остановить фоновый поток записи (ошибку
+        последней записи поднимает после остановки)."""
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            writer.close()
+            error = writer.take_error()
+            if error is not None:
+                self._write_failed(error)
+                raise error
+
+    def _write_failed(self, error: BaseException) -> None:
+        """Запись не дошла до диска: следующий `save()` сделает полный снимок."""
+        self.last_error = error
+        self._tracked = None
+        METRICS.inc("save_errors_total")
+
+    def _check_writer(self) -> BaseException | None:
+        """Ошибка фоновой записи с прошлой проверки (None, если её не было)."""
+        error = self._writer.take_error() if self._writer is not None else None
+        if error is not None:
+            self._write_failed(error)
+        return error
+
+    def _needs_snapshot(self, state: GameState) -> bool:
+        # Файлы на диске не проверяем: при фоновой записи они могут ещё не
+        # появиться. Согласованность журнала со снимком отслеживает `_track`.
+        return (
+            self._tracked is not state
+            or state.inventory.journal is None
+            or self._journal_records >= self.COMPACT_EVERY
+        )
+
+    def _collect_changes(self, state: GameState) -> list:
+        """Изменения с прошлого сохранения в виде записей журнала."""
+        records = list(state.inventory.drain_journal())
+        # баланс сравниваем со значением на диске: это ловит и прямое присваивание
+        if state.balance != self._saved_balance:
+            records.append(("balance", state.balance))
+            self._saved_balance = state.balance
+        granted = list(getattr(state, "granted_presets", []))
+        if granted != self._saved_granted:
+            records.append(("granted", granted))
+            self._saved_granted = granted
+        state.dirty.clear()
+        return records
+
+    @METRICS.timed("save_snapshot_seconds")
+    def save_snapshot(self, state: GameState) -> None:
+        """Записать полный снимок состояния и начать новый журнал."""
         # Сериализуем данные
         data: Dict[str, Any] = {
             "balance": state.balance,
@@ -34,81 +164,153 @@ class SaveManager:
             # Per-instance qualities for items (id -> list of floats)
             "item_qualities": getattr(state.inventory, "item_qualities", {}),
         }
-        json_str = json.dumps(data, ensure_ascii=False, indent=2)
-        
-        # Шифруем XOR + base64
-        encrypted = self._encrypt(json_str.encode("utf-8"))
-        
-        # Записываем в файл
-        self.save_path.write_bytes(encrypted)
+        # Бинарный формат + XOR всего буфера за один проход
+        generation = self._generation + 1
+        encoded = encode_save(data, self._XOR_KEY, generation=generation)
+        METRICS.inc("save_bytes_total", len(encoded), kind="snapshot")
+
+        # Записываем снимок атомарно (с ротацией резервных копий), затем
+        # начинаем пустой журнал для этого снимка
+        header = encode_journal_header(generation)
+        if self._writer is not None:
+            self._writer.submit_snapshot(encoded, header)
+        else:
+            try:
+                atomic_write(self.save_path, encoded, backups=self.backups)
+                atomic_write(self.journal_path, header)
+            except Exception as e:
+                self._write_failed(e)
+                raise
 
+        self._generation = generation
+        self._journal_records = 0
+        self._track(state)
+
+    def _track(self, state: GameState) -> None:
+        """Считать `state` согласованным с файлами на диске."""
+        state.inventory.start_journal()
+        state.dirty.clear()
+        self._tracked = state
+        self._saved_balance = state.balance
+        self._saved_granted = list(getattr(state, "granted_presets", []))
+
+    @METRICS.timed("load_seconds")
     def load(self) -> GameState:
-        """Загрузить состояние из файла или создать новое."""
-        if not self.save_path.exists():
+        """Загрузить состояние из файла или создать новое.
+
+        Если основной файл повреждён, пробуем резервные копии
+        (`savegame.dat.bak1`, `.bak2`, ...) и только потом сбрасываем прогресс.
+        """
+        candidates = [self.save_path] + [backup_path(self.save_path, n) for n in range(1, self.backups + 1)]
+        candidates = [p for p in candidates if p.exists()]
+        if not candidates:
             # Первый запуск — создаем стартовое состояние
             return self._create_fresh_state()
 
-        try:
-            # Читаем и расшифровываем
-            encrypted = self.save_path.read_bytes()
-            decrypted = self._decrypt(encrypted)
-            data = json.loads(decrypted.decode("utf-8"))
-
-            # Восстанавливаем каталоги из presets (регистрируем все кейсы/предметы)
-            inventory = presets.create_sample_inventory()
-
-            # Накатываем сохраненные количества (если игрок когда-то что-то менял)
-            inventory.item_counts = data.get("item_counts", {})
-            inventory.case_counts = data.get("case_counts", {})
-            inventory.item_qualities = data.get("item_qualities", {})
-
-            # Сохранившиеся пресеты, которые уже выдавали игроку
-            granted: list[str] = data.get("granted_presets", [])
-
-            # Определим пресеты, добавленные в текущей версии `presets.py`, но
-            # которых нет в сохранённом case_counts — это кандидаты на разовую
-            # выдачу новому или "не знавшему" игроку.
-            preset_ids = set(presets.FREE_PRESET_CASES.keys())
-            saved_case_ids = set(inventory.case_counts.keys())
-
-            newly_granted: list[str] = []
-            for pid in sorted(preset_ids):
-                # если в сохранении нет ключа — считаем пресет "новым" для
-                # этого игрока и выдаём его (но только если не было отмечено
-                # как выданный ранее через granted_presets)
-                if pid not in saved_case_ids and pid not in granted:
-                    qty = presets.FREE_PRESET_CASES.get(pid, 0)
-                    case_obj = inventory.case_catalog.get(pid)
-                    if case_obj and qty > 0:
-                        inventory.add_case(case_obj, qty=qty)
-                        newly_granted.append(pid)
-
-            # Обновляем список granted_presets и при необходимости сохраняем
-            # сразу, чтобы при следующем запуске не выдать повторно.
-            granted.extend(newly_granted)
-
-            state = GameState(
-                inventory=inventory,
-                balance=data.get("balance", 0),
-                granted_presets=granted,
-            )
-
-            if newly_granted:
-                # Сохраняем обновлённый файл, включающий granted_presets
-                self.save(state)
-
+        for path in candidates:
+            try:
+                state = self._load_from(path)
+            except Exception as e:
+                print(f"Ошибка загрузки сохранения {path.name}: {e}.")
+                continue
+            if path != self.save_path:
+                print(f"Прогресс восстановлен из резервной копии {path.name}.")
+                # Перезаписываем основной файл восстановленным снимком
+                self.save_snapshot(state)
             return state
-        except Exception as e:
-            # Если файл поврежден, создаем новое состояние
-            print(f"Ошибка загрузки сохранения: {e}. Создано новое состояние.")
-            return self._create_fresh_state()
+
+        # Все копии повреждены — создаем новое состояние
+        print("Создано новое состояние.")
+        return self._create_fresh_state()
+
+    def _load_from(self, path: Path) -> GameState:
+        """Прочитать снимок `path`, накатить журнал и вернуть состояние."""
+        # Читаем и расшифровываем: новый формат читается потоково,
+        # старый (base64 + XOR + JSON) — целиком, с последующей миграцией.
+        data, migrated, generation = self._read_save_data(path)
+        # Журнал относится только к основному снимку; у резервной копии
+        # другое поколение, и журнал будет проигнорирован.
+        journal, torn = self._read_journal(generation)
+
+        # Восстанавливаем каталоги из presets (регистрируем все кейсы/предметы)
+        inventory = self._new_inventory()
+
+        # Накатываем сохраненные количества (если игрок когда-то что-то менял)
+        inventory.item_counts = data.get("item_counts", {})
+        inventory.case_counts = data.get("case_counts", {})
+        inventory.set_item_qualities(data.get("item_qualities", {}))
+
+        # Сохранившиеся пресеты, которые уже выдавали игроку
+        granted: list[str] = data.get("granted_presets", [])
+        balance: int = data.get("balance", 0)
+
+        # Накатываем журнал изменений, записанный после снимка
+        inventory.apply_journal(journal or [])
+        for rec in journal or []:
+            if rec[0] == "balance":
+                balance = rec[1]
+            elif rec[0] == "granted":
+                granted = list(rec[1])
+
+        # Обновляем список granted_presets и при необходимости сохраняем
+        # сразу, чтобы при следующем запуске не выдать повторно.
+        newly_granted = self._grant_new_presets(inventory, granted)
+        granted.extend(newly_granted)
+
+        state = GameState(
+            inventory=inventory,
+            balance=balance,
+            granted_presets=granted,
+        )
+
+        self._generation = generation
+        if path != self.save_path:
+            # Снимок из резервной копии перезапишет вызывающий код
+            pass
+        elif newly_granted or migrated or journal is None or torn:
+            # Сохраняем обновлённый файл, включающий granted_presets
+            # (и переводим старое сохранение в бинарный формат или
+            # начинаем новый журнал, если прежний не подходит или
+            # оборван: новые кадры нельзя дописывать после мусора)
+            self.save_snapshot(state)
+        else:
+            # Продолжаем дописывать в существующий журнал
+            self._track(state)
+            self._journal_records = len(journal)
+
+        return state
+
+    def _new_inventory(self) -> Inventory:
+        """Пустой инвентарь с каталогами из presets (переопределяется хранилищами)."""
+        return presets.create_sample_inventory()
+
+    def _grant_new_presets(self, inventory: Inventory, granted: list[str]) -> list[str]:
+        """Выдать пресеты, которых ещё нет в сохранении; вернуть их id."""
+        # Определим пресеты, добавленные в текущей версии `presets.py`, но
+        # которых нет в сохранённом case_counts — это кандидаты на разовую
+        # выдачу новому или "не знавшему" игроку.
+        preset_ids = set(presets.FREE_PRESET_CASES.keys())
+        saved_case_ids = set(inventory.case_counts.keys())
+
+        newly_granted: list[str] = []
+        for pid in sorted(preset_ids):
+            # если в сохранении нет ключа — считаем пресет "новым" для
+            # этого игрока и выдаём его (но только если не было отмечено
+            # как выданный ранее через granted_presets)
+            if pid not in saved_case_ids and pid not in granted:
+                qty = presets.FREE_PRESET_CASES.get(pid, 0)
+                case_obj = inventory.case_catalog.get(pid)
+                if case_obj and qty > 0:
+                    inventory.add_case(case_obj, qty=qty)
+                    newly_granted.append(pid)
+        return newly_granted
 
     def _create_fresh_state(self) -> GameState:
         """Создать стартовое состояние с примерами."""
         # Создаём каталог предметов/кейсов, но не выдаём никаких предметов по умолчанию.
         # Это позволяет иметь пустой инвентарь, но при этом регистрация всех
         # типов предметов/кейсов доступна для кода (например, для магазина/инвентаря).
-        inventory = presets.create_sample_inventory()
+        inventory = self._new_inventory()
 
         # При первом запуске выдаём игроку несколько стартовых (дешёвых)
         # кейсов, чтобы у него было с чем играть. Сопоставление
@@ -126,20 +328,27 @@ class SaveManager:
 
         # Сохраняем сразу, чтобы при следующем запуске этот начальный файл
         # считался существующим и не перегенерировал стартовые пресеты.
-        self.save(state)
+        self.save_snapshot(state)
         return state
 
-    def _encrypt(self, data: bytes) -> bytes:
-        """XOR-шифрование + base64."""
-        xored = self._xor_bytes(data, self._XOR_KEY)
-        return base64.b64encode(xored)
-
-    def _decrypt(self, data: bytes) -> bytes:
-        """Обратное преобразование: base64 + XOR."""
-        decoded = base64.b64decode(data)
-        return self._xor_bytes(decoded, self._XOR_KEY)
+    def _read_save_data(self, path: Path) -> tuple[Dict[str, Any], bool, int]:
+        """Прочитать файл сохранения. Возвращает (данные, нужна_ли_миграция, поколение)."""
+        with path.open("rb") as fh:
+            prefix = fh.read(len(MAGIC))
+            fh.seek(0)
+            if is_binary_save(prefix):
+                reader = SaveReader(fh, self._XOR_KEY)
+                return reader.read_all(), False, reader.generation
+            return decode_legacy(fh.read(), self._XOR_KEY), True, 0
 
-    @staticmethod
-    def _xor_bytes(data: bytes, key: bytes) -> bytes:
-        """XOR каждого байта данных с циклическим ключом."""
-        return bytes(b ^ key[i % len(key)] for i, b in enumerate(data))
+    def _read_journal(self, generation: int) -> tuple[list | None, bool]:
+        """Записи журнала, относящиеся к снимку `generation` (None — журнала нет),
+        и признак оборванного хвоста (сбой во время дозаписи кадра)."""
+        if not self.journal_path.exists():
+            return None, False
+        raw = self.journal_path.read_bytes()
+        journal_gen, records, end = read_journal(raw, self._XOR_KEY)
+        if journal_gen != generation:
+            # Журнал от другого снимка (например, сбой между записью снимка и журнала)
+            return None, False
+        return records, end < len(raw)
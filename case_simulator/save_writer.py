@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+def backup_path(path: Path, n: int) -> Path:
+    """Path of the n-th rotated backup of `path` (1 = newest)."""
+    return path.with_name(f"{path.name}.bak{n}")
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Make the rename itself durable (POSIX only; not supported on Windows)
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: Path, data: bytes, backups: int = 0) -> None:
+    """Crash-safe replacement of `path` with `data`.
+
+    Writes to a temporary file in the same directory, fsyncs it, rotates up to
+    `backups` previous versions (`<name>.bak1` is the newest) and atomically
+    swaps it in with `os.replace`. A crash at any point leaves either the old
+    or the new file, never a half-written one.
+    """
+    tmp = path.with_name(f"{path.name}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+
+    if backups > 0 and path.exists():
+        for n in range(backups, 1, -1):
+            older = backup_path(path, n - 1)
+            if older.exists():
+                os.replace(older, backup_path(path, n))
+        # keep the current file as .bak1 (copy via hard link if possible)
+        bak1 = backup_path(path, 1)
+        try:
+            if bak1.exists():
+                bak1.unlink()
+            os.link(path, bak1)
+        except OSError:
+            bak1.write_bytes(path.read_bytes())
+
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+def append_durable(path: Path, data: bytes) -> None:
+    """Append `data` to `path` and fsync it."""
+    with open(path, "ab") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+
+
+# Pending operations: ("snapshot", snapshot_bytes, journal_header) or ("append", frame)
+_Op = Tuple[str, bytes, bytes]
+
+
+class SaveWriter:
+    """Background thread that performs save I/O off the UI thread.
+
+    Requests are queued and coalesced: a new snapshot supersedes everything
+    still pending, and consecutive journal appends are written with a single
+    `write` call. `flush()` blocks until everything submitted is on disk.
+
+    A failed write is kept for the caller (`take_error()`); until the next
+    snapshot succeeds, journal appends are dropped, because they would
+    extend a journal that no longer matches the saved snapshot.
+    """
+
+    def __init__(self, save_path: Path, journal_path: Path, backups: int = 3) -> None:
+        self.save_path = save_path
+        self.journal_path = journal_path
+        self.backups = backups
+        self.last_error: Optional[BaseException] = None
+        # a write failed: appends are skipped until a snapshot gets through
+        self._failed = False
+        self._pending: List[_Op] = []
+        self._busy = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+        self._thread.start()
+
+    # --- API (caller thread) ---
+    def submit_snapshot(self, snapshot: bytes, journal_header: bytes) -> None:
+        with self._cond:
+            # A full snapshot makes every pending write obsolete
+            self._pending = [("snapshot", snapshot, journal_header)]
+            self._cond.notify()
+
+    def submit_append(self, frame: bytes) -> None:
+        with self._cond:
+            self._pending.append(("append", frame, b""))
+            self._cond.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all submitted writes are done. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def take_error(self) -> Optional[BaseException]:
+        """The error of a failed write since the last call (and clear it)."""
+        with self._cond:
+            error, self.last_error = self.last_error, None
+            return error
+
+    def close(self) -> None:
+        """Flush pending writes and stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    # --- worker thread ---
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending and self._closed:
+                    return
+                ops, self._pending = self._pending, []
+                self._busy = True
+            error: Optional[BaseException] = None
+            try:
+                self._write(ops)
+            except Exception as e:  # keep the thread alive; the caller picks it up via take_error()
+                error = e
+            finally:
+                with self._cond:
+                    if error is not None:
+                        self.last_error = error
+                        self._failed = True
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _write(self, ops: List[_Op]) -> None:
+        frames: List[bytes] = []
+        for kind, payload, header in ops:
+            if kind == "snapshot":
+                frames = []
+                atomic_write(self.save_path, payload, backups=self.backups)
+                atomic_write(self.journal_path, header)
+                self._failed = False
+            elif not self._failed:
+                frames.append(payload)
+        if frames:
+            append_durable(self.journal_path, b"".join(frames))
@@ -4,14 +4,17 @@ from abc import ABC, abstractmethod
 from typing import Optional
 
 from case_simulator.utils.console import Console
+from case_simulator.utils.rng import Rng, get_rng
 from case_simulator.state import GameState
 
 
 class Scene(ABC):
     """Базовый класс для всех сцен симулятора."""
-    def __init__(self, console: Console, state: GameState) -> None:
+    def __init__(self, console: Console, state: GameState, rng: Optional[Rng] = None) -> None:
         self.console = console
         self.state = state
+        # Поток случайных чисел сцены (выпадения, качество, крафт)
+        self.rng = rng if rng is not None else get_rng()
 
     @abstractmethod
     def run(self) -> Optional[str]:
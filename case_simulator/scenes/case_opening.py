@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import random
 import time
 from typing import Optional, List, Tuple
 
@@ -8,15 +7,21 @@ from case_simulator.scenes.base import Scene
 from case_simulator.models.case import Case
 from case_simulator.models.item import Item
 from case_simulator.data import presets
+from case_simulator.ledger import get_ledger
 from case_simulator.utils.pricing import price_multiplier
 from case_simulator.utils.quality import gen_quality
-import sys
+from case_simulator.utils.batch import BulkOpenResult, draw_cases, settle_open_batch, summarize_open_batch
+from case_simulator.utils.metrics import METRICS
+from case_simulator.utils.rng import Rng
 import math
 
 
 class CaseOpeningScene(Scene):
     """Сцена открытия кейсов."""
 
+    # Быстрое открытие: без анимации рулетки (переключается клавишей F)
+    quick_open = False
+
     def run(self) -> Optional[str]:
         while True:
             self.console.clear()
@@ -34,6 +39,8 @@ class CaseOpeningScene(Scene):
             # Список кейсов
             for idx, (case, count) in enumerate(cases, start=1):
                 self.console.write_line(f"{idx}. {case.name} (x{count}) — цена {case.price}")
+            self.console.write_line(f"F - Быстрое открытие без анимации: {'вкл' if self.quick_open else 'выкл'}")
+            self.console.write_line("M - Открыть несколько / все кейсы сразу (сводка, авто-продажа)")
             self.console.write_line("Q - Назад")
             self.console.write_empty_line()
 
@@ -45,6 +52,12 @@ class CaseOpeningScene(Scene):
             # Поддерживаем как 'q'/'Q', так и старый вариант '0' для совместимости
             if choice.lower() == "q" or choice == "0":
                 return "menu"
+            if choice.lower() == "f":
+                self.quick_open = not self.quick_open
+                continue
+            if choice.lower() == "m":
+                self._open_many_prompt(cases)
+                continue
             if not choice.isdigit():
                 self.console.write_line("Введите номер из списка.")
                 self.console.wait_for_key("Нажмите Enter или Esc для продолжения...")
@@ -67,104 +80,95 @@ class CaseOpeningScene(Scene):
             # После открытия вернемся к списку для возможности открыть еще
 
     # --- Внутренняя логика ---
-    def _open_case(self, case: Case) -> None:
-        # Списать один кейс
-        removed = self.state.inventory.remove_case(case, qty=1)
-        if not removed:
-            self.console.write_line("Не удалось открыть кейс: нет в инвентаре.")
-            self.console.wait_for_key("Нажмите Enter или Esc для продолжения...")
-            return
-
-        self.console.clear()
-        self.console.write_line(f"Открываем кейс: {case.name}")
-        self.console.write_empty_line()
-        self.console.write_line("Рулетка...")
-
-        items: List[Item] = list(case.items)
-        if not items:
-            self.console.write_line("Кейс пуст :(")
-            self.console.wait_for_key("Нажмите Enter или Esc для продолжения...")
-            return
+    def _draw(self, case: Case) -> Tuple[Item, float]:
+        """Выпадение одного кейса: предмет и его качество.
 
-        # Выберем приз заранее и построим анимацию с замедлением
-        # Взвешенный выбор: используем параметры из `presets.py` чтобы
-        # сделать редкие предметы ещё реже, но при этом не допустить нулевых шансов.
-        # Формула: raw = 1 / (rare ** power)  (rare>0), raw=1 для rare<=0
-        # weight = max(DROP_MIN_WEIGHT, raw * DROP_WEIGHT_MULTIPLIER)
-        weights: List[float] = []
-        power = getattr(presets, "DROP_RARE_POWER", 1.0)
-        min_w = getattr(presets, "DROP_MIN_WEIGHT", 1e-6)
-        mult = getattr(presets, "DROP_WEIGHT_MULTIPLIER", 1.0)
-
-        for it in items:
-            try:
-                r = float(getattr(it, "rare", 0) or 0)
-            except Exception:
-                r = 0.0
-            if r <= 0:
-                raw = 1.0
-            else:
-                raw = 1.0 / (r ** float(power))
-            w = max(float(min_w), float(raw) * float(mult))
-            weights.append(w)
-
-        # random.choices поддерживает взвешенный выбор (Python 3.6+).
-        try:
-            winner = random.choices(items, weights=weights, k=1)[0]
-            win_index = items.index(winner)
-        except Exception:
-            # Фоллбек на равновероятный выбор
-            win_index = random.randrange(len(items))
+        Единственное место, где выпадения берут числа из `self.rng` (сначала
+        предмет, потом качество), поэтому обычное, быстрое и пакетное
+        открытие дают одинаковые результаты. Анимация использует отдельный
+        поток `_animation_rng()`.
+        """
+        # Веса предметов (см. `presets.DROP_*`) собраны в alias-таблицу,
+        # которая строится один раз на кейс и кешируется по его id;
+        # `draw_cases` — тот же движок, что и у пакетного открытия.
+        batch = draw_cases(case, 1, self.rng)
+        return batch.items[batch.item_index[0]], batch.quality[0]
+
+    def _play_roulette(self, items: List[Item], winner: Item) -> None:
+        """Анимация рулетки, которая останавливается на `winner`.
+
+        Кадры идут по часам (дедлайн каждого кадра считается от старта, а не
+        от конца предыдущего `sleep`), между кадрами ввод опрашивается без
+        блокировки — любая клавиша сразу показывает результат.
+        """
+        win_index = items.index(winner) if winner in items else 0
         total_steps = min(len(items) * 2 + win_index, 25)
 
         # Анимация: показываем сменяющиеся элементы в одной строке.
         # Требование: между 1-м и 2-м показом очень мало (~0.05s),
         # между 2-м и 3-м чуть больше, а финальные паузы — около 0.6–0.8s.
         start_delay = 0.05
-        final_delay = 0.6 + random.random() * 0.2  # 0.6 .. 0.8
+        # (отдельный поток, чтобы анимация не сдвигала выпадения)
+        final_delay = 0.6 + self._animation_rng().random() * 0.2  # 0.6 .. 0.8
 
         # Подготовим паддинг, чтобы очистить предыдущую надпись при переписывании
-        display_texts = [f"→ {it.name}" for it in items]
-        max_len = max(len(t) for t in display_texts)
+        max_len = max(len(f"→ {it.name}") for it in items)
+
+        def frame(item: Item) -> None:
+            # один кадр анимации: переписываем строку и сразу выводим буфер
+            text = f"→ {item.name}"
+            self.console.write("\r" + text + " " * (max_len - len(text)))
+            self.console.flush()
 
+        self.console.write_line("(любая клавиша — пропустить)")
+        deadline = time.perf_counter()
         for step in range(total_steps):
-            current = items[step % len(items)]
-            text = f"→ {current.name}"
-            padded = text + " " * (max_len - len(text))
+            frame(items[step % len(items)])
 
             # t in [0,1) progress through animation; use eased (quadratic) curve
             # t принадлежит [0,1) прогресс через анимацию; используем квадратичную кривую
             t = step / max(1, total_steps - 1)
             # возрастающая квадратичная кривая для замедления в конце
-            delay = start_delay + (final_delay - start_delay) * (t * t)
-
-            
-            try:
-                sys.stdout.write("\r" + padded)
-                sys.stdout.flush()
-            except Exception:
-                # fallback to printing new line if direct stdout write fails
-                self.console.write_line(padded)
+            deadline += start_delay + (final_delay - start_delay) * (t * t)
 
-            time.sleep(delay)
+            if self.console.poll_key(deadline - time.perf_counter()) is not None:
+                break
 
+        # последний кадр всегда показывает выпавший предмет
+        frame(winner)
         # окончание анимации — переведём курсор на новую строку
-        try:
-            sys.stdout.write("\n")
-            sys.stdout.flush()
-        except Exception:
-            self.console.write_empty_line()
+        self.console.write_empty_line()
+
+    def _open_case(self, case: Case) -> None:
+        # Списать один кейс
+        removed = self.state.inventory.remove_case(case, qty=1)
+        if not removed:
+            self.console.write_line("Не удалось открыть кейс: нет в инвентаре.")
+            self.console.wait_for_key("Нажмите Enter или Esc для продолжения...")
+            return
 
-        winner = items[win_index]
+        self.console.clear()
+        self.console.write_line(f"Открываем кейс: {case.name}")
+        self.console.write_empty_line()
+
+        items: List[Item] = list(case.items)
+        if not items:
+            self.console.write_line("Кейс пуст :(")
+            self.console.wait_for_key("Нажмите Enter или Esc для продолжения...")
+            return
 
-        # Генерируем качество предмета (6 знаков после запятой, в диапазоне [0.0, 1.0))
-        q = self._gen_quality()
+        # Выберем приз и качество заранее, анимация только показывает результат
+        winner, q = self._draw(case)
+        if not self.quick_open:
+            self.console.write_line("Рулетка...")
+            self._play_roulette(items, winner)
 
         # Рассчитываем множитель цены по качеству и итоговую цену предмета
         multiplier = price_multiplier(q)
         adj_price = max(1, int(round(winner.price * multiplier)))
 
         self.console.write_line(f"Выпало: {winner.name} (качество {q:.6f}, базовая цена {winner.price}, скорр. цена {adj_price})")
+        get_ledger().record_open(case.id, winner.id, q, adj_price)
 
         # Предложение: оставить или продать за 88% от скорректированной цены
         sell_price = int(adj_price * 0.88)
@@ -194,6 +198,9 @@ class CaseOpeningScene(Scene):
                 break
             if action == "2":
                 self.state.add_balance(sell_price)
+                METRICS.inc("items_sold_total", source="drop")
+                METRICS.inc("sales_payout_total", sell_price, source="drop")
+                get_ledger().record_sale(winner.id, q, sell_price)
                 self.console.write_line(f"Продано. Баланс: {self.state.balance}")
                 break
             self.console.write_line("Введите 1 или 2.")
@@ -201,64 +208,106 @@ class CaseOpeningScene(Scene):
             self.console.write_empty_line()
             self.console.wait_for_key("Нажмите Enter или Esc для возврата к списку кейсов...")
 
+    def _open_many_prompt(self, cases: List[Tuple[Case, int]]) -> None:
+        raw = self.console.read_input("Номер кейса: ").strip()
+        if not raw.isdigit() or not (1 <= int(raw) <= len(cases)):
+            self.console.write_line("Нет такого варианта.")
+            self.console.wait_for_key("Нажмите Enter или Esc для продолжения...")
+            return
+        case, count = cases[int(raw) - 1]
+        raw = self.console.read_input(f"Сколько открыть (1-{count}, * — все): ").strip()
+        if raw == "*":
+            n = count
+        elif raw.isdigit() and int(raw) > 0:
+            n = min(int(raw), count)
+        else:
+            self.console.write_line("Введите положительное число или *.")
+            self.console.wait_for_key("Нажмите Enter или Esc для продолжения...")
+            return
+        raw = self.console.read_input("Авто-продажа дешевле скорр. цены X (Enter — не продавать): ").strip()
+        sell_below = int(raw) if raw.isdigit() else None
+        self._open_many(case, n, sell_below)
+
+    def _open_many(self, case: Case, n: int, sell_below: Optional[int] = None) -> None:
+        """Открыть `n` кейсов разом через `draw_cases`; анимируется только лучшее выпадение.
+
+        Выпадения те же, что дали бы `n` обычных открытий подряд. Выпадения
+        дешевле `sell_below` продаются по 88% (`SELL_RATE`), остальные
+        добавляются в инвентарь одной вставкой качеств на предмет.
+        """
+        items: List[Item] = list(case.items)
+        if n <= 0 or not items or not self.state.inventory.remove_case(case, qty=n):
+            self.console.write_line("Не удалось открыть кейсы.")
+            self.console.wait_for_key("Нажмите Enter или Esc для продолжения...")
+            return
+
+        batch = draw_cases(case, n, self.rng)
+        get_ledger().record_open_batch(batch)
+        best = max(range(n), key=lambda i: batch.adjusted_price[i])
+
+        self.console.clear()
+        self.console.write_line(f"Открываем кейсы: {case.name} x{n}")
+        self.console.write_empty_line()
+        if not self.quick_open:
+            self.console.write_line("Рулетка (лучшее выпадение)...")
+            self._play_roulette(items, batch.items[batch.item_index[best]])
+
+        summary = summarize_open_batch(batch, sell_below)
+        self._print_open_summary(summary)
+        all_sold = summarize_open_batch(batch, float("inf"))
+        self.console.write_empty_line()
+        if sell_below is not None:
+            self.console.write_line(
+                f"1. Оставить, продав дешевле {sell_below} ({summary.sold} шт. за {summary.sold_for})"
+            )
+        else:
+            self.console.write_line("1. Оставить все (в инвентарь)")
+        self.console.write_line(f"2. Продать все за {all_sold.sold_for}")
+        self.console.write_empty_line()
+
+        while True:
+            action = self.console.read_input("Ваш выбор: ").strip()
+            if action in ("1", "2"):
+                res = settle_open_batch(self.state.inventory, batch, sell_below if action == "1" else float("inf"))
+                if res.sold_for:
+                    self.state.add_balance(res.sold_for)
+                    METRICS.inc("items_sold_total", res.sold, source="drop")
+                    METRICS.inc("sales_payout_total", res.sold_for, source="drop")
+                    get_ledger().record_sales((r.item.id, r.sold, r.sold_for) for r in res.rows)
+                self.console.write_line(f"В инвентарь: {res.kept}, продано: {res.sold} за {res.sold_for}. Баланс: {self.state.balance}")
+                break
+            self.console.write_line("Введите 1 или 2.")
+        self.console.wait_for_key("Нажмите Enter или Esc для возврата к списку кейсов...")
+
+    def _print_open_summary(self, summary: BulkOpenResult, limit: int = 20) -> None:
+        """Таблица выпадений: количество, лучшее качество и сумма скорр. цен по предмету."""
+        rows = summary.rows[:limit]
+        name_w = max([len("Предмет")] + [len(r.item.name) for r in rows])
+        cnt_w = max([len("Кол-во")] + [len(str(r.count)) for r in rows])
+        val_w = max([len("Сумма")] + [len(str(r.total_adjusted)) for r in rows])
+        self.console.write_line(f"{'Предмет'.ljust(name_w)} | {'Кол-во'.rjust(cnt_w)} | {'Лучшее кач.':>11} | {'Сумма'.rjust(val_w)} | Продажа")
+        self.console.write_line(f"{'-' * name_w}-+-{'-' * cnt_w}-+-{'-' * 11}-+-{'-' * val_w}-+--------")
+        for r in rows:
+            sold = f"{r.sold} шт." if r.sold else "-"
+            self.console.write_line(
+                f"{r.item.name.ljust(name_w)} | {str(r.count).rjust(cnt_w)} | {r.best_quality:11.6f} | "
+                f"{str(r.total_adjusted).rjust(val_w)} | {sold}"
+            )
+        if len(summary.rows) > len(rows):
+            self.console.write_line(f"... и ещё предметов: {len(summary.rows) - len(rows)}")
+        self.console.write_line(f"Открыто: {summary.opened}, суммарная скорр. цена: {summary.total_adjusted}")
+
     # --- quality & pricing helpers ---
     def _gen_quality(self) -> float:
         # Delegate to shared generator for consistency with simulations
-        return gen_quality()
+        return gen_quality(self.rng)
+
+    def _animation_rng(self) -> Rng:
+        rng = getattr(self, "_fx_rng", None)
+        if rng is None:
+            rng = self._fx_rng = self.rng.spawn("animation")
+        return rng
 
     def _price_multiplier(self, q: float) -> float:
-        """Сопоставление качества q с множителем цены согласно настроенным уровням.
-        q: float в диапазоне [0.0, 1.0)        
-        """
-        # Safety clamp
-        q = max(0.0, min(q, 0.999999))
-
-        # Below 0.5: linear from 0.4 -> 0.65 at 0.5
-        if q < 0.5:
-            return 0.4 + (0.65 - 0.4) * (q / 0.5)
-
-        # 0.5 .. 0.75: linear 0.65 -> 0.75
-        if q < 0.75:
-            return 0.65 + (0.75 - 0.65) * ((q - 0.5) / 0.25)
-
-        # 0.75 .. 0.9: linear 0.75 -> 1.0
-        if q < 0.9:
-            return 0.75 + (1.0 - 0.75) * ((q - 0.75) / 0.15)
-
-        # Anchors for >0.9 progression
-        # Привязки для прогрессии >0.9
-        anchors = [
-            (0.9, 1.0),
-            (0.91, 1.05),
-            (0.93, 1.30),
-            (0.95, 1.70),
-            (0.99, 3.00),
-            (0.9950, 5.00),
-        ]
-
-        # between 0.9 and 0.995: linear interpolate between anchors
-        # между 0.9 и 0.995: линейная интерполяция между привязками
-        for i in range(len(anchors) - 1):   
-            x0, m0 = anchors[i]
-            x1, m1 = anchors[i + 1]
-            if x0 <= q < x1:
-                t = (q - x0) / (x1 - x0)
-                return m0 + (m1 - m0) * t
-
-        # 0.9950 < q <= 0.9989 -> fixed 8.0 (800%) according to spec
-        # 0.9950 < q <= 0.9989 -> фиксированное значение 8.0 (800%) согласно спецификации
-        if q <= 0.9989:
-            if q > 0.9950:
-                return 8.0
-
-        # q >= 0.9990 -> progressive per-0.0001 increments starting at 10.0
-        # q >= 0.9990 -> прогрессивные приращения по 0.0001, начиная с 10.0
-        if q >= 0.9990:
-            # number of steps of 0.0001 above 0.9990
-            steps = (q - 0.9990) / 0.0001
-            return 10.0 + steps
-
-        # fallback: if q in small gap between 0.9989 and 0.9990, return 8.0
-        # запасной вариант: если q в небольшом промежутке между 0.9989 и 0.9990, вернуть 8.0
-        return 8.0
-    
\ No newline at end of file
+        """Сопоставление качества q с множителем цены (см. `utils/pricing.py`)."""
+        return price_multiplier(q)
@@ -3,7 +3,17 @@ from __future__ import annotations
 from typing import Optional, List, Tuple
 
 from case_simulator.scenes.base import Scene
-from case_simulator.utils.crafting import craft_items, TIERS
+from case_simulator.utils.craft_ev import estimate_craft
+from case_simulator.utils.crafting import (
+    TIERS,
+    compute_adjusted_sum,
+    craft_cost,
+    craft_duplicates,
+    craft_items,
+    plan_duplicate_crafts,
+    preview_output_templates,
+)
+from case_simulator.utils.inventory_view import InstanceRow, InventoryView
 from case_simulator.utils.pricing import price_multiplier
 from case_simulator.models.item import Item
 from case_simulator.data import presets
@@ -34,32 +44,69 @@ class CraftingScene(Scene):
         "upgrade": "Апгрейд",
     }
 
-    def _build_display_rows(self) -> List[Tuple[str, str, int, int, float | None]]:
-        """Return rows similar to InventoryScene: (item_id, name, base_price, adj_price, qual)"""
-        owned = self.state.inventory.get_items()
-        rows: List[Tuple[str, str, int, int, float | None]] = []
-        # sort by price asc for stable listing
-        ordered = sorted(owned, key=lambda ic: ic[0].price)
-        for it, cnt in ordered:
-            qlist = self.state.inventory.get_item_qualities(it.id)
-            if qlist:
-                for q in qlist:
-                    mult = price_multiplier(q)
-                    adj = int(round(it.price * mult))
-                    rows.append((it.id, it.name, it.price, adj, float(q)))
-            else:
-                rows.append((it.id, it.name, it.price, it.price, None))
-        return rows
+    # copies shown per page when picking inputs
+    PAGE_SIZE = 30
+    _view: Optional[InventoryView] = None
+
+    def _owned_view(self) -> InventoryView:
+        """Owned copies sorted by price asc (same order as the inventory), paged."""
+        view = self._view
+        if view is None or view.inventory is not self.state.inventory:
+            view = self._view = InventoryView(self.state.inventory, page_size=self.PAGE_SIZE)
+        return view
 
-    def _print_rows(self, rows: List[Tuple[str, str, int, int, float | None]]) -> None:
+    def _print_rows(self, first: int, rows: List[InstanceRow]) -> None:
         if not rows:
             self.console.write_line("У вас нет предметов в инвентаре.")
             return
         # print enumerated rows — show only name, скорректированная цена (adj) и quality
-        for i, (_iid, name, _base, adj, qual) in enumerate(rows, start=1):
+        for i, (_iid, name, _base, adj, qual) in enumerate(rows, start=first + 1):
             qtxt = f"{qual:.6f}" if qual is not None else "-"
             self.console.write_line(f"{i:3d}. {name}    ценность={adj}    качество={qtxt}")
 
+    def _auto_craft_duplicates(self) -> None:
+        """Крафтить все дубликаты выбранной категории (вероятностный режим) до конца."""
+        self.console.clear()
+        self.console.write_line("=== Авто-крафт дубликатов ===")
+        self.console.write_line("У каждого предмета остаётся одна лучшая копия, остальные")
+        self.console.write_line("крафтятся пачками по 8 (сначала худшие), пока дубликаты не кончатся.")
+        self.console.write_line("")
+
+        # категории, в которых есть дубликаты
+        dupes: dict = {}
+        for it, cnt in self.state.inventory.get_items():
+            if cnt > 1:
+                dupes[it.category] = dupes.get(it.category, 0) + cnt - 1
+        if not dupes:
+            self.console.write_line("Дубликатов нет.")
+            self.console.wait_for_key()
+            return
+        cats = sorted(dupes)
+        for i, cat in enumerate(cats, start=1):
+            self.console.write_line(f"  {i}. {cat} (дубликатов: {dupes[cat]})")
+        raw = self.console.read_input("Категория: ").strip()
+        if not raw.isdigit() or not (1 <= int(raw) <= len(cats)):
+            return
+        category = cats[int(raw) - 1]
+
+        t_raw = self.console.read_input("Шанс (50/35/25/10): ").strip()
+        tier = int(t_raw) if t_raw.isdigit() and int(t_raw) in TIERS else 50
+
+        plans = plan_duplicate_crafts(self.state.inventory, category, tier)
+        first_cost = sum(
+            craft_cost(compute_adjusted_sum([(i, 0.0 if q is None else q) for i, q in p.selections])) for p in plans
+        )
+        self.console.write_line(f"Крафтов в первом проходе: {len(plans)}, стоимость: {first_cost} монет (баланс {self.state.balance})")
+        if self.console.read_input("Запустить? (y/n): ").strip().lower() != "y":
+            return
+
+        res = craft_duplicates(self.state, category, tier, rng=self.rng)
+        self.console.write_line("")
+        self.console.write_line(f"Крафтов: {len(res)}, успешных: {res.successes}")
+        self.console.write_line(f"Стоимость входов: {res.total_input_value:.0f}, получено: {res.total_output_value:.0f}")
+        self.console.write_line(f"Списано за крафт: {res.total_cost}. Баланс: {self.state.balance}")
+        self.console.wait_for_key()
+
     def _show_modes_guide(self) -> None:
         """Show a short, user-friendly guide describing each crafting mode."""
         self.console.clear()
@@ -83,11 +130,15 @@ class CraftingScene(Scene):
             for i, m in enumerate(self.MODES, start=1):
                 label = self.MODE_LABELS.get(m, m)
                 self.console.write_line(f"  {i}. {label}")
+            self.console.write_line("  a. Авто-крафт дубликатов категории")
             self.console.write_line("  g. Гайд по режимам")
             self.console.write_line("  q. Назад")
             choice = self.console.read_input("Режим: ").strip().lower()
             if choice in ("q", "b"):
                 return "menu"
+            if choice == "a":
+                self._auto_craft_duplicates()
+                continue
             if choice == "g":
                 # show a short user-friendly guide explaining each mode
                 self._show_modes_guide()
@@ -99,23 +150,33 @@ class CraftingScene(Scene):
 
             mode = self.MODES[int(choice) - 1]
 
-            # Show inventory rows and ask user to select indices
-            rows = self._build_display_rows()
-            self.console.clear()
-            self.console.write_line(f"Режим: {mode}")
-            self.console.write_line("")
-            self.console.write_line("Выберите предметы для крафта (номера через пробел).")
-            if mode == "upgrade":
-                self.console.write_line("(для апгрейда выберите ровно 1 предмет)")
-            else:
-                self.console.write_line("(минимум 2, максимум 8 предметов)")
-            self.console.write_line("")
-            self._print_rows(rows)
+            # Show inventory rows page by page and ask user to select indices
+            view = self._owned_view()
+            while True:
+                total = view.row_count()
+                first, rows = view.page_rows()
+                self.console.clear()
+                self.console.write_line(f"Режим: {mode}")
+                self.console.write_line("")
+                self.console.write_line("Выберите предметы для крафта (номера через пробел).")
+                if mode == "upgrade":
+                    self.console.write_line("(для апгрейда выберите ровно 1 предмет)")
+                else:
+                    self.console.write_line("(минимум 2, максимум 8 предметов)")
+                self.console.write_line("")
+                self._print_rows(first, rows)
+                if not rows:
+                    break
+                self.console.write_line(
+                    f"Страница {view.pager.page}/{view.pager.pages(total)} — "
+                    "[>] следующая | [<] предыдущая | [gN] страница N"
+                )
+                sel_raw = self.console.read_input("Выбор: ").strip()
+                if not view.pager.handle(sel_raw.lower(), total):
+                    break
             if not rows:
                 self.console.wait_for_key()
                 return "menu"
-
-            sel_raw = self.console.read_input("Выбор: ").strip()
             if not sel_raw:
                 continue
             try:
@@ -126,7 +187,7 @@ class CraftingScene(Scene):
                 continue
 
             # validate indices
-            if any(i < 0 or i >= len(rows) for i in indices):
+            if any(i < 0 or i >= view.row_count() for i in indices):
                 self.console.write_line("Один из индексов вне диапазона.")
                 self.console.wait_for_key()
                 continue
@@ -144,7 +205,7 @@ class CraftingScene(Scene):
             # Build selections (item_id, quality)
             selections: List[Tuple[str, float]] = []
             for i in indices:
-                iid, name, base, adj, qual = rows[i]
+                iid, name, base, adj, qual = view.row(i)  # type: ignore[misc]
                 if qual is None:
                     # For items without per-instance quality we treat quality as 0.0
                     q = 0.0
@@ -174,16 +235,30 @@ class CraftingScene(Scene):
                     tier = 50
 
             # Preview: compute adjusted sum and cost
-            from case_simulator.utils.crafting import compute_adjusted_sum
-
             adjusted_sum = compute_adjusted_sum(selections)
             # Цена крафта: 0.2% от суммарной скорректированной стоимости (пользовательская настройка)
-            cost = max(1, int(round(adjusted_sum * 0.002)))
+            cost = craft_cost(adjusted_sum)
             self.console.write_line("")
             self.console.write_line(f"Суммарная скорректированная стоимость входов: {adjusted_sum:.2f}")
             self.console.write_line(f"Цена крафта (0.2%): {cost} монет")
             self.console.write_line(f"Ваш баланс: {self.state.balance} монет")
 
+            # Оценка исхода: среднее, разброс и шанс получить больше, чем отдали
+            est = estimate_craft(selections, mode, tier)
+            p = est.percentiles
+            self.console.write_line(
+                f"Ожидаемая ценность результата: {est.mean:.0f} (σ={est.std:.0f}), "
+                f"с учётом цены крафта: {est.profit_mean:+.0f}"
+            )
+            self.console.write_line(
+                f"Медиана {p[50]:.0f}, 5–95%: {p[5]:.0f}–{p[95]:.0f}; "
+                f"шанс получить дороже входов: {est.p_beat_input * 100:.1f}%"
+            )
+            # Ближайшие шаблоны результата (качество ≈ среднему качеству входов)
+            preview = preview_output_templates(selections, mode, tier, k=3)
+            if preview:
+                self.console.write_line("Возможные результаты: " + ", ".join(f"{it.name} (~{adj})" for it, adj in preview))
+
             # confirm
             conf = self.console.read_input("Подтвердить крафт? (y/n): ").strip().lower()
             if conf != "y":
@@ -210,7 +285,7 @@ class CraftingScene(Scene):
                     return "menu"
 
             # Perform craft logic
-            res = craft_items(self.state, selections, mode, tier)
+            res = craft_items(self.state, selections, mode, tier, rng=self.rng)
 
             out = res.get("output")
             success = res.get("success")
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional
+
+from case_simulator.scenes.base import Scene
+from case_simulator.utils.metrics import METRICS, Histogram
+
+
+class DebugScene(Scene):
+    """Скрытый экран метрик (клавиша `d` в главном меню).
+
+    Показывает счётчики, показатели и гистограммы задержек из
+    `utils/metrics.METRICS`; позволяет включить/выключить сбор, сбросить
+    значения и выгрузить их в файл (Prometheus text или JSON lines).
+    """
+
+    PROMETHEUS_FILE = "metrics.prom"
+    JSONL_FILE = "metrics.jsonl"
+
+    def _metric_lines(self) -> List[str]:
+        rows = []
+        for name, labels, metric in METRICS.items():
+            label_txt = ",".join(f"{k}={v}" for k, v in labels.items())
+            full = f"{name}{{{label_txt}}}" if label_txt else name
+            if isinstance(metric, Histogram):
+                value = (
+                    f"n={metric.count} p50={metric.quantile(0.5) * 1e3:.3f}мс "
+                    f"p99={metric.quantile(0.99) * 1e3:.3f}мс max={metric.max / 1e6:.3f}мс"
+                )
+            else:
+                value = f"{metric.value}"
+            rows.append((full, value))
+        if not rows:
+            return []
+        name_w = max(len(full) for full, _ in rows)
+        return [f"{full.ljust(name_w)}  {value}" for full, value in rows]
+
+    def run(self) -> Optional[str]:
+        message = ""
+        while True:
+            self.console.clear()
+            self.console.write_line("=== Метрики ===")
+            self.console.write_line(f"Сбор: {'включён' if METRICS.enabled else 'выключен'}")
+            self.console.write_empty_line()
+            lines = self._metric_lines()
+            for line in lines:
+                self.console.write_line(line)
+            if not lines:
+                self.console.write_line("(пока ничего не записано)")
+            self.console.write_empty_line()
+            if message:
+                self.console.write_line(message)
+            self.console.write_line(
+                f"[e] Вкл/выкл | [r] Сброс | [p] Экспорт в {self.PROMETHEUS_FILE} | "
+                f"[j] Дописать в {self.JSONL_FILE} | [u] Обновить | [0] Назад"
+            )
+
+            try:
+                choice = self.console.read_key("Ваш выбор: ").strip().lower()
+            except Exception:
+                choice = self.console.read_input("Ваш выбор: ").strip().lower()
+
+            message = ""
+            if choice in ("0", "q"):
+                return "menu"
+            if choice == "e":
+                METRICS.enabled = not METRICS.enabled
+            elif choice == "r":
+                METRICS.reset()
+                message = "Значения сброшены."
+            elif choice == "p":
+                path = METRICS.export_prometheus(Path.cwd() / self.PROMETHEUS_FILE)
+                message = f"Записано: {path}"
+            elif choice == "j":
+                path = METRICS.export_jsonl(Path.cwd() / self.JSONL_FILE)
+                message = f"Дописано: {path}"
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Optional, Tuple
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 
 from case_simulator.scenes.base import Scene
 from case_simulator.data import presets
+from case_simulator.ledger import get_ledger
 from case_simulator.models.item import Item
-from case_simulator.utils.pricing import price_multiplier
+from case_simulator.utils.inventory_view import InventoryView
+from case_simulator.utils.metrics import METRICS
+from case_simulator.utils.selling import SellRule, execute_sale, plan_sale
+from case_simulator.utils.valuation import get_valuations
 
 
 class InventoryScene(Scene):
@@ -19,6 +23,9 @@ class InventoryScene(Scene):
 
     ITEM_CATEGORIES = ["all", "pistol", "rifle", "sniper", "knife"]
     SORT_FIELDS = ["price", "rare"]
+    # owned items shown per page
+    PAGE_SIZE = 20
+    PAGE_HELP = "[>] Следующая страница | [<] Предыдущая | [gN] Страница N"
 
     def _filter_items(self, items: Iterable[Item], category: str) -> List[Item]:
         if category == "all":
@@ -51,6 +58,111 @@ class InventoryScene(Scene):
             )
             self.console.write_line(line)
 
+    def _print_owned_page(self, view: InventoryView, simple: bool) -> bool:
+        """Print the current page of owned items; False if nothing is owned.
+
+        The № column shows the instance numbers used by the sell command
+        (one per stored quality copy).
+        """
+        page = view.page_items()
+        if not page:
+            return False
+        vals = get_valuations()
+        numbers: List[str] = []
+        for pos, _it, _cnt in page:
+            start, stop = view.row_span(pos)
+            numbers.append(str(start + 1) if stop - start == 1 else f"{start + 1}-{stop}")
+        # widths of the current page only (at least the header)
+        num_w = max(len(n) for n in numbers)
+        price_w = max(4, max(len(str(it.price)) for _, it, _ in page))
+        cnt_w = max(6, max(len(str(cnt)) for _, _, cnt in page))
+        name_w = max(8, max(len(str(it.name)) for _, it, _ in page))
+        id_w = max(2, max(len(str(it.id)) for _, it, _ in page))
+
+        hdr = f"{'№'.rjust(num_w)} | {'Цена'.rjust(price_w)} | {'Кол-во'.rjust(cnt_w)} | {'Название'.ljust(name_w)} | {'ID'.ljust(id_w)}"
+        sep = f"{'-' * num_w}-+-{'-' * price_w}-+-{'-' * cnt_w}-+-{'-' * name_w}-+-{'-' * id_w}"
+        self.console.write_line(hdr)
+        self.console.write_line(sep)
+        for num, (_pos, it, cnt) in zip(numbers, page):
+            # adjusted price of the best stored copy (if any)
+            best_q = self.state.inventory.best_quality(it.id)
+            if best_q is not None:
+                adj_txt = str(vals.adjusted(it, best_q)).rjust(price_w)
+                q_txt = f"{best_q:.6f}"
+            else:
+                adj_txt = str(it.price).rjust(price_w)
+                q_txt = "-"
+            tail = f"{str(cnt).rjust(cnt_w)} | {str(it.name).ljust(name_w)} | {str(it.id).ljust(id_w)}"
+            if simple:
+                line = f"{str(it.price).rjust(price_w)} | {tail}  => {adj_txt} q:{q_txt}"
+            else:
+                line = f"{adj_txt} | {tail}  качество={q_txt}"
+            self.console.write_line(f"{num.rjust(num_w)} | {line}")
+        pager = view.pager
+        self.console.write_line(
+            f"Страница {pager.page}/{pager.pages(view.item_count())} "
+            f"(предметов: {view.item_count()}, копий: {view.row_count()})"
+        )
+        return True
+
+    @staticmethod
+    def _parse_range(text: str, cast: Callable[[str], Any]) -> Tuple[Any, Any]:
+        """"lo-hi", "lo-" or "-hi" -> (lo, hi) with None for a missing side."""
+        text = text.strip()
+        if not text:
+            return None, None
+        lo_txt, _, hi_txt = text.partition("-")
+        lo = cast(lo_txt.strip()) if lo_txt.strip() else None
+        hi = cast(hi_txt.strip()) if hi_txt.strip() else None
+        return lo, hi
+
+    def _bulk_sell(self, category: str) -> None:
+        """Массовая продажа по правилу: предпросмотр количества и суммы, затем одна операция."""
+        self.console.write_line("")
+        self.console.write_line("=== Массовая продажа (80% скорр. цены) ===")
+        try:
+            raw = self.console.read_input(f"Категория (Enter — {category}, all — все): ").strip().lower()
+            cat = category if not raw else raw
+            q_lo, q_hi = self._parse_range(
+                self.console.read_input("Качество от-до, например 0-0.5 (Enter — любое): "), float
+            )
+            p_lo, p_hi = self._parse_range(
+                self.console.read_input("Скорр. цена от-до, например 0-1000 (Enter — любая): "), int
+            )
+            raw = self.console.read_input("Оставить лучших копий каждого предмета (Enter — 0): ").strip()
+            keep = int(raw) if raw else 0
+        except ValueError:
+            self.console.write_line("Неверный ввод.")
+            self.console.wait_for_key()
+            return
+
+        rule = SellRule(
+            category=None if cat == "all" else cat,
+            min_quality=q_lo,
+            max_quality=q_hi,
+            min_price=p_lo,
+            max_price=p_hi,
+            keep_best=keep,
+        )
+        plan = plan_sale(self.state.inventory, rule)
+        if not plan.count:
+            self.console.write_line("Под правило не попало ни одной копии.")
+            self.console.wait_for_key()
+            return
+        top = sorted(plan.per_item.values(), key=lambda row: row[2], reverse=True)[:10]
+        for it, n, payout in top:
+            self.console.write_line(f"  {it.name}: {n} шт. — {payout}")
+        if len(plan.per_item) > len(top):
+            self.console.write_line(f"  ... и ещё предметов: {len(plan.per_item) - len(top)}")
+        self.console.write_line(f"Будет продано: {plan.count} шт. на сумму {plan.payout}")
+        if self.console.read_input("Продать? (y/n): ").strip().lower() != "y":
+            return
+        if execute_sale(self.state, plan):
+            self.console.write_line(f"Продано {plan.count} шт. за {plan.payout}. Баланс: {self.state.balance}")
+        else:
+            self.console.write_line("Не удалось продать: инвентарь изменился.")
+        self.console.wait_for_key()
+
     def run(self) -> Optional[str]:
         # prepare data
         all_items = list(presets.ITEMS)
@@ -65,8 +177,12 @@ class InventoryScene(Scene):
         # - "catalog_items": browse full catalog of items (no counts)
         # - "catalog_cases": browse full catalog of cases
         view_mode = "simple"
+        view = InventoryView(self.state.inventory, page_size=self.PAGE_SIZE)
 
         while True:
+            if view.inventory is not self.state.inventory:
+                # the state got a new inventory (e.g. after loading a save)
+                view = InventoryView(self.state.inventory, page_size=self.PAGE_SIZE)
             self.console.clear()
             self.console.write_line("=== Инвентарь ===")
             self.console.write_line(f"Баланс: {self.state.balance}")
@@ -79,45 +195,14 @@ class InventoryScene(Scene):
             self.console.write_empty_line()
 
             if view_mode == "advanced_items":
-                # advanced items: show only owned items with filters/sort
-                owned = self.state.inventory.get_items()
-                if not owned:
+                # advanced items: show only owned items with filters/sort, one page at a time
+                view.configure(self.ITEM_CATEGORIES[category_idx], sort_field, sort_reverse)
+                if not self._print_owned_page(view, simple=False):
                     self.console.write_line("Инвентарь пуст. У вас нет предметов.")
-                else:
-                    # apply category filter
-                    cat = self.ITEM_CATEGORIES[category_idx]
-                    filtered = [(it, cnt) for it, cnt in owned if cat == "all" or it.category == cat]
-                    # sort by selected field
-                    sorted_items = sorted(filtered, key=lambda ic: getattr(ic[0], sort_field), reverse=sort_reverse)
-
-                    price_w = max((len(str(it.price)) for it, _ in sorted_items), default=5)
-                    cnt_w = max((len(str(cnt)) for _, cnt in sorted_items), default=3)
-                    name_w = max((len(str(it.name)) for it, _ in sorted_items), default=4)
-                    id_w = max((len(str(it.id)) for it, _ in sorted_items), default=2)
-
-                    hdr = f"{'Цена'.rjust(price_w)} | {'Кол-во'.rjust(cnt_w)} | {'Название'.ljust(name_w)} | {'ID'.ljust(id_w)}"
-                    sep = f"{'-' * price_w}-+-{'-' * cnt_w}-+-{'-' * name_w}-+-{'-' * id_w}"
-                    self.console.write_line(hdr)
-                    self.console.write_line(sep)
-                    for it, cnt in sorted_items:
-                        # Determine adjusted price from stored qualities (if any)
-                        qlist = self.state.inventory.get_item_qualities(it.id)
-                        if qlist:
-                            # pick best adjusted price to display
-                            best_q = max(qlist)
-                            mult = price_multiplier(best_q)
-                            adj = int(round(it.price * mult))
-                            q_txt = f"{best_q:.6f}"
-                            adj_txt = str(adj).rjust(price_w)
-                        else:
-                            q_txt = "-"
-                            adj_txt = str(it.price).rjust(price_w)
-                        self.console.write_line(
-                            f"{adj_txt} | {str(cnt).rjust(cnt_w)} | {str(it.name).ljust(name_w)} | {str(it.id).ljust(id_w)}  качество={q_txt}"
-                        )
                 # help for advanced items
                 self.console.write_line("")
-                self.console.write_line("[T] Переключить на кейсы | [C] Сменить категорию | [S] Сменить поле сортировки | [O] Порядок | [V] Посмотреть каталог | [pN] Продать предмет N | [q] Назад")
+                self.console.write_line("[T] Переключить на кейсы | [C] Сменить категорию | [S] Сменить поле сортировки | [O] Порядок | [V] Посмотреть каталог | [pN] Продать предмет N | [M] Массовая продажа | [q] Назад")
+                self.console.write_line(self.PAGE_HELP)
             elif view_mode == "catalog_items":
                 # full catalog browsing (no counts)
                 sorted_by_price = self._sort_items(all_items, sort_field, sort_reverse)
@@ -137,38 +222,14 @@ class InventoryScene(Scene):
             elif view_mode == "simple":
                 # simple view: list only items actually owned by the player,
                 # sorted by price ascending
-                owned = self.state.inventory.get_items()  # List[Tuple[Item,int]]
-                if not owned:
+                view.configure("all", "price", False)
+                if not self._print_owned_page(view, simple=True):
                     self.console.write_line("Инвентарь пуст. У вас нет предметов.")
-                else:
-                    owned_sorted = sorted(owned, key=lambda ic: ic[0].price)
-                    price_w = max((len(str(it.price)) for it, _ in owned_sorted), default=5)
-                    cnt_w = max((len(str(cnt)) for _, cnt in owned_sorted), default=3)
-                    name_w = max((len(str(it.name)) for it, _ in owned_sorted), default=4)
-                    id_w = max((len(str(it.id)) for it, _ in owned_sorted), default=2)
-
-                    hdr = f"{'Цена'.rjust(price_w)} | {'Кол-во'.rjust(cnt_w)} | {'Название'.ljust(name_w)} | {'ID'.ljust(id_w)}"
-                    sep = f"{'-' * price_w}-+-{'-' * cnt_w}-+-{'-' * name_w}-+-{'-' * id_w}"
-                    self.console.write_line(hdr)
-                    self.console.write_line(sep)
-                    for it, cnt in owned_sorted:
-                        qlist = self.state.inventory.get_item_qualities(it.id)
-                        if qlist:
-                            best_q = max(qlist)
-                            mult = price_multiplier(best_q)
-                            adj = int(round(it.price * mult))
-                            q_txt = f"{best_q:.6f}"
-                            adj_txt = str(adj).rjust(price_w)
-                        else:
-                            q_txt = "-"
-                            adj_txt = str(it.price).rjust(price_w)
-                        self.console.write_line(
-                            f"{str(it.price).rjust(price_w)} | {str(cnt).rjust(cnt_w)} | {str(it.name).ljust(name_w)} | {str(it.id).ljust(id_w)}  => {adj_txt} q:{q_txt}"
-                        )
                 self.console.write_line("")
                 self.console.write_line("[A] Открыть продвинутый режим")
                 self.console.write_line("[V] Просмотреть каталог (все предметы)")
-                self.console.write_line("[pN] Продать предмет N (например p1) | [q] Назад в меню")
+                self.console.write_line("[pN] Продать предмет N (например p1) | [M] Массовая продажа | [q] Назад в меню")
+                self.console.write_line(self.PAGE_HELP)
             elif view_mode == "advanced_cases":
                 owned_cases = self.state.inventory.get_cases()
                 if not owned_cases:
@@ -248,8 +309,12 @@ class InventoryScene(Scene):
             elif choice == "c":
                 if view_mode == "advanced_items":
                     category_idx = (category_idx + 1) % len(self.ITEM_CATEGORIES)
+            elif view_mode in ("simple", "advanced_items") and view.pager.handle(choice, view.item_count()):
+                pass
+            elif choice == "m" and view_mode in ("simple", "advanced_items"):
+                self._bulk_sell(self.ITEM_CATEGORIES[category_idx] if view_mode == "advanced_items" else "all")
             # Selling command: p<number> or s<number>
-            elif choice.startswith(("p", "s")):
+            elif choice.startswith("p") or (choice.startswith("s") and len(choice) > 1):
                 # Only allow selling when we are showing owned items (simple or advanced_items)
                 if view_mode not in ("simple", "advanced_items"):
                     self.console.write_line("Продажа доступна только для списка owned items.")
@@ -259,64 +324,41 @@ class InventoryScene(Scene):
                     if not numpart.isdigit():
                         self.console.write_line("Укажите номер предмета, например p1")
                         self.console.wait_for_key()
+                    elif view.item_count() == 0:
+                        self.console.write_line("У вас нет предметов для продажи.")
+                        self.console.wait_for_key()
                     else:
-                        idx = int(numpart) - 1
-                        owned_list = self.state.inventory.get_items()
-                        if not owned_list:
-                            self.console.write_line("У вас нет предметов для продажи.")
+                        # N numbers every owned copy in the order shown on screen
+                        # (see the № column); resolved through the cached view
+                        row = view.row(int(numpart) - 1)
+                        if row is None:
+                            self.console.write_line("Нет такого номера предмета.")
                             self.console.wait_for_key()
                         else:
-                            # Build the list of display rows that match what's shown
-                            display_rows: List[Tuple[str, str, int, int, float | None]] = []
-                            # Each row: (item_id, name, base_price, adj_price, quality_or_None)
+                            item_id, name, base_price, adj_price, qual = row
+                            sell_price = int(adj_price * 0.8)
 
-                            # Determine ordering as shown on screen
-                            if view_mode == "simple":
-                                ordered = sorted(owned_list, key=lambda ic: ic[0].price)
-                            else:
-                                cat = self.ITEM_CATEGORIES[category_idx]
-                                filtered = [(it, cnt) for it, cnt in owned_list if cat == "all" or it.category == cat]
-                                ordered = sorted(filtered, key=lambda ic: getattr(ic[0], sort_field), reverse=sort_reverse)
-
-                            # Expand ordered into rows: if item has per-instance qualities,
-                            # show each quality as a separate row. Otherwise show an aggregated row.
-                            for it, cnt in ordered:
-                                qlist = self.state.inventory.get_item_qualities(it.id)
-                                if qlist:
-                                    # show each instance separately
-                                    for q in qlist:
-                                        mult = price_multiplier(q)
-                                        adj = int(round(it.price * mult))
-                                        display_rows.append((it.id, it.name, it.price, adj, float(q)))
+                            # confirm
+                            try:
+                                confirm = self.console.read_key(f"Продать {name} (qual={qual if qual is not None else '-'} ) за {sell_price}? (y/n): ").strip().lower()
+                            except Exception:
+                                confirm = self.console.read_input(f"Продать {name} (qual={qual if qual is not None else '-'} ) за {sell_price}? (y/n): ").strip().lower()
+                            if confirm == "y":
+                                if qual is None:
+                                    # remove generic copy
+                                    ok = self.state.inventory.remove_item(self.state.inventory.item_catalog[item_id], qty=1)
                                 else:
-                                    # aggregated row
-                                    display_rows.append((it.id, it.name, it.price, it.price, None))
+                                    ok = self.state.inventory.remove_item_by_quality(item_id, float(qual))
 
-                            if idx < 0 or idx >= len(display_rows):
-                                self.console.write_line("Нет такого номера предмета.")
+                                if ok:
+                                    self.state.add_balance(sell_price)
+                                    METRICS.inc("items_sold_total", source="inventory")
+                                    METRICS.inc("sales_payout_total", sell_price, source="inventory")
+                                    get_ledger().record_sale(item_id, None if qual is None else float(qual), sell_price)
+                                    self.console.write_line(f"Продано: {name}. Баланс: {self.state.balance}")
+                                else:
+                                    self.console.write_line("Не удалось продать: недостаточно штук.")
                                 self.console.wait_for_key()
-                            else:
-                                item_id, name, base_price, adj_price, qual = display_rows[idx]
-                                sell_price = int(adj_price * 0.8)
-
-                                # confirm
-                                try:
-                                    confirm = self.console.read_key(f"Продать {name} (qual={qual if qual is not None else '-'} ) за {sell_price}? (y/n): ").strip().lower()
-                                except Exception:
-                                    confirm = self.console.read_input(f"Продать {name} (qual={qual if qual is not None else '-'} ) за {sell_price}? (y/n): ").strip().lower()
-                                if confirm == "y":
-                                    if qual is None:
-                                        # remove generic copy
-                                        ok = self.state.inventory.remove_item(self.state.inventory.item_catalog[item_id], qty=1)
-                                    else:
-                                        ok = self.state.inventory.remove_item_by_quality(item_id, float(qual))
-
-                                    if ok:
-                                        self.state.add_balance(sell_price)
-                                        self.console.write_line(f"Продано: {name}. Баланс: {self.state.balance}")
-                                    else:
-                                        self.console.write_line("Не удалось продать: недостаточно штук.")
-                                    self.console.wait_for_key()
             elif choice == "s":
                 if view_mode in ("advanced_items", "catalog_items"):
                     idx = self.SORT_FIELDS.index(sort_field) if sort_field in self.SORT_FIELDS else 0
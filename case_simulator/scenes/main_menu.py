@@ -36,6 +36,9 @@ class MainMenuScene(Scene):
                 return "inventory"
             if choice == "0":
                 return None
+            if choice in ("d", "D"):
+                # скрытый экран метрик (в меню не показывается)
+                return "debug"
 
             self.console.write_line("Неизвестный вариант. Попробуйте снова.")
             self.console.wait_for_key("Нажмите Enter или Esc для продолжения...")
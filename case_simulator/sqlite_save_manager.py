@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from case_simulator.data import presets
+from case_simulator.models.inventory import Inventory
+from case_simulator.models.sqlite_inventory import InventoryStore, SqliteInventory
+from case_simulator.save_manager import SaveManager
+from case_simulator.state import GameState
+from case_simulator.utils.metrics import METRICS
+
+
+class SqliteSaveManager(SaveManager):
+    """Сохранение в SQLite (`savegame.sqlite`) вместо `savegame.dat`.
+
+    Инвентарь — `SqliteInventory`: количества и качества не загружаются в
+    память при старте, каждая мутация сразу идёт в базу внутри открытой
+    транзакции, а `save()` только дописывает баланс/пресеты в `meta` и
+    делает COMMIT (WAL). `save_snapshot()` дополнительно сбрасывает WAL в
+    основной файл.
+
+    Если базы ещё нет, при первой загрузке переносится существующее
+    сохранение `savegame.dat` (с журналом и резервными копиями); сам файл
+    не удаляется.
+    """
+
+    _DB_FILE = "savegame.sqlite"
+
+    def __init__(self, save_dir: Path | None = None, backups: int | None = None) -> None:
+        # запись в базу синхронная: фоновый поток SaveManager не используется
+        super().__init__(save_dir, background=False, backups=backups)
+        self.db_path = self.save_dir / self._DB_FILE
+        self.store: InventoryStore | None = None
+
+    def _open_store(self) -> InventoryStore:
+        if self.store is None:
+            self.store = InventoryStore(self.db_path)
+        return self.store
+
+    def _new_inventory(self) -> Inventory:
+        catalogs = presets.create_sample_inventory()
+        return SqliteInventory(self._open_store(), item_catalog=catalogs.item_catalog, case_catalog=catalogs.case_catalog)
+
+    def _owns(self, state: GameState) -> bool:
+        inventory = state.inventory
+        return isinstance(inventory, SqliteInventory) and inventory.store is self.store
+
+    def _write_meta(self, state: GameState) -> None:
+        store = self._open_store()
+        if state.balance != self._saved_balance or store.get_meta("balance") is None:
+            store.set_meta("balance", state.balance)
+            self._saved_balance = state.balance
+        granted = list(getattr(state, "granted_presets", []))
+        if granted != self._saved_granted or store.get_meta("granted_presets") is None:
+            store.set_meta("granted_presets", granted)
+            self._saved_granted = granted
+
+    @METRICS.timed("save_seconds")
+    def save(self, state: GameState) -> None:
+        """Зафиксировать изменения с прошлого сохранения одной транзакцией."""
+        if not self._owns(state):
+            self.save_snapshot(state)
+            return
+        self._write_meta(state)
+        self._open_store().commit()
+        state.inventory.dirty.clear()
+        state.dirty.clear()
+
+    @METRICS.timed("save_snapshot_seconds")
+    def save_snapshot(self, state: GameState) -> None:
+        """Записать состояние целиком (инвентарь из памяти импортируется в базу)."""
+        store = self._open_store()
+        if not self._owns(state):
+            self._new_inventory().import_from(state.inventory)  # type: ignore[attr-defined]
+        self._write_meta(state)
+        store.checkpoint()
+        self._track(state)
+
+    def flush(self) -> None:
+        if self.store is not None:
+            self.store.commit()
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    @METRICS.timed("load_seconds")
+    def load(self) -> GameState:
+        """Открыть базу; без неё — перенести `savegame.dat` или создать новое состояние."""
+        store = self._open_store()
+        balance = store.get_meta("balance")
+        if balance is None:
+            # Первый запуск с SQLite: обычная загрузка уже строит инвентарь
+            # в базе (`_new_inventory`), остаётся зафиксировать результат
+            state = super().load()
+            self.save_snapshot(state)
+            return state
+
+        inventory = self._new_inventory()
+        granted: list[str] = list(store.get_meta("granted_presets", []))
+        newly_granted = self._grant_new_presets(inventory, granted)
+        granted.extend(newly_granted)
+        state = GameState(inventory=inventory, balance=balance, granted_presets=granted)
+        self._track(state)
+        self._saved_granted = list(store.get_meta("granted_presets", []))
+        if newly_granted:
+            self.save(state)
+        return state
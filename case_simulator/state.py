@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Set
 
 from case_simulator.models.inventory import Inventory
 
@@ -14,17 +14,25 @@ class GameState:
     balance: int = 0
     # Список id префабов/пресетов, уже выданных игроку (чтобы не выдавать их повторно)
     granted_presets: List[str] = field(default_factory=list)
+    # Изменённые с последнего сохранения секции состояния ("balance", ...)
+    dirty: Set[str] = field(default_factory=set, repr=False, compare=False)
+
+    def is_dirty(self) -> bool:
+        """True if anything changed since the last save."""
+        return bool(self.dirty or self.inventory.dirty)
 
     # Баланс (депозит)
     def add_balance(self, amount: int) -> None:
         if amount <= 0:
             return
         self.balance += amount
+        self.dirty.add("balance")
 
     def try_deduct(self, amount: int) -> bool:
         if amount < 0:
             return False
         if self.balance >= amount:
             self.balance -= amount
+            self.dirty.add("balance")
             return True
         return False
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import random
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: the pure-Python path is used instead
+    np = None
+
+from case_simulator.data import presets
+from case_simulator.models.case import Case
+from case_simulator.models.item import Item
+from case_simulator.utils.drops import get_drop_table
+from case_simulator.utils.metrics import METRICS
+from case_simulator.utils.pricing import price_multipliers
+from case_simulator.utils.quality import _draw_quality, gen_qualities
+from case_simulator.utils.rng import Rng
+
+
+# Opens are sampled in chunks of this size so temporaries stay bounded
+# even for tens of millions of opens.
+BATCH_SIZE = 1 << 20
+# Share of the adjusted price paid when a fresh drop is sold (as in the scene)
+SELL_RATE = 0.88
+
+
+@dataclass
+class OpenBatch:
+    """Columnar result of `open_cases`.
+
+    item_index: index into `items` (the case contents) for every open
+    quality: per-open quality (6 decimals, [0.0, 1.0))
+    multiplier: `price_multipliers(quality)`
+    adjusted_price: max(1, round(item.price * multiplier)) — same as the scene
+
+    Columns are numpy arrays when numpy is installed, `array.array` otherwise.
+    """
+
+    case_id: str
+    items: Tuple[Item, ...]
+    item_index: Any
+    quality: Any
+    multiplier: Any
+    adjusted_price: Any
+
+    def __len__(self) -> int:
+        return len(self.item_index)
+
+    def item_counts(self) -> Dict[str, int]:
+        """Number of drops per item id (items that never dropped are included with 0)."""
+        if np is not None and isinstance(self.item_index, np.ndarray):
+            counts = np.bincount(self.item_index, minlength=len(self.items)).tolist()
+        else:
+            counts = [0] * len(self.items)
+            for i in self.item_index:
+                counts[i] += 1
+        return {it.id: int(c) for it, c in zip(self.items, counts)}
+
+
+def open_cases(case_id: str, n: int, seed: Optional[int] = None, rng: Optional[Rng] = None) -> OpenBatch:
+    """Open `n` copies of case `case_id` headlessly (no animation, no inventory).
+
+    Items are drawn from the cached alias table of the case and qualities
+    from the `gen_quality` mixture. With numpy both are sampled in vectorized
+    chunks; without it a `random.Random(seed)` loop is used. The same seed
+    always gives the same result on the same path. Passing an `Rng` instead
+    of a seed draws from that stream (`rng.numpy()` on the numpy path).
+    """
+    case = presets.CASES_BY_ID.get(case_id)
+    if case is None:
+        raise KeyError(f"unknown case id: {case_id!r}")
+    table = get_drop_table(case)
+    n = max(0, int(n))
+
+    if np is not None:
+        gen = rng.numpy() if rng is not None else np.random.default_rng(seed)
+        return _open_cases_numpy(case_id, table, n, gen)
+    return _open_cases_python(case_id, table, n, rng if rng is not None else random.Random(seed))
+
+
+def _open_cases_numpy(case_id: str, table, n: int, gen) -> OpenBatch:
+    prob_l, alias_l = table.alias_table()
+    prob = np.asarray(prob_l)
+    alias = np.asarray(alias_l, dtype=np.int64)
+    prices = np.asarray([it.price for it in table.items], dtype=np.float64)
+    k = len(prob)
+
+    item_index = np.empty(n, dtype=np.int64)
+    quality = np.empty(n, dtype=np.float64)
+    for lo in range(0, n, BATCH_SIZE):
+        hi = min(n, lo + BATCH_SIZE)
+        u = gen.random(hi - lo) * k
+        col = np.minimum(u.astype(np.int64), k - 1)
+        item_index[lo:hi] = np.where((u - col) < prob[col], col, alias[col])
+        quality[lo:hi] = gen_qualities(hi - lo, gen)
+
+    multiplier = price_multipliers(quality)
+    adjusted = np.maximum(1, np.rint(prices[item_index] * multiplier)).astype(np.int64)
+    return OpenBatch(case_id, table.items, item_index, quality, multiplier, adjusted)
+
+
+def _open_cases_python(case_id: str, table, n: int, rnd: random.Random) -> OpenBatch:
+    item_index = array("q", table.sample_many(n, rnd.random))
+    quality = gen_qualities(n, rnd)
+    multiplier = price_multipliers(quality)
+    prices = [it.price for it in table.items]
+    adjusted = array(
+        "q",
+        (max(1, int(round(prices[i] * m))) for i, m in zip(item_index, multiplier)),
+    )
+    return OpenBatch(case_id, table.items, item_index, quality, multiplier, adjusted)
+
+
+@METRICS.timed("case_draw_seconds")
+def draw_cases(case: Case, n: int, rng: random.Random) -> OpenBatch:
+    """Open `n` copies of `case` exactly like `n` single opens from `rng`.
+
+    Unlike `open_cases` (all items first, then all qualities) each open takes
+    its item and then its quality from `rng`, the order the case-opening
+    scene uses, so a bulk open gives the same drops as opening one by one.
+    """
+    METRICS.inc("case_opens_total", max(0, int(n)))
+    table = get_drop_table(case)
+    sample = table.sample
+    rand = rng.random
+    item_index = array("q")
+    quality = array("d")
+    for _ in range(max(0, int(n))):
+        item_index.append(sample(rand))
+        quality.append(_draw_quality(rng))
+    multiplier = price_multipliers(quality)
+    prices = [it.price for it in table.items]
+    adjusted = array(
+        "q",
+        (max(1, int(round(prices[i] * m))) for i, m in zip(item_index, multiplier)),
+    )
+    return OpenBatch(case.id, table.items, item_index, quality, multiplier, adjusted)
+
+
+@dataclass
+class DropSummary:
+    """Drops of one item in a bulk open."""
+
+    item: Item
+    count: int = 0
+    best_quality: float = 0.0
+    total_adjusted: int = 0
+    # copies sold by the auto-sell rule and what they brought
+    sold: int = 0
+    sold_for: int = 0
+
+
+@dataclass
+class BulkOpenResult:
+    """Outcome of a bulk open: per-item rows (most valuable first) and totals."""
+
+    case_id: str
+    rows: List[DropSummary]
+    opened: int
+    kept: int
+    sold: int
+    sold_for: int
+    total_adjusted: int
+    # item id -> (item, qualities of the copies to keep)
+    kept_qualities: Dict[str, Tuple[Item, List[float]]] = field(default_factory=dict, repr=False)
+
+
+def summarize_open_batch(
+    batch: OpenBatch,
+    sell_below: Optional[float] = None,
+    sell_rate: float = SELL_RATE,
+) -> BulkOpenResult:
+    """Group the drops of `batch` per item and apply the auto-sell rule.
+
+    Drops with adjusted price < `sell_below` are sold at `sell_rate` (rounded
+    down per copy, like a single sale); `float("inf")` sells everything.
+    Nothing is changed — see `settle_open_batch`.
+    """
+    rows: Dict[int, DropSummary] = {}
+    keep: Dict[str, Tuple[Item, List[float]]] = {}
+    for i, q, adj in zip(batch.item_index, batch.quality, batch.adjusted_price):
+        i, q, adj = int(i), float(q), int(adj)
+        row = rows.get(i)
+        if row is None:
+            row = rows[i] = DropSummary(batch.items[i], best_quality=q)
+        row.count += 1
+        row.total_adjusted += adj
+        if q > row.best_quality:
+            row.best_quality = q
+        if sell_below is not None and adj < sell_below:
+            row.sold += 1
+            row.sold_for += int(adj * sell_rate)
+        else:
+            item = batch.items[i]
+            keep.setdefault(item.id, (item, []))[1].append(q)
+
+    ordered = sorted(rows.values(), key=lambda r: r.total_adjusted, reverse=True)
+    sold = sum(r.sold for r in ordered)
+    return BulkOpenResult(
+        case_id=batch.case_id,
+        rows=ordered,
+        opened=len(batch),
+        kept=len(batch) - sold,
+        sold=sold,
+        sold_for=sum(r.sold_for for r in ordered),
+        total_adjusted=sum(r.total_adjusted for r in ordered),
+        kept_qualities=keep,
+    )
+
+
+def settle_open_batch(
+    inventory: Any,
+    batch: OpenBatch,
+    sell_below: Optional[float] = None,
+    sell_rate: float = SELL_RATE,
+) -> BulkOpenResult:
+    """`summarize_open_batch` + add the kept drops to `inventory` (one
+    `add_item_qualities` call per item). The caller credits `sold_for`."""
+    result = summarize_open_batch(batch, sell_below, sell_rate)
+    for item, qualities in result.kept_qualities.values():
+        inventory.add_item_qualities(item, qualities)
+    return result
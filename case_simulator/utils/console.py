@@ -1,28 +1,116 @@
 from __future__ import annotations
 
 import os
+import shutil
 import sys
-from typing import Final
+import time
+from typing import Final, List, Optional, TextIO
+
+from case_simulator.utils.metrics import METRICS
 
 
 class Console:
-    """Utility wrapper around console operations."""
+    """Utility wrapper around console operations.
+
+    Output is frame-buffered: `write_line` appends to an in-memory buffer that
+    is written with a single `stream.write` when the console waits for input
+    or on `flush()`. `clear()` starts a new frame with ANSI escapes instead of
+    spawning `clear`/`cls`. With `diff=True` a full frame (one that started
+    with `clear()`) only rewrites the lines that changed since the previous
+    frame — useful for animations; it falls back to a full redraw whenever
+    the screen contents are unknown (after input) or the frame does not fit
+    the terminal.
+    """
+
+    # cursor home + erase screen
+    _CLEAR_SEQUENCE: Final[str] = "\x1b[H\x1b[2J"
+    # erase to end of line / end of screen
+    _ERASE_LINE: Final[str] = "\x1b[K"
+    _ERASE_BELOW: Final[str] = "\x1b[J"
 
-    _CLEAR_COMMAND_WINDOWS: Final[str] = "cls"
-    _CLEAR_COMMAND_UNIX: Final[str] = "clear"
+    def __init__(self, stream: Optional[TextIO] = None, diff: bool = False) -> None:
+        # None means the current `sys.stdout` (so redirection keeps working)
+        self._stream = stream
+        self.diff = diff
+        self._buffer: List[str] = []
+        # True while the buffer holds a whole frame drawn from the top-left corner
+        self._full_frame = False
+        # lines currently on screen (diff mode), None if unknown
+        self._screen: Optional[List[str]] = None
+        if os.name == "nt":
+            # enables ANSI escape processing in the Windows console
+            os.system("")
+
+    @property
+    def stream(self) -> TextIO:
+        return self._stream if self._stream is not None else sys.stdout
 
     def clear(self) -> None:
-        """Clear the console screen based on underlying OS."""
-        command = self._CLEAR_COMMAND_WINDOWS if os.name == "nt" else self._CLEAR_COMMAND_UNIX
-        os.system(command)
+        """Start a new frame (the screen is cleared when the frame is flushed).
+
+        Anything written since the last flush is dropped: it would be erased
+        by the clear before it could be seen.
+        """
+        self._buffer.clear()
+        self._full_frame = True
+
+    def write(self, text: str) -> None:
+        """Buffer `text` as is (no newline)."""
+        self._buffer.append(text)
 
     def write_line(self, text: str = "") -> None:
-        print(text)
+        self._buffer.append(f"{text}\n")
 
     def write_empty_line(self) -> None:
-        print()
+        self._buffer.append("\n")
+
+    def flush(self) -> None:
+        """Write the buffered frame to the terminal with one `write` call."""
+        if not self._buffer and not self._full_frame:
+            return
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        if self._full_frame:
+            self._full_frame = False
+            out = self._render_frame(text)
+        else:
+            out = text
+            # appended output (e.g. `\r` animation steps) — screen no longer known
+            self._screen = None
+        stream = self.stream
+        with METRICS.timer("console_flush_seconds"):
+            stream.write(out)
+            stream.flush()
+        METRICS.inc("console_bytes_total", len(out))
+
+    def _render_frame(self, text: str) -> str:
+        lines = text.split("\n")
+        previous = self._screen
+        self._screen = None
+        if not self.diff:
+            return self._CLEAR_SEQUENCE + text
+        size = shutil.get_terminal_size()
+        if len(lines) > size.lines or any(len(line) >= size.columns for line in lines):
+            # scrolling/wrapping would break the row bookkeeping
+            return self._CLEAR_SEQUENCE + text
+        self._screen = lines
+        if previous is None:
+            return self._CLEAR_SEQUENCE + text
+        parts: List[str] = []
+        for row, line in enumerate(lines, start=1):
+            if row > len(previous) or previous[row - 1] != line:
+                parts.append(f"\x1b[{row};1H{line}{self._ERASE_LINE}")
+        # leave the cursor where a full redraw would and drop leftover lines
+        parts.append(f"\x1b[{len(lines)};{len(lines[-1]) + 1}H{self._ERASE_BELOW}")
+        return "".join(parts)
+
+    def _before_input(self) -> None:
+        self.flush()
+        # echoed input changes the screen behind our back
+        self._screen = None
 
     def read_input(self, prompt: str = "") -> str:
+        self._before_input()
         return input(prompt)
 
     def read_key(self, prompt: str = "") -> str:
@@ -31,6 +119,7 @@ class Console:
         Returns the single character as a string. Works on Windows and Unix-like.
         Echoes a newline after the key so subsequent output appears on next line.
         """
+        self._before_input()
         try:
             if os.name == "nt":
                 import msvcrt
@@ -60,9 +149,52 @@ class Console:
             print()
             sys.exit(0)
 
+    def poll_key(self, timeout: float = 0.0) -> Optional[str]:
+        """Wait at most `timeout` seconds for a keypress and return it (None if
+        there was none). Flushes the buffer first; the key is not echoed.
+
+        Without an interactive stdin it just sleeps for `timeout`.
+        """
+        self.flush()
+        timeout = max(0.0, timeout)
+        try:
+            if os.name == "nt":
+                import msvcrt
+                deadline = time.perf_counter() + timeout
+                while True:
+                    if msvcrt.kbhit():
+                        return msvcrt.getwch()
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        return None
+                    time.sleep(min(0.01, remaining))
+            if not sys.stdin.isatty():
+                time.sleep(timeout)
+                return None
+            import select
+            import termios
+            import tty
+            fd = sys.stdin.fileno()
+            old_settings = termios.tcgetattr(fd)
+            try:
+                tty.setcbreak(fd)
+                ready, _, _ = select.select([fd], [], [], timeout)
+                if not ready:
+                    return None
+                # read the whole pending chunk so escape sequences (arrows) count as one key
+                data = os.read(fd, 32).decode("utf-8", errors="replace")
+                return data[:1] or None
+            finally:
+                termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+        except (OSError, ValueError):
+            # no usable terminal (e.g. closed/redirected stdin)
+            time.sleep(timeout)
+            return None
+
     def wait_for_key(self, message: str | None = None) -> None:
         """Wait for Enter or Escape key press."""
         prompt = message or "Нажмите Enter или Esc для продолжения..."
+        self._before_input()
         try:
             if os.name == "nt":  # Windows
                 import msvcrt
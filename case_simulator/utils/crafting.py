@@ -1,12 +1,19 @@
 from __future__ import annotations
 
-import random
+import itertools
 import time
-from typing import Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 from case_simulator.data import presets
+from case_simulator.ledger import get_ledger
+from case_simulator.models.item import Item
+from case_simulator.utils.metrics import METRICS
 from case_simulator.utils.quality import gen_quality
 from case_simulator.utils.pricing import price_multiplier
+from case_simulator.utils.rng import Rng, get_rng
+from case_simulator.utils.templates import get_template_index
+from case_simulator.utils.valuation import get_valuations
 
 
 # Tier definitions: user-selectable success chance tiers.
@@ -20,20 +27,26 @@ TIERS = {
     10: {"mult": 6.0, "boost": 0.02},
 }
 
+# suffix of synthetic crafted ids: several crafts within one millisecond
+# (a `craft_batch`) must not share an id
+_CRAFTED_SEQ = itertools.count(1)
+
 
 def compute_adjusted_sum(items: Iterable[Tuple[str, float]]) -> float:
     """Compute sum of adjusted prices for selected items.
 
     items: iterable of (item_id, quality) tuples (qualities are per-instance).
-    Uses `presets.ITEMS_BY_ID` to look up base price and `price_multiplier`.
+    Uses `presets.ITEMS_BY_ID` to look up base price and `price_multiplier`;
+    per-instance values come from the shared valuation cache, so previewing
+    and then crafting the same selection prices every input only once.
     """
+    valuations = get_valuations()
     s = 0.0
     for iid, q in items:
         template = presets.ITEMS_BY_ID.get(iid)
         if template is None:
             continue
-        mult = price_multiplier(float(q)) if q is not None else 1.0
-        s += template.price * mult
+        s += valuations.value(template, None if q is None else float(q))
     return float(s)
 
 
@@ -51,14 +64,16 @@ def _quality_improvement_cap(avg_q: float) -> float:
     return 0.02
 
 
-def generate_new_quality(avg_q: float, tier: int) -> float:
+def generate_new_quality(avg_q: float, tier: int, rng: Optional[Rng] = None) -> float:
     """Generate a new quality for the crafted item.
 
     Guarantees new_q >= avg_q. The maximum improvement over avg_q is
     limited by `_quality_improvement_cap`. A small rare boost (tier-dependent)
     can replace the quality with a sampled `gen_quality()` result if that is
-    larger than the base result.
+    larger than the base result. Randomness comes from `rng` (default:
+    the shared `get_rng()` stream).
     """
+    rng = rng if rng is not None else get_rng()
     cap = _quality_improvement_cap(avg_q)
     max_q = min(0.999999, avg_q + cap)
 
@@ -66,15 +81,15 @@ def generate_new_quality(avg_q: float, tier: int) -> float:
     if max_q <= avg_q:
         base_q = avg_q
     else:
-        base_q = random.uniform(avg_q, max_q)
+        base_q = rng.uniform(avg_q, max_q)
 
     # Chance for a rare boost that may yield much higher q; tier lowers or
     # increases boost probability (lower-tier => larger boost chance)
     tier_info = TIERS.get(tier, TIERS[50])
     boost_p = tier_info.get("boost", 0.001)
 
-    if random.random() < boost_p:
-        boosted = gen_quality()
+    if rng.random() < boost_p:
+        boosted = gen_quality(rng)
         # But respect the rule that final quality cannot be worse than avg_q
         final_q = max(avg_q, boosted)
         # and clamp
@@ -93,96 +108,113 @@ def select_output_template(target_value: float, new_quality: float, category: Op
     Returns (item_id, item_price) or None if nothing suitable found. If `category` is
     provided, candidate pool is restricted to that category.
     """
-    # Consider only Items with price > 0
-    candidates = [it for it in presets.ITEMS if it.price > 0]
-    if category:
-        candidates = [it for it in candidates if it.category == category]
+    # Compute adjusted price for each candidate using price_multiplier(new_quality);
+    # the nearest one is found by bisecting the price-sorted template index
+    mult = price_multiplier(float(new_quality))
+    found = get_template_index().nearest(target_value, mult, category, k=1)
+    if not found:
+        return None
+    best = found[0]
 
-    if not candidates:
+    # Accept candidate only if not absurdly far from target (e.g., within 4x)
+    adjusted_best = best.price * mult
+    if adjusted_best > target_value * 4 and target_value > 0:
+        # too expensive relative to target
         return None
+    return (best.id, best.price)
 
-    # Compute adjusted price for each candidate using price_multiplier(new_quality)
-    mult = price_multiplier(float(new_quality))
 
-    best = None
-    best_diff = None
-    for it in candidates:
-        adjusted = it.price * mult
-        diff = abs(adjusted - target_value)
-        if best is None or diff < best_diff:
-            best = it
-            best_diff = diff
+def preview_output_templates(
+    selections: List[Tuple[str, float]],
+    mode: str,
+    tier: int = 50,
+    k: int = 3,
+    quality: Optional[float] = None,
+) -> List[Tuple[Item, int]]:
+    """Up to `k` templates a craft could produce, closest to the target first.
+
+    The real output quality is random (never below the average input
+    quality), so the preview uses `quality` or, by default, the average input
+    quality. Returns (template, adjusted_price) pairs.
+    """
+    qualities = [q for _, q in selections if q is not None]
+    avg_q = float(sum(qualities) / len(qualities)) if qualities else 0.0
+    q = avg_q if quality is None else float(quality)
+    mult_mode, _chance = mode_multiplier(mode, tier, len(selections))
+    target_value = compute_adjusted_sum(selections) * mult_mode
+    mult = price_multiplier(q)
+    found = get_template_index().nearest(target_value, mult, output_category(selections), k=k)
+    return [(it, int(round(it.price * mult))) for it in found]
+
 
-    # Accept candidate only if not absurdly far from target (e.g., within 4x)
-    if best is not None:
-        adjusted_best = best.price * mult
-        if adjusted_best > target_value * 4 and target_value > 0:
-            # too expensive relative to target
-            return None
-        return (best.id, best.price)
-    return None
+def mode_multiplier(mode: str, tier: int, count: int) -> Tuple[float, float]:
+    """(target value multiplier, success chance) of a crafting mode/tier."""
+    if mode == "probabilistic":
+        tier_info = TIERS.get(tier, TIERS[50])
+        return tier_info["mult"], tier / 100.0
+    if mode == "deterministic":
+        return 1.0, 1.0
+    if mode == "fusion":
+        # fusion: modest multiplier depending on count
+        count = max(1, count)
+        return 1.0 + 0.05 * (count - 1), 1.0
+    if mode == "upgrade":
+        return 1.0, tier / 100.0
+    return 1.0, 1.0
 
 
+def output_category(selections: Iterable[Tuple[str, float]]) -> Optional[str]:
+    """Category kept by the output: set only if all inputs share one category."""
+    categories = set()
+    for iid, _ in selections:
+        it = presets.ITEMS_BY_ID.get(iid)
+        if it is not None:
+            categories.add(it.category)
+    return categories.pop() if len(categories) == 1 else None
+
+
+@METRICS.timed("craft_seconds")
 def craft_items(
     state,
     selections: List[Tuple[str, float]],
     mode: str,
     tier: int = 50,
+    rng: Optional[Rng] = None,
 ) -> dict:
     """Perform crafting operation on selected items.
 
     - `selections`: list of (item_id, quality) tuples (qualities are per-instance)
     - `mode`: one of 'probabilistic', 'deterministic', 'fusion', 'upgrade'
     - `tier`: selected success tier (50,35,25,10). For deterministic/fusion tier is ignored.
+    - `rng`: random stream for the attempt and the new quality (default: `get_rng()`),
+      so a seeded `Rng` makes the result reproducible.
 
     Returns a dict with keys: success(bool), cost(int), output: Optional[dict]
     """
+    rng = rng if rng is not None else get_rng()
     # compute average quality and adjusted sum
     qualities = [q for _, q in selections if q is not None]
     avg_q = float(sum(qualities) / len(qualities)) if qualities else 0.0
     adjusted_sum = compute_adjusted_sum(selections)
 
     # base cost: 0.2% of adjusted sum (0.002). Previously 1% — lowered per user request.
-    cost = max(1, int(round(adjusted_sum * 0.002)))
+    cost = craft_cost(adjusted_sum)
 
     # Determine final multiplier and success chance depending on mode/tier
-    if mode == "probabilistic":
-        tier_info = TIERS.get(tier, TIERS[50])
-        mult = tier_info["mult"]
-        success_chance = tier / 100.0
-    elif mode == "deterministic":
-        mult = 1.0
-        success_chance = 1.0
-    elif mode == "fusion":
-        # fusion: modest multiplier depending on count
-        count = max(1, len(selections))
-        mult = 1.0 + 0.05 * (count - 1)
-        success_chance = 1.0
-    elif mode == "upgrade":
-        tier_info = TIERS.get(tier, TIERS[50])
-        mult = 1.0
-        success_chance = tier / 100.0
-    else:
-        mult = 1.0
-        success_chance = 1.0
+    mult, success_chance = mode_multiplier(mode, tier, len(selections))
 
     target_value = adjusted_sum * mult
 
     # Choose category preservation: if all inputs same category -> preserve it
-    categories = set()
-    for iid, _ in selections:
-        it = presets.ITEMS_BY_ID.get(iid)
-        if it is not None:
-            categories.add(it.category)
-    preserved_category = categories.pop() if len(categories) == 1 else None
+    preserved_category = output_category(selections)
 
     # Simulate the attempt (random for probabilistic/upgrade modes)
     success = True
     if success_chance < 1.0:
-        success = random.random() < success_chance
+        success = rng.random() < success_chance
 
     # Generate new quality (always created anew; per-user requirement)
-    new_q = generate_new_quality(avg_q, tier)
+    new_q = generate_new_quality(avg_q, tier, rng)
 
     # Select output template close to target_value; if none, create synthetic
     sel = select_output_template(target_value, new_q, category=preserved_category)
@@ -206,7 +238,7 @@ def craft_items(
         mult_q = price_multiplier(float(new_q))
         if mult_q > 0:
             base_price = int(round(target_value / mult_q))
-        cid = f"crafted_{int(time.time() * 1000)}"
+        cid = f"crafted_{int(time.time() * 1000)}_{next(_CRAFTED_SEQ)}"
         cname = f"Crafted {'/'.join([presets.ITEMS_BY_ID[i].category for i, _ in selections]) if preserved_category else 'Weapon'}"
         output = {
             "id": cid,
@@ -218,4 +250,211 @@ def craft_items(
             "expected_value": target_value,
         }
 
+    METRICS.inc("crafts_total", mode=mode, result="success" if success else "fail")
+    ledger = get_ledger()
+    if ledger.enabled and output is not None:
+        valuations = get_valuations()
+        ledger.record_craft(
+            [
+                (iid, q, int(round(valuations.value(presets.ITEMS_BY_ID[iid], None if q is None else float(q)))))
+                for iid, q in selections
+                if iid in presets.ITEMS_BY_ID
+            ],
+            # synthetic crafted ids are unique per craft: keep them out of the ledger id table
+            output["id"] if output["id"] in presets.ITEMS_BY_ID else None,
+            new_q,
+            int(round(output["price"] * price_multiplier(float(new_q)))),
+            success,
+            cost,
+        )
     return {"success": success, "cost": cost, "output": output, "avg_q": avg_q, "adjusted_sum": adjusted_sum}
+
+
+# --- Пакетный крафт ---
+CRAFT_MODES = ("probabilistic", "deterministic", "fusion", "upgrade")
+
+
+def input_limits(mode: str) -> Tuple[int, int]:
+    """(min, max) number of input items for `mode` (same rules as the scene)."""
+    return (1, 1) if mode == "upgrade" else (2, 8)
+
+
+def craft_cost(adjusted_sum: float) -> int:
+    """Price of one attempt: 0.2% of the adjusted input value, at least 1."""
+    return max(1, int(round(adjusted_sum * 0.002)))
+
+
+class CraftBatchError(ValueError):
+    """A batch failed validation; nothing was burned or charged."""
+
+
+@dataclass
+class CraftPlan:
+    """One craft of a batch: inputs as (item_id, quality) + mode and tier."""
+
+    selections: List[Tuple[str, Optional[float]]]
+    mode: str = "probabilistic"
+    tier: int = 50
+
+
+@dataclass
+class CraftBatchResult:
+    """Columnar result of `craft_batch` (one row per plan, in plan order)."""
+
+    success: List[bool] = field(default_factory=list)
+    cost: List[int] = field(default_factory=list)
+    adjusted_sum: List[float] = field(default_factory=list)
+    output_id: List[Optional[str]] = field(default_factory=list)
+    output_quality: List[Optional[float]] = field(default_factory=list)
+    output_value: List[float] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.success)
+
+    @property
+    def total_cost(self) -> int:
+        return sum(self.cost)
+
+    @property
+    def successes(self) -> int:
+        return sum(self.success)
+
+    @property
+    def total_input_value(self) -> float:
+        return float(sum(self.adjusted_sum))
+
+    @property
+    def total_output_value(self) -> float:
+        return float(sum(self.output_value))
+
+
+def craft_batch(state, plans: Sequence[CraftPlan], rng: Optional[Rng] = None) -> CraftBatchResult:
+    """Run many crafts in one pass.
+
+    1. validates every plan (mode, input count, owned copies, total cost vs
+       balance) — on any problem raises `CraftBatchError` and changes nothing;
+    2. burns all inputs with one `Inventory.remove_items_bulk` call;
+    3. charges the total cost with one balance update;
+    4. rolls every craft (`craft_items` with `rng`) and adds the successful
+       outputs grouped per template (`Inventory.add_item_qualities`).
+    """
+    inventory = state.inventory
+    rng = rng if rng is not None else get_rng()
+
+    removals: Dict[str, List[Optional[float]]] = {}
+    costs: List[int] = []
+    # like the scene, copies without quality are crafted as quality 0.0
+    normalized = [[(iid, 0.0 if q is None else float(q)) for iid, q in plan.selections] for plan in plans]
+    for n, plan in enumerate(plans, start=1):
+        if plan.mode not in CRAFT_MODES:
+            raise CraftBatchError(f"план {n}: неизвестный режим {plan.mode!r}")
+        lo, hi = input_limits(plan.mode)
+        if not (lo <= len(plan.selections) <= hi):
+            raise CraftBatchError(f"план {n}: нужно от {lo} до {hi} предметов, выбрано {len(plan.selections)}")
+        for iid, q in plan.selections:
+            removals.setdefault(iid, []).append(None if q is None else float(q))
+        costs.append(craft_cost(compute_adjusted_sum(normalized[n - 1])))
+
+    for iid, wanted in removals.items():
+        owned = inventory.item_counts.get(iid, 0)
+        if len(wanted) > owned:
+            raise CraftBatchError(f"недостаточно предметов {iid}: нужно {len(wanted)}, есть {owned}")
+    total_cost = sum(costs)
+    if total_cost > state.balance:
+        raise CraftBatchError(f"недостаточно средств: нужно {total_cost}, баланс {state.balance}")
+
+    if not inventory.remove_items_bulk(removals):
+        raise CraftBatchError("не удалось списать входные предметы")
+    state.try_deduct(total_cost)
+
+    result = CraftBatchResult()
+    outputs: Dict[str, Tuple[Item, List[float]]] = {}
+    for plan, selections in zip(plans, normalized):
+        res = craft_items(state, selections, plan.mode, plan.tier, rng=rng)
+        out = res.get("output")
+        ok = bool(res["success"]) and out is not None
+        result.success.append(ok)
+        result.cost.append(res["cost"])
+        result.adjusted_sum.append(res["adjusted_sum"])
+        result.output_id.append(out["id"] if ok else None)
+        result.output_quality.append(float(out["quality"]) if ok else None)
+        result.output_value.append(out["price"] * price_multiplier(float(out["quality"])) if ok else 0.0)
+        if ok:
+            tmpl = presets.ITEMS_BY_ID.get(out["id"])
+            if tmpl is None:
+                tmpl = Item(id=out["id"], name=out["name"], price=int(out.get("price", 0)), category=out.get("category", "weapon"))
+            outputs.setdefault(tmpl.id, (tmpl, []))[1].append(float(out["quality"]))
+
+    for tmpl, qualities in outputs.values():
+        inventory.add_item_qualities(tmpl, qualities)
+    return result
+
+
+def plan_duplicate_crafts(
+    inventory,
+    category: Optional[str],
+    tier: int = 50,
+    mode: str = "probabilistic",
+    keep: int = 1,
+    group: int = 8,
+) -> List[CraftPlan]:
+    """Plans that craft away duplicates of `category` (all if None).
+
+    For every owned item id the `keep` best copies are kept; the remaining
+    copies, lowest quality first, are packed into crafts of up to `group`
+    inputs (a leftover single copy stays in the inventory).
+    """
+    lo, hi = input_limits(mode)
+    group = max(lo, min(group, hi))
+    spare: List[Tuple[float, str]] = []
+    for it, count in inventory.get_items():
+        if category and it.category != category:
+            continue
+        extra = count - keep
+        if extra <= 0:
+            continue
+        qualities = inventory.get_item_qualities(it.id)  # ascending
+        stored = qualities[: max(0, len(qualities) - keep)][:extra]
+        spare.extend((q, it.id) for q in stored)
+        # copies without stored quality count as 0.0
+        spare.extend((0.0, it.id) for _ in range(extra - len(stored)))
+    spare.sort()
+
+    plans: List[CraftPlan] = []
+    for start in range(0, len(spare), group):
+        chunk = spare[start:start + group]
+        if len(chunk) < lo:
+            break
+        plans.append(CraftPlan([(iid, q) for q, iid in chunk], mode, tier))
+    return plans
+
+
+def craft_duplicates(
+    state,
+    category: Optional[str],
+    tier: int = 50,
+    mode: str = "probabilistic",
+    rng: Optional[Rng] = None,
+    max_rounds: int = 1000,
+) -> CraftBatchResult:
+    """Craft until none remain: repeat `craft_batch` over the duplicates of
+    `category` (outputs can create new duplicates) until there is nothing left
+    to craft or the balance no longer covers the next plan."""
+    total = CraftBatchResult()
+    for _ in range(max_rounds):
+        plans = plan_duplicate_crafts(state.inventory, category, tier, mode)
+        # keep only the prefix the balance can pay for
+        budget = state.balance
+        affordable: List[CraftPlan] = []
+        for plan in plans:
+            cost = craft_cost(compute_adjusted_sum([(i, 0.0 if q is None else q) for i, q in plan.selections]))
+            if cost > budget:
+                break
+            budget -= cost
+            affordable.append(plan)
+        if not affordable:
+            break
+        res = craft_batch(state, affordable, rng=rng)
+        for name in ("success", "cost", "adjusted_sum", "output_id", "output_quality", "output_value"):
+            getattr(total, name).extend(getattr(res, name))
+    return total
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from case_simulator.data import presets
+from case_simulator.models.case import Case
+from case_simulator.models.item import Item
+from case_simulator.utils.rng import get_rng
+
+
+def drop_weight(item: Item, power: float, min_weight: float, multiplier: float) -> float:
+    """Return the drop weight of `item` for the configured drop curve.
+
+    Formula (see `presets.DROP_*`):
+    raw = 1 / (rare ** power) for rare > 0, raw = 1 for rare <= 0;
+    weight = max(min_weight, raw * multiplier).
+    """
+    try:
+        r = float(getattr(item, "rare", 0) or 0)
+    except Exception:
+        r = 0.0
+    if r <= 0:
+        raw = 1.0
+    else:
+        raw = 1.0 / (r ** float(power))
+    return max(float(min_weight), float(raw) * float(multiplier))
+
+
+def drop_params() -> Tuple[float, float, float]:
+    """Current (power, min_weight, multiplier) read from `presets`."""
+    return (
+        float(getattr(presets, "DROP_RARE_POWER", 1.0)),
+        float(getattr(presets, "DROP_MIN_WEIGHT", 1e-6)),
+        float(getattr(presets, "DROP_WEIGHT_MULTIPLIER", 1.0)),
+    )
+
+
+class DropTable:
+    """Weighted sampler over the items of one case (Walker/Vose alias method).
+
+    The table is built once in O(n); every draw is O(1) and consumes a single
+    uniform random number. `sample()` returns the index of the winning item
+    in `items`, so callers never need `items.index(winner)`.
+    """
+
+    __slots__ = ("items", "weights", "_prob", "_alias")
+
+    def __init__(self, items: Sequence[Item], weights: Sequence[float]) -> None:
+        if len(items) != len(weights):
+            raise ValueError("items and weights must have the same length")
+        if not items:
+            raise ValueError("cannot build a drop table for an empty case")
+        self.items: Tuple[Item, ...] = tuple(items)
+        self.weights: Tuple[float, ...] = tuple(float(w) for w in weights)
+        self._prob, self._alias = self._build(self.weights)
+
+    @classmethod
+    def for_case(cls, case: Case, params: Tuple[float, float, float] | None = None) -> "DropTable":
+        power, min_w, mult = params if params is not None else drop_params()
+        items = tuple(case.items)
+        return cls(items, [drop_weight(it, power, min_w, mult) for it in items])
+
+    @staticmethod
+    def _build(weights: Sequence[float]) -> Tuple[List[float], List[int]]:
+        n = len(weights)
+        total = float(sum(weights))
+        if total <= 0:
+            # Degenerate weights — fall back to a uniform draw
+            return [1.0] * n, list(range(n))
+
+        scaled = [w * n / total for w in weights]
+        prob = [0.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+
+        # Whatever is left is 1.0 up to rounding error
+        for i in large:
+            prob[i] = 1.0
+        for i in small:
+            prob[i] = 1.0
+        return prob, alias
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def probabilities(self) -> List[float]:
+        """Normalized drop probability of every item (same order as `items`)."""
+        total = sum(self.weights)
+        if total <= 0:
+            return [1.0 / len(self.weights)] * len(self.weights)
+        return [w / total for w in self.weights]
+
+    def alias_table(self) -> Tuple[List[float], List[int]]:
+        """Copies of the (probability, alias) columns, e.g. for vectorized draws."""
+        return list(self._prob), list(self._alias)
+
+    def sample(self, rand: Optional[Callable[[], float]] = None) -> int:
+        """Draw one item index. `rand` must return uniform floats in [0, 1)
+        (default: `get_rng().random`)."""
+        if rand is None:
+            rand = get_rng().random
+        u = rand() * len(self._prob)
+        i = int(u)
+        # guard against u == n due to float rounding
+        if i >= len(self._prob):
+            i = len(self._prob) - 1
+        return i if (u - i) < self._prob[i] else self._alias[i]
+
+    def sample_many(self, k: int, rand: Optional[Callable[[], float]] = None) -> List[int]:
+        """Draw `k` item indices."""
+        if rand is None:
+            rand = get_rng().random
+        prob = self._prob
+        alias = self._alias
+        n = len(prob)
+        out: List[int] = []
+        append = out.append
+        for _ in range(max(0, k)):
+            u = rand() * n
+            i = int(u)
+            if i >= n:
+                i = n - 1
+            append(i if (u - i) < prob[i] else alias[i])
+        return out
+
+
+# case id -> (drop params, the `case.items` object the table was built from and its length, table)
+_TABLES: Dict[str, Tuple[Tuple[float, float, float], Sequence[Item], int, DropTable]] = {}
+
+
+def get_drop_table(case: Case) -> DropTable:
+    """Return the cached `DropTable` for `case`, rebuilding it if needed.
+
+    The cache is keyed by case id and checked by identity of `case.items`
+    (O(1) per open): it is rebuilt when the `presets.DROP_*` parameters
+    change or the case gets another items sequence (e.g. a reloaded `Case`
+    with the same id). Code that edits a case's items in place must call
+    `invalidate_drop_table(case.id)`.
+    """
+    params = drop_params()
+    items = case.items
+    cached = _TABLES.get(case.id)
+    if cached is not None:
+        cached_params, cached_items, cached_len, table = cached
+        if cached_items is items and cached_len == len(items) and cached_params == params:
+            return table
+    table = DropTable.for_case(case, params)
+    _TABLES[case.id] = (params, items, len(items), table)
+    return table
+
+
+def invalidate_drop_table(case_id: str) -> None:
+    """Forget the cached table of one case (after changing its items)."""
+    _TABLES.pop(case_id, None)
+
+
+def clear_drop_tables() -> None:
+    """Drop all cached tables (e.g. after hot-reloading presets)."""
+    _TABLES.clear()
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+from case_simulator.models.inventory import Inventory
+from case_simulator.models.item import Item
+from case_simulator.utils.valuation import get_valuations
+
+# (item_id, name, base_price, adj_price, quality_or_None) — same rows the
+# inventory and crafting scenes used to build for every owned copy
+InstanceRow = Tuple[str, str, int, int, Optional[float]]
+
+DEFAULT_PAGE_SIZE = 20
+
+
+class Pager:
+    """Current page over `total` rows; pages are 1-based."""
+
+    __slots__ = ("page_size", "page")
+
+    def __init__(self, page_size: int = DEFAULT_PAGE_SIZE) -> None:
+        self.page_size = max(1, int(page_size))
+        self.page = 1
+
+    def pages(self, total: int) -> int:
+        return max(1, -(-total // self.page_size))
+
+    def clamp(self, total: int) -> None:
+        self.page = min(max(1, self.page), self.pages(total))
+
+    def bounds(self, total: int) -> Tuple[int, int]:
+        """[start, stop) of the current page (0-based row indexes)."""
+        self.clamp(total)
+        start = (self.page - 1) * self.page_size
+        return start, min(total, start + self.page_size)
+
+    def next(self, total: int) -> None:
+        self.page += 1
+        self.clamp(total)
+
+    def prev(self, total: int) -> None:
+        self.page -= 1
+        self.clamp(total)
+
+    def goto(self, page: int, total: int) -> None:
+        self.page = page
+        self.clamp(total)
+
+    def handle(self, command: str, total: int) -> bool:
+        """Apply a navigation command (`>`/`n`, `<`, `gN`); False if it is not one."""
+        if command in (">", "n"):
+            self.next(total)
+        elif command == "<":
+            self.prev(total)
+        elif command.startswith("g") and command[1:].isdigit():
+            self.goto(int(command[1:]), total)
+        else:
+            return False
+        return True
+
+
+class InventoryView:
+    """Lazy, paginated view over the owned items of an `Inventory`.
+
+    Owned items are filtered by category and sorted by `sort_field` once;
+    the result is cached until the inventory mutates (`Inventory.version`)
+    or the filter/sort changes. Every stored quality is one numbered
+    instance row (an item without qualities is a single row), but rows are
+    never materialized: a prefix array of per-item row counts maps an
+    instance number to (item, copy) with one bisect, and the quality of the
+    copy is read straight from its `SortedQualities`.
+    """
+
+    __slots__ = ("inventory", "category", "sort_field", "reverse", "pager", "_key", "_items", "_starts")
+
+    def __init__(
+        self,
+        inventory: Inventory,
+        category: str = "all",
+        sort_field: str = "price",
+        reverse: bool = False,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> None:
+        self.inventory = inventory
+        self.category = category
+        self.sort_field = sort_field
+        self.reverse = reverse
+        self.pager = Pager(page_size)
+        self._key: Optional[Tuple[object, ...]] = None
+        self._items: List[Tuple[Item, int]] = []
+        # _starts[i] = number of the first instance row of _items[i]; the
+        # last element is the total
+        self._starts = array("q", [0])
+
+    def configure(self, category: str = "all", sort_field: str = "price", reverse: bool = False) -> None:
+        """Change filter/sort; goes back to the first page if anything changed."""
+        if (category, sort_field, reverse) != (self.category, self.sort_field, self.reverse):
+            self.category, self.sort_field, self.reverse = category, sort_field, reverse
+            self.pager.page = 1
+
+    def _refresh(self) -> None:
+        inv = self.inventory
+        key = (inv.version, self.category, self.sort_field, self.reverse)
+        if key == self._key:
+            return
+        cat = self.category
+        owned = inv.get_items(None if cat == "all" else cat)
+        field = self.sort_field
+        owned.sort(key=lambda ic: getattr(ic[0], field, 0), reverse=self.reverse)
+        starts = array("q", [0])
+        total = 0
+        with_quality = inv.quality_counts()
+        for it, _cnt in owned:
+            total += with_quality.get(it.id, 0) or 1
+            starts.append(total)
+        self._items, self._starts, self._key = owned, starts, key
+
+    # --- items ---
+    def items(self) -> List[Tuple[Item, int]]:
+        """Owned (item, count) pairs in display order."""
+        self._refresh()
+        return self._items
+
+    def item_count(self) -> int:
+        self._refresh()
+        return len(self._items)
+
+    def row_span(self, position: int) -> Tuple[int, int]:
+        """Instance rows [start, stop) of the item at `position`."""
+        self._refresh()
+        return self._starts[position], self._starts[position + 1]
+
+    def page_items(self) -> List[Tuple[int, Item, int]]:
+        """(position, item, count) of the current page (paging over items)."""
+        self._refresh()
+        start, stop = self.pager.bounds(len(self._items))
+        return [(i, *self._items[i]) for i in range(start, stop)]  # type: ignore[misc]
+
+    # --- instance rows ---
+    def row_count(self) -> int:
+        self._refresh()
+        return self._starts[-1]
+
+    def row(self, index: int) -> Optional[InstanceRow]:
+        """Instance row number `index` (0-based), or None if out of range."""
+        self._refresh()
+        if index < 0 or index >= self._starts[-1]:
+            return None
+        pos = bisect_right(self._starts, index) - 1
+        it = self._items[pos][0]
+        qlist = self.inventory.item_qualities.get(it.id)
+        if not qlist:
+            return (it.id, it.name, it.price, it.price, None)
+        q = qlist[index - self._starts[pos]]
+        return (it.id, it.name, it.price, get_valuations().adjusted(it, q), float(q))
+
+    def rows(self, start: int, stop: int) -> List[InstanceRow]:
+        """Instance rows [start, stop)."""
+        self._refresh()
+        stop = min(stop, self._starts[-1])
+        out: List[InstanceRow] = []
+        if start >= stop:
+            return out
+        vals = get_valuations()
+        pos = bisect_right(self._starts, max(0, start)) - 1
+        index = max(0, start)
+        while index < stop:
+            it = self._items[pos][0]
+            first, end = self._starts[pos], min(self._starts[pos + 1], stop)
+            qlist = self.inventory.item_qualities.get(it.id)
+            if not qlist:
+                out.append((it.id, it.name, it.price, it.price, None))
+            else:
+                qs = qlist[index - first:end - first]
+                for q, value in zip(qs, vals.values(it, qs)):
+                    out.append((it.id, it.name, it.price, int(round(value)), float(q)))
+            index = end
+            pos += 1
+        return out
+
+    def page_rows(self) -> Tuple[int, List[InstanceRow]]:
+        """(number of the first row, rows) of the current page (paging over instances)."""
+        start, stop = self.pager.bounds(self.row_count())
+        return start, self.rows(start, stop)
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import functools
+import json
+import re
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+
+from case_simulator.save_writer import atomic_write
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# (name, sorted label pairs)
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# Prefix of exported metric names
+NAMESPACE = "case_simulator"
+_NAME_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+# Histogram buckets: values below 2**SUB_BITS nanoseconds get a bucket
+# each, above that every power of two is split into 2**(SUB_BITS-1)
+# linear sub-buckets (HDR-style), so any recorded value is off by at most
+# 1/64 (~1.6%) while the whole ns..hours range takes ~3k buckets.
+SUB_BITS = 7
+_SUB_COUNT = 1 << SUB_BITS
+_HALF = _SUB_COUNT >> 1
+EXPORT_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def _bucket_index(value: int) -> int:
+    if value < _SUB_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BITS
+    return (shift + 1) * _HALF + (value >> shift) - _HALF
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    """[low, high] of the values that land in bucket `index`."""
+    if index < _SUB_COUNT:
+        return index, index
+    shift = index // _HALF - 1
+    top = index % _HALF + _HALF
+    return top << shift, ((top + 1) << shift) - 1
+
+
+class Counter:
+    """Monotonic count (opens, sales, bytes written...)."""
+
+    __slots__ = ("value",)
+    kind = "counter"
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: Union[int, float] = 1) -> None:
+        self.value += amount
+
+    def reset(self) -> None:
+        self.value = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"value": self.value}
+
+
+class Gauge:
+    """Last set value (balance, owned copies...)."""
+
+    __slots__ = ("value",)
+    kind = "gauge"
+
+    def __init__(self) -> None:
+        self.value: Union[int, float] = 0
+
+    def set(self, value: Union[int, float]) -> None:
+        self.value = value
+
+    def reset(self) -> None:
+        self.value = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"value": self.value}
+
+
+class Histogram:
+    """Latency histogram in integer nanoseconds with log-linear buckets.
+
+    Recording is a dict increment; quantiles walk the (sparse, sorted)
+    buckets and report the upper bound of the bucket, capped by the exact
+    maximum. Values are exposed in seconds.
+    """
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+    kind = "histogram"
+
+    def __init__(self) -> None:
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, ns: int) -> None:
+        ns = max(0, int(ns))
+        index = _bucket_index(ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        if not self.count or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        self.count += 1
+        self.total += ns
+
+    def observe(self, seconds: float) -> None:
+        self.record(int(seconds * 1e9))
+
+    def quantile(self, q: float) -> float:
+        """Value (seconds) at quantile `q` in [0, 1]; 0.0 when empty."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(_bucket_bounds(index)[1], self.max) / 1e9
+        return self.max / 1e9
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count / 1e9 if self.count else 0.0
+
+    def reset(self) -> None:
+        self.buckets.clear()
+        self.count = self.total = self.min = self.max = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "count": self.count,
+            "sum": self.total / 1e9,
+            "min": self.min / 1e9,
+            "max": self.max / 1e9,
+            "mean": self.mean,
+        }
+        for q in EXPORT_QUANTILES:
+            out[f"p{q * 100:g}"] = self.quantile(q)
+        return out
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class _Timer:
+    __slots__ = ("_hist", "_start")
+
+    def __init__(self, hist: Histogram) -> None:
+        self._hist = hist
+        self._start = 0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._hist.record(time.perf_counter_ns() - self._start)
+
+
+_NOOP = nullcontext()
+
+
+class MetricsRegistry:
+    """Named counters, gauges and latency histograms with optional labels.
+
+    Disabled by default: `inc`/`set`/`observe` return right after checking
+    `enabled`, `timer` hands out a shared no-op context manager and `timed`
+    functions call straight through, so the instrumentation left in the
+    game costs one attribute check per call site. Metrics are created on
+    first use; `reset()` zeroes them.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._metrics: Dict[MetricKey, Metric] = {}
+
+    # --- доступ к метрикам ---
+    def _get(self, cls: type, name: str, labels: Dict[str, Any]) -> Any:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items()))) if labels else (name, ())
+        metric = self._metrics.get(key)
+        if metric is None:
+            if not _NAME_RE.match(name):
+                raise ValueError(f"invalid metric name {name!r}")
+            metric = self._metrics[key] = cls()
+        elif not isinstance(metric, cls):
+            raise TypeError(f"metric {name!r} is a {metric.kind}, not a {cls.kind}")
+        return metric
+
+    def counter(self, name: str, **labels: Any) -> Counter:
+        return self._get(Counter, name, labels)
+
+    def gauge(self, name: str, **labels: Any) -> Gauge:
+        return self._get(Gauge, name, labels)
+
+    def histogram(self, name: str, **labels: Any) -> Histogram:
+        return self._get(Histogram, name, labels)
+
+    # --- запись (ничего не делают, если метрики выключены) ---
+    def inc(self, name: str, amount: Union[int, float] = 1, **labels: Any) -> None:
+        if self.enabled:
+            self._get(Counter, name, labels).inc(amount)
+
+    def set(self, name: str, value: Union[int, float], **labels: Any) -> None:
+        if self.enabled:
+            self._get(Gauge, name, labels).set(value)
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        if self.enabled:
+            self._get(Histogram, name, labels).observe(seconds)
+
+    def timer(self, name: str, **labels: Any) -> ContextManager[Any]:
+        """`with METRICS.timer("save_seconds"):` — records the block's duration."""
+        if not self.enabled:
+            return _NOOP
+        return _Timer(self._get(Histogram, name, labels))
+
+    def timed(self, name: str, **labels: Any) -> Callable[[F], F]:
+        """Decorator: record every call's duration in histogram `name`."""
+
+        def decorate(fn: F) -> F:
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Timer(self._get(Histogram, name, labels)):
+                    return fn(*args, **kwargs)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorate
+
+    # --- чтение ---
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, str], Metric]]:
+        """(name, labels, metric) sorted by name and labels."""
+        for (name, labels), metric in sorted(self._metrics.items(), key=lambda kv: kv[0]):
+            yield name, dict(labels), metric
+
+    def get(self, name: str, **labels: Any) -> Optional[Metric]:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        return self._metrics.get(key)
+
+    # --- экспорт ---
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (histograms as summaries, seconds)."""
+        lines: List[str] = []
+        typed: set = set()
+        for name, labels, metric in self.items():
+            full = f"{NAMESPACE}_{name}"
+            if full not in typed:
+                typed.add(full)
+                lines.append(f"# TYPE {full} {'summary' if metric.kind == 'histogram' else metric.kind}")
+            if isinstance(metric, Histogram):
+                for q in EXPORT_QUANTILES:
+                    lines.append(f"{full}{_labels(labels, quantile=f'{q:g}')} {metric.quantile(q):.9g}")
+                lines.append(f"{full}_sum{_labels(labels)} {metric.total / 1e9:.9g}")
+                lines.append(f"{full}_count{_labels(labels)} {metric.count}")
+            else:
+                lines.append(f"{full}{_labels(labels)} {metric.value}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def to_json_lines(self, timestamp: Optional[float] = None) -> List[str]:
+        """One JSON object per metric, all stamped with the same time."""
+        ts = time.time() if timestamp is None else timestamp
+        return [
+            json.dumps({"ts": round(ts, 3), "name": name, "type": metric.kind, "labels": labels, **metric.snapshot()}, ensure_ascii=False)
+            for name, labels, metric in self.items()
+        ]
+
+    def export_prometheus(self, path: Path) -> Path:
+        """Write the current values to `path` (replacing it)."""
+        atomic_write(Path(path), self.to_prometheus().encode("utf-8"))
+        return Path(path)
+
+    def export_jsonl(self, path: Path) -> Path:
+        """Append the current values to `path` as JSON lines."""
+        lines = self.to_json_lines()
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.writelines(line + "\n" for line in lines)
+        return Path(path)
+
+
+def _labels(labels: Dict[str, str], **extra: str) -> str:
+    pairs = {**labels, **extra}
+    if not pairs:
+        return ""
+    escaped = (k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"' for k, v in pairs.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+# Shared registry used by the instrumented code (see docs: «Метрики»)
+METRICS = MetricsRegistry()
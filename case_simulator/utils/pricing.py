@@ -1,5 +1,63 @@
 from __future__ import annotations
 
+from array import array
+from bisect import bisect_right
+from typing import Any, Iterable, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: array inputs fall back to a Python loop
+    np = None
+
+
+Q_MAX = 0.999999
+
+# Anchors for >0.9 progression
+_ANCHORS = (
+    (0.9, 1.0),
+    (0.91, 1.05),
+    (0.93, 1.30),
+    (0.95, 1.70),
+    (0.99, 3.00),
+    (0.9950, 5.00),
+)
+
+
+def _build_segments() -> Tuple[Tuple[float, float, float, float], ...]:
+    """Breakpoint table of the piecewise-linear part (q < 0.995).
+
+    Every row is (x0, width, m0, dm) and the multiplier inside the segment is
+    m0 + dm * ((q - x0) / width). Widths and deltas are computed exactly as the
+    original `if` chain did, so results stay bit-for-bit identical.
+    """
+    segments = [
+        # Below 0.5: linear from 0.4 -> 0.65 at 0.5
+        (0.0, 0.5, 0.4, 0.65 - 0.4),
+        # 0.5 .. 0.75: linear 0.65 -> 0.75
+        (0.5, 0.25, 0.65, 0.75 - 0.65),
+        # 0.75 .. 0.9: linear 0.75 -> 1.0
+        (0.75, 0.15, 0.75, 1.0 - 0.75),
+    ]
+    # between 0.9 and 0.995: linear interpolate between anchors
+    for (x0, m0), (x1, m1) in zip(_ANCHORS, _ANCHORS[1:]):
+        segments.append((x0, x1 - x0, m0, m1 - m0))
+    return tuple(segments)
+
+
+_SEGMENTS = _build_segments()
+_STARTS = tuple(s[0] for s in _SEGMENTS)
+# End of the interpolated range; [0.995, 0.999) is the fixed 8.0 band
+_LINEAR_END = _ANCHORS[-1][0]
+_FIXED_BAND = 8.0
+# q >= 0.9990 -> progressive per-0.0001 increments starting at 10.0
+_PROGRESSIVE_START = 0.9990
+_PROGRESSIVE_STEP = 0.0001
+_PROGRESSIVE_BASE = 10.0
+
+if np is not None:
+    _NP_STARTS = np.array(_STARTS)
+    _NP_X0, _NP_WIDTH, _NP_M0, _NP_DM = (np.array(col) for col in zip(*_SEGMENTS))
+
 
 def price_multiplier(q: float) -> float:
     """Map quality q to a price multiplier according to configured tiers.
@@ -7,48 +65,38 @@ def price_multiplier(q: float) -> float:
     Same algorithm used by case opening logic. Input q is expected in [0.0, 1.0).
     """
     # Safety clamp
-    q = max(0.0, min(q, 0.999999))
-
-    # Below 0.5: linear from 0.4 -> 0.65 at 0.5
-    if q < 0.5:
-        return 0.4 + (0.65 - 0.4) * (q / 0.5)
-
-    # 0.5 .. 0.75: linear 0.65 -> 0.75
-    if q < 0.75:
-        return 0.65 + (0.75 - 0.65) * ((q - 0.5) / 0.25)
-
-    # 0.75 .. 0.9: linear 0.75 -> 1.0
-    if q < 0.9:
-        return 0.75 + (1.0 - 0.75) * ((q - 0.75) / 0.15)
-
-    # Anchors for >0.9 progression
-    anchors = [
-        (0.9, 1.0),
-        (0.91, 1.05),
-        (0.93, 1.30),
-        (0.95, 1.70),
-        (0.99, 3.00),
-        (0.9950, 5.00),
-    ]
+    q = max(0.0, min(q, Q_MAX))
 
-    # between 0.9 and 0.995: linear interpolate between anchors
-    for i in range(len(anchors) - 1):
-        x0, m0 = anchors[i]
-        x1, m1 = anchors[i + 1]
-        if x0 <= q < x1:
-            t = (q - x0) / (x1 - x0)
-            return m0 + (m1 - m0) * t
-
-    # 0.9950 < q <= 0.9989 -> fixed 8.0 (800%) according to spec
-    if q <= 0.9989:
-        if q > 0.9950:
-            return 8.0
-
-    # q >= 0.9990 -> progressive per-0.0001 increments starting at 10.0
-    if q >= 0.9990:
-        # number of steps of 0.0001 above 0.9990
-        steps = (q - 0.9990) / 0.0001
-        return 10.0 + steps
-
-    # fallback: if q in small gap between 0.9989 and 0.9990, return 8.0
-    return 8.0
+    if q < _LINEAR_END:
+        x0, width, m0, dm = _SEGMENTS[bisect_right(_STARTS, q) - 1]
+        return m0 + dm * ((q - x0) / width)
+
+    # 0.9950 <= q < 0.9990 -> fixed 8.0 (800%) according to spec
+    if q < _PROGRESSIVE_START:
+        return _FIXED_BAND
+
+    # number of steps of 0.0001 above 0.9990
+    return _PROGRESSIVE_BASE + (q - _PROGRESSIVE_START) / _PROGRESSIVE_STEP
+
+
+def price_multipliers(qualities: Iterable[float]) -> Any:
+    """Array version of `price_multiplier` (bit-for-bit identical results).
+
+    Returns a float64 ndarray when numpy is installed, `array('d')` otherwise.
+    """
+    if np is None:
+        return array("d", (price_multiplier(q) for q in qualities))
+
+    q = np.asarray(qualities, dtype=np.float64)
+    # Same clamp semantics as max(0.0, min(q, Q_MAX)), including NaN -> 0.0
+    q = np.where(Q_MAX < q, Q_MAX, q)
+    q = np.where(q > 0.0, q, 0.0)
+
+    seg = np.searchsorted(_NP_STARTS, q, side="right") - 1
+    linear = _NP_M0[seg] + _NP_DM[seg] * ((q - _NP_X0[seg]) / _NP_WIDTH[seg])
+    progressive = _PROGRESSIVE_BASE + (q - _PROGRESSIVE_START) / _PROGRESSIVE_STEP
+    return np.where(
+        q < _LINEAR_END,
+        linear,
+        np.where(q < _PROGRESSIVE_START, _FIXED_BAND, progressive),
+    )
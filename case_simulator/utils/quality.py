@@ -1,10 +1,28 @@
 from __future__ import annotations
 
-import random
-from typing import Tuple
+from typing import Any, Optional
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: only speeds up batch generation
+    np = None
 
-def gen_quality() -> float:
+from case_simulator.utils.rng import Rng, get_rng
+
+# Beta parameters of the base distribution and the boosted rare bands.
+BETA_ALPHA = 17.0
+BETA_BETA = 3.0
+BOOST_P = 0.005
+# (cumulative share inside the boost branch, band start, band width)
+BOOST_BANDS = (
+    (0.6, 0.99, 0.0050),
+    (0.95, 0.9951, 0.0038),
+    (1.0, 0.9990, 0.0009),
+)
+Q_MAX = 0.999999
+
+
+def gen_quality(rng: Optional[Rng] = None) -> float:
     """Generate a quality value in [0.0, 1.0) rounded to 6 decimals.
 
     This reproduces the same behaviour that was previously inside the
@@ -16,35 +34,70 @@ def gen_quality() -> float:
     Это воспроизводит то же поведение, что и раньше внутри CaseOpeningScene._gen_quality: 
     базовое распределение бета с небольшой
     шанс получить повышенные ультра-редкие значения в определенных диапазонах.
+
+    `rng` — поток случайных чисел (по умолчанию общий `utils.rng.get_rng()`).
     """
+    return _draw_quality(rng if rng is not None else get_rng())
+
+
+def _draw_quality(rnd: Any) -> float:
+    """Scalar generator core; `rnd` is a `random.Random` (e.g. an `Rng`) or the `random` module."""
     # Base distribution: beta with mean ~0.85 (alpha/(alpha+beta) = 17/(17+3) = 0.85)
 
     # Базовое распределение: бета с средним ~0.85 (альфа/(альфа+бета) = 17/(17+3) = 0.85)
-    q = random.betavariate(17.0, 3.0)
+    q = rnd.betavariate(BETA_ALPHA, BETA_BETA)
 
     # редкая вероятность получить ультра-высокое качество из определенных диапазонов
-    r = random.random()
-    if r < 0.005:  # 0.5% chance for boosted rare quality
-        s = random.random()
-        if s < 0.6:
-            # 0.9900 .. 0.9950
-            q = 0.99 + random.random() * (0.0050)
-        elif s < 0.95:
-            # 0.9951 .. 0.9989
-            q = 0.9951 + random.random() * (0.0038)
-        else:
-            # 0.9990 .. 0.9999
-            q = 0.9990 + random.random() * (0.0009)
+    r = rnd.random()
+    if r < BOOST_P:  # 0.5% chance for boosted rare quality
+        # bands: 0.9900 .. 0.9950 (60%), 0.9951 .. 0.9989 (35%), 0.9990 .. 0.9999 (5%)
+        s = rnd.random()
+        for share, band_start, band_width in BOOST_BANDS:
+            if s < share:
+                q = band_start + rnd.random() * band_width
+                break
 
     # Ensure strictly < 1.0 and round to 6 decimals
     # Убедитесь, что значение строго меньше 1.0 и округлено до 6 десятичных знаков
-    q = min(q, 0.999999)
+    q = min(q, Q_MAX)
     q = round(q, 6)
     if q >= 1.0:
-        q = 0.999999
+        q = Q_MAX
     return float(q)
 
 
+def gen_qualities(n: int, generator: Any) -> Any:
+    """Generate `n` qualities with the same mixture as `gen_quality`.
+
+    `generator` is a `numpy.random.Generator` (vectorized path, returns a
+    float64 ndarray) or a `random.Random` (pure-Python path, returns
+    `array('d')`). Values are rounded to 6 decimals and clamped below 1.0.
+    """
+    if np is not None and isinstance(generator, np.random.Generator):
+        q = generator.beta(BETA_ALPHA, BETA_BETA, size=n)
+        boosted = np.flatnonzero(generator.random(n) < BOOST_P)
+        if boosted.size:
+            s = generator.random(boosted.size)
+            u = generator.random(boosted.size)
+            start = np.empty(boosted.size)
+            width = np.empty(boosted.size)
+            lo = 0.0
+            for hi, band_start, band_width in BOOST_BANDS:
+                mask = (s >= lo) & (s < hi)
+                start[mask] = band_start
+                width[mask] = band_width
+                lo = hi
+            q[boosted] = start + u * width
+        np.minimum(q, Q_MAX, out=q)
+        q = np.round(q, 6)
+        q[q >= 1.0] = Q_MAX
+        return q
+
+    from array import array
+
+    return array("d", (_draw_quality(generator) for _ in range(max(0, n))))
+
+
 # Threshold helpers used by the report/simulation to classify "rare" bands
 # Пороговые помощники, используемые отчетом/симуляцией для классификации "редких" диапазонов
 def is_ge_0_99(q: float) -> bool:
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+from typing import Any, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+
+def derive_seed(root: Any, key: Any) -> int:
+    """Deterministic 64-bit seed of child stream `key` of `root`
+    (independent of the process and of PYTHONHASHSEED)."""
+    digest = hashlib.sha256(f"{root}:{key}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+class Rng(random.Random):
+    """Seedable, splittable random stream.
+
+    A `random.Random`, so it can be passed anywhere the `random` module was
+    used (`gen_quality`, `craft_items`, `DropTable.sample`, ...). `spawn(key)`
+    returns an independent child stream whose seed depends only on this
+    stream's seed and `key`, not on how many numbers were drawn, so work can
+    be split between scenes/processes and still be reproduced. `numpy()` gives
+    a `numpy.random.Generator` derived from the same seed (when numpy is
+    installed).
+    """
+
+    def __init__(self, seed: Optional[int] = None) -> None:
+        # Unseeded streams still get a concrete root so children are stable
+        self.root = seed if seed is not None else int.from_bytes(os.urandom(8), "little")
+        self._spawned = 0
+        self._np_gen: Any = None
+        super().__init__(self.root)
+
+    def seed(self, a: Any = None, version: int = 2) -> None:  # type: ignore[override]
+        if a is not None and hasattr(self, "root"):
+            self.root = a
+            self._spawned = 0
+            self._np_gen = None
+        super().seed(a, version)
+
+    def spawn(self, key: Any = None) -> "Rng":
+        """Independent child stream. Without `key` children are numbered 0, 1, ..."""
+        if key is None:
+            key = self._spawned
+            self._spawned += 1
+        return Rng(derive_seed(self.root, key))
+
+    def numpy(self) -> Any:
+        """`numpy.random.Generator` for vectorized draws (None without numpy)."""
+        if np is None:
+            return None
+        if self._np_gen is None:
+            self._np_gen = np.random.default_rng(derive_seed(self.root, "numpy"))
+        return self._np_gen
+
+
+# Default stream used when no rng is passed explicitly
+_default = Rng()
+
+
+def get_rng() -> Rng:
+    """The process-wide default stream."""
+    return _default
+
+
+def seed_default(seed: Optional[int]) -> Rng:
+    """Replace the default stream with a fresh one seeded with `seed`."""
+    global _default
+    _default = Rng(seed)
+    return _default
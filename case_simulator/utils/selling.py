@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: payouts are computed in a Python loop
+    np = None
+
+from case_simulator.ledger import get_ledger
+from case_simulator.models.inventory import Inventory
+from case_simulator.models.item import Item
+from case_simulator.utils.metrics import METRICS
+from case_simulator.utils.pricing import price_multipliers
+
+# Share of the adjusted price paid for an owned copy (same as `pN` in the inventory)
+SELL_RATE = 0.8
+
+
+@dataclass
+class SellRule:
+    """Which owned copies a bulk sale takes.
+
+    Ranges are half-open [lo, hi); None means unbounded. Copies stored
+    without quality (only items that have no stored qualities at all) are
+    valued at the base price and only match when no quality bound is set.
+    `keep_best` copies with the highest quality of every item id are never
+    sold.
+    """
+
+    category: Optional[str] = None
+    min_quality: Optional[float] = None
+    max_quality: Optional[float] = None
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    keep_best: int = 0
+
+    def has_quality_bounds(self) -> bool:
+        return self.min_quality is not None or self.max_quality is not None
+
+
+@dataclass
+class SalePlan:
+    """Dry-run result: what `execute_sale` would remove and pay.
+
+    removals: item id -> qualities of the copies to sell (None = a copy
+    without quality), in the format of `Inventory.remove_items_bulk`.
+    """
+
+    rate: float
+    removals: Dict[str, List[Optional[float]]] = field(default_factory=dict)
+    # item id -> (item, copies, payout)
+    per_item: Dict[str, Tuple[Item, int, int]] = field(default_factory=dict)
+    count: int = 0
+    payout: int = 0
+
+
+def _payouts(price: int, qualities: List[float], rate: float) -> Tuple[List[int], List[int]]:
+    """Adjusted prices and sell prices of copies with `qualities` (vectorized with numpy).
+
+    Same rounding as a single sale: adj = round(price * mult), pay = int(adj * rate).
+    """
+    mult = price_multipliers(qualities)
+    if np is not None:
+        adj = np.rint(price * mult).astype(np.int64)
+        pay = (adj * rate).astype(np.int64)
+        return adj.tolist(), pay.tolist()
+    adj_l = [int(round(price * m)) for m in mult]
+    return adj_l, [int(a * rate) for a in adj_l]
+
+
+def plan_sale(inventory: Inventory, rule: SellRule, rate: float = SELL_RATE) -> SalePlan:
+    """Select the copies matching `rule` and price them (nothing is changed).
+
+    The quality range is two bisects on each item's sorted quality array;
+    only the copies inside it are priced.
+    """
+    plan = SalePlan(rate=rate)
+    keep = max(0, int(rule.keep_best))
+    for item, count in inventory.get_items(rule.category or None):
+        qlist = inventory.item_qualities.get(item.id)
+        if not qlist:
+            # only copies without quality: all worth the base price
+            if rule.has_quality_bounds():
+                continue
+            n = count - keep
+            price = item.price
+            if n <= 0 or (rule.min_price is not None and price < rule.min_price):
+                continue
+            if rule.max_price is not None and price >= rule.max_price:
+                continue
+            plan.removals[item.id] = [None] * n
+            plan.per_item[item.id] = (item, n, int(price * rate) * n)
+            plan.count += n
+            plan.payout += int(price * rate) * n
+            continue
+
+        lo = rule.min_quality if rule.min_quality is not None else float("-inf")
+        hi = rule.max_quality if rule.max_quality is not None else float("inf")
+        candidates = qlist.range(lo, hi)
+        if keep:
+            # the `keep` best copies of the item are the last ones of the array
+            protected = len(qlist) - keep
+            if protected <= 0:
+                continue
+            first = qlist.count_range(float("-inf"), lo) if rule.min_quality is not None else 0
+            candidates = candidates[: max(0, protected - first)]
+        if not candidates:
+            continue
+        adj, pay = _payouts(item.price, candidates, rate)
+        selected: List[Optional[float]] = []
+        total = 0
+        for q, a, p in zip(candidates, adj, pay):
+            if rule.min_price is not None and a < rule.min_price:
+                continue
+            if rule.max_price is not None and a >= rule.max_price:
+                continue
+            selected.append(q)
+            total += p
+        if selected:
+            plan.removals[item.id] = selected
+            plan.per_item[item.id] = (item, len(selected), total)
+            plan.count += len(selected)
+            plan.payout += total
+    return plan
+
+
+def execute_sale(state: Any, plan: SalePlan) -> bool:
+    """Remove the planned copies in one `remove_items_bulk` call and credit
+    the payout once. False (and nothing changed) if the inventory no longer
+    has them."""
+    if not plan.count:
+        return True
+    if not state.inventory.remove_items_bulk(plan.removals):
+        return False
+    state.add_balance(plan.payout)
+    METRICS.inc("items_sold_total", plan.count, source="bulk")
+    METRICS.inc("sales_payout_total", plan.payout, source="bulk")
+    get_ledger().record_sales((iid, n, total) for iid, (_item, n, total) in plan.per_item.items())
+    return True
+
+
+def bulk_sell(state: Any, rule: SellRule, dry_run: bool = False, rate: float = SELL_RATE) -> SalePlan:
+    """`plan_sale` + `execute_sale` (unless `dry_run`)."""
+    plan = plan_sale(state.inventory, rule, rate)
+    if not dry_run:
+        execute_sale(state, plan)
+    return plan
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+from case_simulator.utils.quality import is_ge_0_99, is_ge_0_9951, is_ge_0_9990
+
+
+# Rare quality bands used in reports (same thresholds as the helpers)
+BAND_THRESHOLDS = (0.99, 0.9951, 0.9990)
+BAND_NAMES = ("ge_0_99", "ge_0_9951", "ge_0_9990")
+_BAND_PREDICATES = (is_ge_0_99, is_ge_0_9951, is_ge_0_9990)
+
+
+@dataclass
+class RunningStats:
+    """Mergeable accumulator: count, mean, M2 (sum of squared deviations),
+    min/max and counts of qualities in the rare bands.
+
+    Two accumulators built from disjoint samples can be combined with
+    `merge()` (Chan et al. parallel update), so work can be split across
+    processes and reduced afterwards.
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    bands: List[int] = field(default_factory=lambda: [0] * len(BAND_THRESHOLDS))
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count > 0 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def push(self, x: float, quality: Optional[float] = None) -> None:
+        """Add a single observation (Welford update)."""
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        if quality is not None:
+            for i, pred in enumerate(_BAND_PREDICATES):
+                if pred(quality):
+                    self.bands[i] += 1
+
+    def push_many(self, values: Iterable[float], qualities: Any = None) -> None:
+        """Add a batch of observations (two-pass mean/M2, then merge)."""
+        if np is not None and isinstance(values, np.ndarray):
+            n = int(values.size)
+            if n == 0:
+                return
+            mean = float(values.mean())
+            m2 = float(((values - mean) ** 2).sum())
+            lo, hi = float(values.min()), float(values.max())
+            bands = [0] * len(BAND_THRESHOLDS)
+            if qualities is not None:
+                q = np.asarray(qualities)
+                bands = [int(np.count_nonzero(q >= t)) for t in BAND_THRESHOLDS]
+        else:
+            vals = [float(v) for v in values]
+            n = len(vals)
+            if n == 0:
+                return
+            mean = math.fsum(vals) / n
+            m2 = math.fsum((v - mean) ** 2 for v in vals)
+            lo, hi = min(vals), max(vals)
+            bands = [0] * len(BAND_THRESHOLDS)
+            if qualities is not None:
+                for q in qualities:
+                    for i, pred in enumerate(_BAND_PREDICATES):
+                        if pred(q):
+                            bands[i] += 1
+        self.merge(RunningStats(n, mean, m2, lo, hi, bands))
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Fold `other` into this accumulator (in place) and return self."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            self.bands = list(other.bands)
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.bands = [a + b for a, b in zip(self.bands, other.bands)]
+        return self
+
+    def band_counts(self) -> dict:
+        return dict(zip(BAND_NAMES, self.bands))
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from case_simulator.data import presets
+from case_simulator.models.item import Item
+
+
+class TemplateIndex:
+    """Craftable templates (price > 0) sorted by base price, per category.
+
+    For a fixed output quality `price * mult` is monotonic in `price`, so the
+    template whose adjusted price is closest to a target is next to the
+    insertion point of `target / mult` in the sorted prices. `nearest()`
+    bisects there and compares only the neighbouring prices using the same
+    `abs(price * mult - target)` as the old linear scan; ties go to the item
+    that comes first in `presets.ITEMS`, exactly like the scan did.
+    """
+
+    __slots__ = ("_items", "_prices", "_order")
+
+    # category key used for "any category"
+    ALL = ""
+
+    def __init__(self, items: Sequence[Item]) -> None:
+        self._items: Dict[str, List[Item]] = {}
+        self._prices: Dict[str, List[int]] = {}
+        self._order: Dict[str, Dict[str, int]] = {}
+        pool = [(it.price, pos, it) for pos, it in enumerate(items) if it.price > 0]
+        pool.sort(key=lambda row: (row[0], row[1]))
+        for price, pos, it in pool:
+            for key in (self.ALL, it.category):
+                self._items.setdefault(key, []).append(it)
+                self._prices.setdefault(key, []).append(price)
+                # first position wins if an id repeats
+                self._order.setdefault(key, {}).setdefault(it.id, pos)
+
+    def categories(self) -> List[str]:
+        return [c for c in self._items if c != self.ALL]
+
+    def candidates(self, category: Optional[str] = None) -> List[Item]:
+        """Templates of `category` (all categories if None) sorted by price."""
+        return list(self._items.get(category or self.ALL, ()))
+
+    def nearest(self, target_value: float, mult: float, category: Optional[str] = None, k: int = 1) -> List[Item]:
+        """Up to `k` templates with adjusted price `price * mult` closest to
+        `target_value`, best first."""
+        key = category or self.ALL
+        items = self._items.get(key)
+        if not items or k <= 0:
+            return []
+        prices = self._prices[key]
+        order = self._order[key]
+        n = len(items)
+
+        def rank(i: int) -> Tuple[float, int]:
+            return (abs(items[i].price * mult - target_value), order.get(items[i].id, i))
+
+        if not (mult > 0) or mult == float("inf"):
+            # Degenerate multiplier: nothing is monotonic, rank everything
+            ranked = sorted(range(n), key=rank)
+            return [items[i] for i in ranked[:k]]
+
+        # Split point in adjusted-price space: prices[:hi] * mult < target <=
+        # prices[hi:] * mult. Bisecting on target/mult lands there up to float
+        # rounding, which the two loops correct.
+        pivot = target_value / mult
+        hi = bisect_left(prices, pivot) if pivot == pivot else 0
+        while hi < n and prices[hi] * mult < target_value:
+            hi += 1
+        while hi > 0 and prices[hi - 1] * mult >= target_value:
+            hi -= 1
+        lo = hi - 1
+
+        # Two cursors walking away from the split; each step takes the closer
+        # group of equal prices (ties: earlier in ITEMS).
+        result: List[Item] = []
+        while len(result) < k and (lo >= 0 or hi < n):
+            up = down = None
+            if hi < n:
+                end = hi
+                while end < n and prices[end] == prices[hi]:
+                    end += 1
+                up = sorted(range(hi, end), key=rank)
+            if lo >= 0:
+                down = sorted(range(self._group_start(prices, lo), lo + 1), key=rank)
+            if down is None or (up is not None and rank(up[0]) < rank(down[0])):
+                group, hi = up, hi + len(up)  # type: ignore[arg-type]
+            else:
+                group, lo = down, lo - len(down)
+            result.extend(items[i] for i in group)  # type: ignore[union-attr]
+        return result[:k]
+
+    @staticmethod
+    def _group_start(prices: List[int], i: int) -> int:
+        while i > 0 and prices[i - 1] == prices[i]:
+            i -= 1
+        return i
+
+
+# (ITEMS tuple the index was built from, index)
+_INDEX: Optional[Tuple[Sequence[Item], TemplateIndex]] = None
+
+
+def get_template_index() -> TemplateIndex:
+    """The index over `presets.ITEMS`, built once and rebuilt if ITEMS is replaced."""
+    global _INDEX
+    items = presets.ITEMS
+    if _INDEX is None or _INDEX[0] is not items:
+        _INDEX = (items, TemplateIndex(items))
+    return _INDEX[1]
+
+
+def clear_template_index() -> None:
+    global _INDEX
+    _INDEX = None
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from case_simulator.data import presets
+from case_simulator.models.item import Item
+from case_simulator.utils import pricing
+
+
+class ValuationCache:
+    """Adjusted prices of owned instances, keyed by (item_id, quality).
+
+    `value(item, q)` is `item.price * price_multiplier(q)` (the unrounded
+    value crafting sums up); `adjusted(item, q)` is the rounded price shown in
+    the UI. Shared by the inventory and crafting scenes and `utils/crafting`,
+    so every instance is priced once. The cache is dropped by `invalidate()`
+    and automatically when `presets.ITEMS` or the pricing table is replaced.
+    """
+
+    __slots__ = ("_values", "_stamp", "max_entries", "hits", "misses")
+
+    def __init__(self, max_entries: int = 1 << 18) -> None:
+        self._values: Dict[Tuple[str, Optional[float]], float] = {}
+        self._stamp: Tuple[object, object] = self._current_stamp()
+        # the whole cache is dropped when it grows past this size
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _current_stamp() -> Tuple[object, object]:
+        return (presets.ITEMS, pricing._SEGMENTS)
+
+    def _check(self) -> None:
+        stamp = self._current_stamp()
+        if stamp[0] is not self._stamp[0] or stamp[1] is not self._stamp[1]:
+            self._values.clear()
+            self._stamp = stamp
+
+    def invalidate(self) -> None:
+        """Forget every cached value (call after changing presets or pricing)."""
+        self._values.clear()
+        self._stamp = self._current_stamp()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def value(self, item: Item, quality: Optional[float]) -> float:
+        """`item.price * price_multiplier(quality)`; no quality means the base price."""
+        self._check()
+        key = (item.id, None if quality is None else float(quality))
+        v = self._values.get(key)
+        if v is None:
+            self.misses += 1
+            mult = 1.0 if quality is None else pricing.price_multiplier(float(quality))
+            v = item.price * mult
+            if len(self._values) >= self.max_entries:
+                self._values.clear()
+            self._values[key] = v
+        else:
+            self.hits += 1
+        return v
+
+    def adjusted(self, item: Item, quality: Optional[float]) -> int:
+        """Rounded adjusted price as shown in the inventory."""
+        return int(round(self.value(item, quality)))
+
+    def values(self, item: Item, qualities: Iterable[float]) -> List[float]:
+        """`value()` of many instances; misses are priced in one vectorized call."""
+        self._check()
+        qs = [float(q) for q in qualities]
+        cache = self._values
+        out: List[Optional[float]] = [cache.get((item.id, q)) for q in qs]
+        missing = [i for i, v in enumerate(out) if v is None]
+        self.hits += len(qs) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            if len(cache) + len(missing) > self.max_entries:
+                cache.clear()
+            mults = pricing.price_multipliers([qs[i] for i in missing])
+            for i, mult in zip(missing, mults):
+                v = item.price * float(mult)
+                cache[(item.id, qs[i])] = v
+                out[i] = v
+        return out  # type: ignore[return-value]
+
+
+_VALUATIONS = ValuationCache()
+
+
+def get_valuations() -> ValuationCache:
+    """The shared cache used by the scenes and `utils/crafting`."""
+    return _VALUATIONS
+
+
+def invalidate_valuations() -> None:
+    _VALUATIONS.invalidate()
@@ -0,0 +1,67 @@
+"""Summarize the drop/craft/sale ledger written by the game.
+
+Prints per-case observed EV against the case price (house edge), the
+quality band spread of the drops and crafting/sale totals.
+
+Usage: python scripts/ledger_report.py [days] [case_id ...]
+       (days = 0 — вся история; ledger dir: CASE_SIM_LEDGER or ./ledger)
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from case_simulator.data import presets  # noqa: E402
+from case_simulator.ledger import CRAFT_IN, CRAFT_OUT, OPEN, SALE, Ledger  # noqa: E402
+from case_simulator.utils.stats import BAND_NAMES  # noqa: E402
+
+
+def main(argv: list[str]) -> None:
+    days = float(argv[0]) if len(argv) > 0 else 30.0
+    directory = Path(os.environ.get("CASE_SIM_LEDGER", Path.cwd() / "ledger"))
+    if not directory.is_dir():
+        print(f"Журнал не найден: {directory}")
+        sys.exit(1)
+    ledger = Ledger(directory, readonly=True)
+    start = time.time() - days * 86400 if days > 0 else None
+    case_ids = argv[1:] or [key for key in ledger.ids() if key in presets.CASES_BY_ID]
+
+    started = time.perf_counter()
+    period = f"за {days:g} дн." if start is not None else "за всё время"
+    print(f"=== Журнал {directory} ({period}) ===")
+    print(f"{'Кейс':<28} {'Открыто':>9} {'Цена':>8} {'Набл. EV':>10} {'Отдача':>8}")
+    for cid in case_ids:
+        st = ledger.observed_ev(cid, start=start)
+        if not st.count:
+            continue
+        case = presets.CASES_BY_ID.get(cid)
+        price = case.price if case is not None else 0
+        ret = f"{st.mean_value / price:7.1%}" if price else "-"
+        print(f"{cid:<28} {st.count:>9} {price:>8} {st.mean_value:>10.1f} {ret:>8}")
+
+    opens = ledger.stats(OPEN, start=start)
+    if opens.count:
+        print()
+        print("Качество выпадений:")
+        for band, name in enumerate(("lt_0_99",) + BAND_NAMES):
+            n = ledger.stats(OPEN, band=band, start=start).count
+            print(f"  {name:<10} {n:>9} ({n / opens.count:.4%})")
+
+    sales = ledger.stats(SALE, start=start)
+    burned = ledger.stats(CRAFT_IN, start=start)
+    crafted = ledger.stats(CRAFT_OUT, start=start)
+    print()
+    print(f"Продано: {sales.count} шт. за {sales.value}")
+    print(f"Крафтов: {crafted.count}, сожжено {burned.count} шт. на {burned.value}, "
+          f"получено на {crafted.value}, комиссия {-crafted.balance_delta}")
+    print(f"Запросы: {(time.perf_counter() - started) * 1e3:.1f} мс")
+    ledger.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,38 @@
+"""Monte Carlo economy report: EV, P/L and variance per case and crafting mode/tier.
+
+Usage: python scripts/run_economy.py [trials] [seed] [workers]
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from tools.simulate_economy import format_economy_report, simulate_economy  # noqa: E402
+
+
+def main(argv: list[str]) -> None:
+    trials = int(argv[0]) if len(argv) > 0 else 1_000_000
+    seed = int(argv[1]) if len(argv) > 1 else 0
+    workers = int(argv[2]) if len(argv) > 2 else None
+
+    started = time.perf_counter()
+    report = simulate_economy(trials, seed=seed, workers=workers)
+    elapsed = time.perf_counter() - started
+
+    text = format_economy_report(report)
+    print(text)
+    print(f"Готово за {elapsed:.2f}s")
+
+    out_dir = ROOT / "reports"
+    out_dir.mkdir(exist_ok=True)
+    out_path = out_dir / f"economy_report_{time.strftime('%Y%m%d_%H%M%S')}.txt"
+    out_path.write_text(text, encoding="utf-8")
+    print(f"Отчёт сохранён: {out_path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,38 @@
+"""Run the drop simulation and write a text report into `reports/`.
+
+Usage: python scripts/run_simulation.py [trials] [seed] [case_id ...]
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from tools.simulate_drops import format_report, simulate  # noqa: E402
+
+
+def main(argv: list[str]) -> None:
+    trials = int(argv[0]) if len(argv) > 0 else 1_000_000
+    seed = int(argv[1]) if len(argv) > 1 else None
+    case_ids = argv[2:] or None
+
+    started = time.perf_counter()
+    report = simulate(trials, case_ids=case_ids, seed=seed)
+    elapsed = time.perf_counter() - started
+
+    text = format_report(report)
+    print(text)
+    print(f"Готово за {elapsed:.2f}s")
+
+    out_dir = ROOT / "reports"
+    out_dir.mkdir(exist_ok=True)
+    out_path = out_dir / f"drop_report_{time.strftime('%Y%m%d_%H%M%S')}.txt"
+    out_path.write_text(text, encoding="utf-8")
+    print(f"Отчёт сохранён: {out_path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
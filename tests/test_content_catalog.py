@@ -0,0 +1,42 @@
+"""Smoke test: the game starts with a `data/content/` directory present.
+
+`presets` picks up `data/content/` next to itself at import time, so the
+package is copied to a temporary directory and imported in a subprocess.
+"""
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CHECK = """
+from case_simulator.data import presets
+ids = [it.id for it in presets.ITEMS]
+assert presets.CONTENT is not None
+assert [k for k, v in presets.SHOP_STOCK.items() if v["type"] == "item"] == sorted(
+    presets.SELLABLE_ITEM_IDS, key=ids.index)
+assert presets.ITEMS.position("content_item_b") == ids.index("content_item_b")
+assert presets.CASES.position("content_case") == len(presets.CASES) - 1
+assert presets.CASES_BY_ID["content_case"].items[0].id == "content_item_a"
+"""
+
+
+def test_presets_import_with_content(tmp_path: Path) -> None:
+    shutil.copytree(ROOT / "case_simulator", tmp_path / "case_simulator", ignore=shutil.ignore_patterns("__pycache__"))
+    content = tmp_path / "case_simulator" / "data" / "content"
+    content.mkdir()
+    (content / "items.json").write_text(json.dumps({
+        "items": [
+            {"id": "content_item_a", "name": "A", "price": 100, "category": "weapon", "rare": 2},
+            {"id": "content_item_b", "name": "B", "price": 250, "category": "knife", "rare": 5},
+        ],
+        "cases": [
+            {"id": "content_case", "name": "Content Case", "price": 300, "items": ["content_item_a", "content_item_b"]},
+        ],
+    }), encoding="utf-8")
+    proc = subprocess.run([sys.executable, "-c", CHECK], cwd=tmp_path, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
@@ -0,0 +1,22 @@
+"""Drop table cache (`utils.drops.get_drop_table`)."""
+from __future__ import annotations
+
+from dataclasses import replace
+
+from case_simulator.data import presets
+from case_simulator.utils.drops import get_drop_table, invalidate_drop_table
+
+
+def test_drop_table_cache_follows_case_items() -> None:
+    case = presets.CASES[0]
+    table = get_drop_table(case)
+    assert get_drop_table(case) is table
+
+    # a case reloaded under the same id with other items gets a new table
+    smaller = replace(case, items=tuple(case.items[:1]))
+    assert len(get_drop_table(smaller).probabilities()) == 1
+
+    rebuilt = get_drop_table(case)
+    assert rebuilt is not table
+    invalidate_drop_table(case.id)
+    assert get_drop_table(case) is not rebuilt
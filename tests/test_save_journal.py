@@ -0,0 +1,54 @@
+"""Incremental saves: the journal survives a crash in the middle of an append."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from case_simulator.data import presets
+from case_simulator.save_codec import read_journal
+from case_simulator.save_manager import SaveManager
+
+
+def test_torn_journal_tail_round_trip(tmp_path: Path) -> None:
+    item = presets.ITEMS[0]
+    manager = SaveManager(save_dir=tmp_path, background=False)
+    state = manager.load()
+    state.inventory.add_item(item, 1, quality=0.5)
+    manager.save(state)
+    state.inventory.add_item(item, 1, quality=0.6)
+    manager.save(state)
+    manager.close()
+
+    # crash mid-append: the last frame is cut short
+    raw = manager.journal_path.read_bytes()
+    manager.journal_path.write_bytes(raw[:-3])
+    _generation, records, end = read_journal(raw[:-3], SaveManager._XOR_KEY)
+    assert end < len(raw) - 3
+    assert [rec[3] for rec in records if rec[0] == "add"] == [0.5]
+
+    manager = SaveManager(save_dir=tmp_path, background=False)
+    state = manager.load()
+    assert state.inventory.get_item_qualities(item.id) == [0.5]
+    state.inventory.add_item(item, 1, quality=0.7)
+    state.balance += 100
+    manager.save(state)
+    manager.close()
+
+    state = SaveManager(save_dir=tmp_path, background=False).load()
+    assert state.inventory.get_item_qualities(item.id) == [0.5, 0.7]
+    assert state.balance == 600
+
+
+def test_batch_insert_is_one_journal_record(tmp_path: Path) -> None:
+    item = presets.ITEMS[0]
+    qualities = [n / 1000 for n in range(1000)]
+    manager = SaveManager(save_dir=tmp_path, background=False)
+    state = manager.load()
+    state.inventory.add_item_qualities(item, qualities)
+    manager.save(state)
+    manager.close()
+
+    _generation, records, _end = read_journal(manager.journal_path.read_bytes(), SaveManager._XOR_KEY)
+    assert [rec[:3] for rec in records] == [("add", item.id, 1000)]
+    state = SaveManager(save_dir=tmp_path, background=False).load()
+    assert state.inventory.item_counts[item.id] == 1000
+    assert state.inventory.get_item_qualities(item.id) == qualities
@@ -0,0 +1 @@
+"""Developer tools: headless simulations and reports (not used by the game)."""
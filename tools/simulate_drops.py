@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+from case_simulator.data import presets
+from case_simulator.utils.batch import open_cases
+from case_simulator.utils.drops import get_drop_table
+from case_simulator.utils.quality import is_ge_0_99, is_ge_0_9951, is_ge_0_9990
+
+
+BANDS = (
+    ("ge_0_99", is_ge_0_99),
+    ("ge_0_9951", is_ge_0_9951),
+    ("ge_0_9990", is_ge_0_9990),
+)
+
+
+def simulate(trials: int = 1_000_000, case_ids: Optional[Iterable[str]] = None, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Open `trials` copies of every case (or of `case_ids`) and build a drop report.
+
+    Returns {"trials": int, "seed": seed, "cases": {case_id: case_report}} where each
+    case report holds, per item: expected and empirical probability, drop count,
+    mean/std of quality and counts in the rare quality bands.
+    """
+    ids = list(case_ids) if case_ids is not None else [c.id for c in presets.CASES]
+    report: Dict[str, Any] = {"trials": int(trials), "seed": seed, "cases": {}}
+    for n, cid in enumerate(ids):
+        case = presets.CASES_BY_ID[cid]
+        if not case.items:
+            continue
+        case_seed = None if seed is None else seed + n
+        batch = open_cases(cid, trials, seed=case_seed)
+        expected = get_drop_table(case).probabilities()
+
+        per_item: List[Dict[str, Any]] = []
+        groups: List[List[float]] = [[] for _ in batch.items]
+        for i, q in zip(batch.item_index, batch.quality):
+            groups[int(i)].append(float(q))
+        for it, p, qs in zip(batch.items, expected, groups):
+            cnt = len(qs)
+            mean = sum(qs) / cnt if cnt else 0.0
+            var = sum((q - mean) ** 2 for q in qs) / cnt if cnt else 0.0
+            row: Dict[str, Any] = {
+                "id": it.id,
+                "name": it.name,
+                "expected_p": p,
+                "count": cnt,
+                "empirical_p": cnt / trials if trials else 0.0,
+                "mean_q": mean,
+                "std_q": math.sqrt(var),
+            }
+            for band, pred in BANDS:
+                row[band] = sum(1 for q in qs if pred(q))
+            per_item.append(row)
+
+        total_adj = sum(int(a) for a in batch.adjusted_price)
+        report["cases"][cid] = {
+            "name": case.name,
+            "price": case.price,
+            "mean_adjusted_price": total_adj / trials if trials else 0.0,
+            "items": per_item,
+        }
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable text version of a `simulate()` report."""
+    lines = [f"trials per case: {report['trials']}  seed: {report['seed']}", ""]
+    for cid, cr in report["cases"].items():
+        ev = cr["mean_adjusted_price"]
+        lines.append(f"=== {cr['name']} ({cid}) — цена {cr['price']}, EV {ev:.2f}, P/L {ev - cr['price']:.2f}")
+        lines.append(f"{'id':<28} {'exp_p':>9} {'emp_p':>9} {'count':>10} {'mean_q':>9} {'std_q':>9} {'>=.99':>8} {'>=.9951':>8} {'>=.999':>8}")
+        for r in cr["items"]:
+            lines.append(
+                f"{r['id']:<28} {r['expected_p']:>9.5f} {r['empirical_p']:>9.5f} {r['count']:>10} "
+                f"{r['mean_q']:>9.6f} {r['std_q']:>9.6f} {r['ge_0_99']:>8} {r['ge_0_9951']:>8} {r['ge_0_9990']:>8}"
+            )
+        lines.append("")
+    return "\n".join(lines)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from case_simulator.data import presets
+from case_simulator.utils.batch import open_cases
+from case_simulator.utils.crafting import TIERS, craft_items
+from case_simulator.utils.pricing import price_multiplier
+from case_simulator.utils.rng import Rng, derive_seed
+from case_simulator.utils.stats import RunningStats
+
+
+CRAFT_MODES = ("probabilistic", "deterministic", "fusion", "upgrade")
+# Modes where the success tier matters; the others run once with tier 50
+TIERED_MODES = ("probabilistic", "upgrade")
+
+# Work is split into fixed-size chunks. Each chunk has its own seed derived
+# from (seed, task, chunk index), so the result does not depend on how many
+# workers run the chunks.
+DEFAULT_CHUNK = 250_000
+
+
+@dataclass(frozen=True)
+class Task:
+    """One line of the economy report: a case or a crafting mode/tier."""
+
+    key: str
+    kind: str  # "case" | "craft"
+    case_id: str
+    mode: str = ""
+    tier: int = 50
+    inputs: int = 1
+
+
+@dataclass
+class TaskStats:
+    """Accumulators of one task: output value and profit/loss per trial."""
+
+    value: RunningStats
+    pnl: RunningStats
+
+    def merge(self, other: "TaskStats") -> "TaskStats":
+        self.value.merge(other.value)
+        self.pnl.merge(other.pnl)
+        return self
+
+
+def chunk_seed(seed: int, key: str, chunk: int) -> int:
+    """Deterministic 64-bit seed of one chunk (independent of process/hash seed)."""
+    return derive_seed(seed, f"{key}:{chunk}")
+
+
+def default_tasks(craft_input_case: str = "pistol_case", craft_inputs: int = 4) -> List[Task]:
+    """Every case in `presets.CASES` plus every crafting mode/tier."""
+    tasks = [Task(key=f"case:{c.id}", kind="case", case_id=c.id) for c in presets.CASES if c.items]
+    for mode in CRAFT_MODES:
+        tiers = sorted(TIERS, reverse=True) if mode in TIERED_MODES else [50]
+        n_inputs = 1 if mode == "upgrade" else craft_inputs
+        for tier in tiers:
+            key = f"craft:{mode}:{tier}" if mode in TIERED_MODES else f"craft:{mode}"
+            tasks.append(Task(key=key, kind="craft", case_id=craft_input_case, mode=mode, tier=tier, inputs=n_inputs))
+    return tasks
+
+
+def _run_case_chunk(task: Task, n: int, seed: int) -> TaskStats:
+    case = presets.CASES_BY_ID[task.case_id]
+    batch = open_cases(task.case_id, n, seed=seed)
+    value = RunningStats()
+    value.push_many(batch.adjusted_price, batch.quality)
+    pnl = RunningStats(value.count, value.mean - case.price, value.m2, value.min - case.price, value.max - case.price)
+    return TaskStats(value, pnl)
+
+
+def _run_craft_chunk(task: Task, n: int, seed: int) -> TaskStats:
+    # Inputs are real drops from the input case; crafting randomness comes
+    # from a separate stream of the same chunk seed.
+    inputs = open_cases(task.case_id, n * task.inputs, seed=seed)
+    rng = Rng(seed ^ 0x5DEECE66D)
+    items = inputs.items
+    idx = list(inputs.item_index)
+    qs = [float(q) for q in inputs.quality]
+
+    value = RunningStats()
+    pnl = RunningStats()
+    k = task.inputs
+    for t in range(n):
+        lo = t * k
+        selections = [(items[int(idx[j])].id, qs[j]) for j in range(lo, lo + k)]
+        res = craft_items(None, selections, task.mode, task.tier, rng=rng)
+        out = res.get("output")
+        out_q = None
+        out_value = 0.0
+        if out is not None and res["success"]:
+            out_q = float(out["quality"])
+            out_value = out["price"] * price_multiplier(out_q)
+        value.push(out_value, out_q)
+        pnl.push(out_value - res["adjusted_sum"] - res["cost"])
+    return TaskStats(value, pnl)
+
+
+def _run_chunk(spec: Tuple[Task, int, int, int]) -> Tuple[str, int, TaskStats]:
+    task, chunk, n, seed = spec
+    if task.kind == "case":
+        stats = _run_case_chunk(task, n, seed)
+    else:
+        stats = _run_craft_chunk(task, n, seed)
+    return task.key, chunk, stats
+
+
+def _plan(tasks: Iterable[Task], trials: int, seed: int, chunk_size: int) -> List[Tuple[Task, int, int, int]]:
+    specs = []
+    for task in tasks:
+        for chunk, lo in enumerate(range(0, trials, chunk_size)):
+            n = min(chunk_size, trials - lo)
+            specs.append((task, chunk, n, chunk_seed(seed, task.key, chunk)))
+    return specs
+
+
+def simulate_economy(
+    trials: int = 1_000_000,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    tasks: Optional[List[Task]] = None,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> Dict[str, Any]:
+    """Estimate EV, P/L and variance of every case and crafting mode/tier.
+
+    `trials` trials are run per task, split into `chunk_size` chunks and
+    sharded over a `ProcessPoolExecutor` with `workers` processes (1 runs
+    inline). Chunk results are reduced in chunk order, so the same seed gives
+    the same numbers for any number of workers.
+    """
+    tasks = tasks if tasks is not None else default_tasks()
+    specs = _plan(tasks, max(0, int(trials)), seed, max(1, int(chunk_size)))
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1:
+        results = [_run_chunk(s) for s in specs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # small chunksize keeps the load balanced between tasks of different cost
+            results = list(pool.map(_run_chunk, specs, chunksize=1))
+
+    by_task: Dict[str, List[Tuple[int, TaskStats]]] = {}
+    for key, chunk, stats in results:
+        by_task.setdefault(key, []).append((chunk, stats))
+
+    report: Dict[str, Any] = {"trials": trials, "seed": seed, "tasks": {}}
+    for task in tasks:
+        total = TaskStats(RunningStats(), RunningStats())
+        for _, stats in sorted(by_task.get(task.key, []), key=lambda cs: cs[0]):
+            total.merge(stats)
+        report["tasks"][task.key] = {"task": task, "value": total.value, "pnl": total.pnl}
+    return report
+
+
+def format_economy_report(report: Dict[str, Any]) -> str:
+    """Human-readable table of a `simulate_economy()` report."""
+    lines = [f"trials per task: {report['trials']}  seed: {report['seed']}", ""]
+    lines.append(f"{'task':<32} {'EV':>12} {'P/L':>12} {'std':>12} {'>=.99':>9} {'>=.9951':>9} {'>=.999':>9}")
+    for key, row in report["tasks"].items():
+        value: RunningStats = row["value"]
+        pnl: RunningStats = row["pnl"]
+        b = value.bands
+        lines.append(
+            f"{key:<32} {value.mean:>12.2f} {pnl.mean:>12.2f} {pnl.std:>12.2f} {b[0]:>9} {b[1]:>9} {b[2]:>9}"
+        )
+    return "\n".join(lines)